@@ -3,10 +3,20 @@ Main assistant implementation combining speech, LLM, and Kubernetes functionalit
 """
 
 import logging
-from typing import Optional, Callable, Literal
-from kubewhisper.llm.deepseek import DeepSeekLLM
-from kubewhisper.audio.whisper_transcriber import WhisperTranscriber
-from kubewhisper.audio.elevenlabs_speaker import ElevenLabsSpeaker
+import threading
+from typing import TYPE_CHECKING, Optional, Callable, Literal, Sequence
+from kubewhisper.k8s import connections
+from kubewhisper.llm.deepseek import DEFAULT_TIMEOUT, DeepSeekLLM
+from kubewhisper.registry.function_registry import FunctionRegistry
+from kubewhisper.registry.plugins import register_plugins
+from kubewhisper.runtime import AsyncRuntime
+from kubewhisper import tracing
+from kubewhisper.audio.tts_cache import DEFAULT_TTS_CACHE_PATH, CachedSpeechBackend, TTSCache
+from kubewhisper.audio.tts_pipeline import SpeechBackend, TTSPipeline
+
+if TYPE_CHECKING:
+    from kubewhisper.audio.whisper_transcriber import WhisperTranscriber
+    from kubewhisper.registry.speculation import ToolPrefetcher
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -20,32 +30,133 @@ class Assistant:
 
     def __init__(
         self,
-        model_path: str = "mlx-community/whisper-large-v3-turbo",
+        model_path: Optional[str] = None,
         input_device: Optional[int] = None,
         recording_duration: float = 5.0,
         output_mode: Literal["text", "voice"] = "text",
         elevenlabs_api_key: Optional[str] = None,
+        streaming: bool = False,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        capture_mode: Literal["push_to_talk", "vad", "wake"] = "push_to_talk",
+        end_silence: float = 0.6,
+        asr_backend: str = "auto",
+        asr_threads: int = 0,
+        beam_size: int = 1,
+        compute_type: str = "default",
+        preload_model: bool = True,
+        voice_input: bool = True,
+        wake_templates: Sequence[str] = (),
+        wake_threshold: float = 0.12,
+        wake_cpu_budget: Optional[float] = 0.05,
+        tts_cache_dir: Optional[str] = DEFAULT_TTS_CACHE_PATH,
+        tts_cache_bytes: int = 64 * 1024 * 1024,
+        barge_in: bool = True,
+        speculate: bool = False,
+        llm_timeout: float = DEFAULT_TIMEOUT,
+        hedge: bool = False,
+        warm_llm: bool = True,
     ):
         """
         Initialize the assistant with speech recognition and LLM components.
 
         Args:
-            model_path: Path to the Whisper model
+            model_path: Path or name of the Whisper model, or None for the backend default
             input_device: Audio input device index
             recording_duration: Duration of each recording in seconds
+            streaming: Transcribe while the user is still speaking
+            on_partial: Optional callback receiving (committed, tentative) partial transcripts
+            capture_mode: Push-to-talk with the spacebar, hands-free voice activity detection, or a wake word
+            end_silence: Seconds of trailing silence that end an utterance in "vad" capture mode
+            asr_backend: Speech recognition backend ("auto", "mlx" or "faster-whisper")
+            asr_threads: CPU threads for speech recognition (0 lets the backend decide)
+            beam_size: Beam size for speech recognition decoding
+            compute_type: Precision of the speech recognition model, e.g. "int8" or "float16"
+            preload_model: Load and warm up the speech recognition model now instead of on first use
+            voice_input: Open the microphone and speech recognition; text-only use can skip them
+            wake_templates: WAV recordings of the wake phrase for "wake" capture mode
+            wake_threshold: Wake word detection threshold (lower is stricter)
+            wake_cpu_budget: Share of one CPU core the wake word detector may use
+            tts_cache_dir: Directory caching synthesized speech, or None to synthesize every answer
+            tts_cache_bytes: Size limit of the speech cache
+            barge_in: Stop speaking an answer as soon as the user starts a new utterance
+            speculate: Start the likely tool call of a query while the LLM is still answering it
+            llm_timeout: Seconds the LLM may take to answer a query
+            hedge: Ask the LLM a second time when an answer takes longer than usual; the first answer wins
+            warm_llm: Connect to the LLM API in the background now instead of on the first query
         """
         logger.info("Initializing Kubernetes Assistant...")
 
         self.output_mode = output_mode
 
-        # Initialize LLM
-        self.llm = DeepSeekLLM()
+        # One event loop for the whole session keeps the LLM and HTTP clients warm
+        self.runtime = AsyncRuntime()
+        self.runtime.add_closer(connections.close_http_session)
+        self.runtime.add_closer(connections.close_transport)
+        self.runtime.start()
+
+        # Tools are registered from their manifests; a tool's module is imported when it first runs
+        register_plugins()
 
-        # Initialize speech components
-        self.speaker = ElevenLabsSpeaker(api_key=elevenlabs_api_key) if output_mode == "voice" else None
-        self.transcriber = WhisperTranscriber(
-            model_path=model_path, input_device=input_device, recording_duration=recording_duration
-        )
+        # Initialize LLM
+        self.llm = DeepSeekLLM(timeout=llm_timeout, hedge=hedge)
+        self.runtime.add_closer(self.llm.close)
+        if warm_llm:
+            # Connection setup overlaps with loading the speech models
+            self.runtime.submit(self.llm.warmup())
+
+        # Guesses the tool call from the transcript so the cluster round trip overlaps the LLM call
+        self.prefetcher: Optional["ToolPrefetcher"] = None
+        if speculate:
+            from kubewhisper.registry.speculation import ToolPrefetcher
+
+            self.prefetcher = ToolPrefetcher()
+            if streaming:
+                on_partial = self._speculating_on_partial(on_partial)
+
+        # Initialize speech components; their libraries are only imported by the modes that use them
+        self.speaker = None
+        if output_mode == "voice":
+            from kubewhisper.audio.elevenlabs_speaker import ElevenLabsSpeaker
+
+            self.speaker = ElevenLabsSpeaker(api_key=elevenlabs_api_key)
+        self.tts: Optional[TTSPipeline] = None
+        if self.speaker:
+            backend: SpeechBackend = self.speaker
+            if tts_cache_dir:
+                backend = CachedSpeechBackend(
+                    self.speaker,
+                    TTSCache(tts_cache_dir, tts_cache_bytes),
+                    voice_id=self.speaker.default_voice_id,
+                    model_id=self.speaker.default_model_id,
+                    templates=[func.metadata["response_template"] for func in FunctionRegistry.functions],
+                )
+                # Template fragments are synthesized in the background so startup is not held up
+                threading.Thread(target=backend.prewarm, name="tts-prewarm", daemon=True).start()
+            # Synthesizes the next sentence of an answer while the current one plays
+            self.tts = TTSPipeline(backend)
+        self.transcriber: Optional["WhisperTranscriber"] = None
+        if voice_input:
+            from kubewhisper.audio.whisper_transcriber import WhisperTranscriber
+
+            self.transcriber = WhisperTranscriber(
+                model_path=model_path,
+                input_device=input_device,
+                recording_duration=recording_duration,
+                streaming=streaming,
+                on_partial=on_partial,
+                capture_mode=capture_mode,
+                end_silence=end_silence,
+                asr_backend=asr_backend,
+                asr_threads=asr_threads,
+                beam_size=beam_size,
+                compute_type=compute_type,
+                wake_templates=wake_templates,
+                wake_threshold=wake_threshold,
+                wake_cpu_budget=wake_cpu_budget,
+                on_capture_start=self._barge_in if barge_in else None,
+            )
+            if preload_model:
+                self.transcriber.preload()
 
         self._is_running = False
         logger.info("Assistant initialized successfully")
@@ -54,27 +165,57 @@ class Assistant:
         """
         Process a text query through the LLM and execute any resulting function calls.
 
+        The stages are traced in the caller's trace, or in a trace of their own
+        that ends with the answer.
+
         Args:
             query: The user's question or command
 
         Returns:
             The processed response including any function execution results
         """
+        if tracing.current_trace() is not None:
+            return await self._process_query(query)
+
+        trace = tracing.start_trace("query")
+        try:
+            with tracing.activate(trace):
+                return await self._process_query(query)
+        finally:
+            trace.finish()
+
+    async def _process_query(self, query: str) -> dict:
         logger.info(f"Processing query: {query}")
 
-        # Get LLM response
-        response = await self.llm.ask_question(query)
+        # Likely tool calls run while the LLM answers; the one it confirms is used, the rest cancelled
+        speculation = self.prefetcher.speculate(query) if self.prefetcher else None
+        prefetched = None
+        try:
+            # Get LLM response
+            response = await self.llm.ask_question(query)
+            is_function_call = isinstance(response, dict) and "type" in response and response["type"] == "function"
+            if speculation is not None and is_function_call:
+                prefetched = speculation.claim(response.get("name"), response.get("parameters", {}))
+        finally:
+            if speculation is not None:
+                speculation.discard()
+        if self.prefetcher:
+            self.prefetcher.learn(query, response)
 
         # If response contains a function call, execute it
-        if isinstance(response, dict) and "type" in response and response["type"] == "function":
-            execution_result = await self.llm.execute_function_call(response)
+        if is_function_call:
+            execution_result = await self.llm.execute_function_call(response, prefetched=prefetched)
 
             if "error" in execution_result:
                 logger.error(f"Function execution failed: {execution_result['error']}")
                 return execution_result
 
             if "formatted_response" in execution_result:
-                return {"response": execution_result["formatted_response"]}
+                answer = {"response": execution_result["formatted_response"]}
+                # A summarized result stays available to callers asking for the full one
+                if "full_result" in execution_result:
+                    answer["full_result"] = execution_result["full_result"]
+                return answer
 
             return execution_result
 
@@ -104,6 +245,8 @@ class Assistant:
         Args:
             callback: Optional function to handle responses
         """
+        if self.transcriber is None:
+            raise RuntimeError("Voice interaction needs an assistant created with voice_input=True")
         logger.info("Starting voice interaction mode...")
         self._is_running = True
 
@@ -111,20 +254,33 @@ class Assistant:
             if not transcribed_text.strip():
                 return
 
-            response = await self.process_query(transcribed_text)
-            if callback:
-                callback(response)
-            else:
-                response_text = response.get("response", response)
-                if self.output_mode == "voice" and self.speaker:
-                    self.speaker.speak(response_text)
+            # The utterance's trace, started when it was captured, ends once the answer has been given
+            trace = tracing.current_trace()
+            try:
+                response = await self.process_query(transcribed_text)
+                if callback:
+                    callback(response)
                 else:
-                    print(f"Assistant: {response_text}")
+                    response_text = response.get("response", response)
+                    if self.output_mode == "voice" and self.tts:
+                        # Not awaited: the answer plays in the background until it ends or is interrupted
+                        handle = self.tts.speak(str(response_text))
+                        if trace is not None:
+                            handle.add_done_callback(lambda _: trace.finish())
+                            trace = None
+                    else:
+                        print(f"Assistant: {response_text}")
+            finally:
+                if trace is not None:
+                    trace.finish()
 
         def sync_callback(transcribed_text: str):
             if self._is_running:  # Only process if still running
-                import asyncio
-                asyncio.run(process_speech_callback(transcribed_text))
+                # Wait for the answer so responses are handled one at a time, in order
+                try:
+                    self.runtime.run(process_speech_callback(transcribed_text))
+                except Exception as e:
+                    logger.error(f"Error while processing speech: {e}")
 
         try:
             self.transcriber.start_listening(callback=sync_callback)
@@ -135,7 +291,31 @@ class Assistant:
         """Stop the voice interaction mode."""
         logger.info("Stopping voice interaction...")
         self._is_running = False
-        self.transcriber.stop_listening()
+        if self.transcriber is not None:
+            self.transcriber.stop_listening()
+
+    def _speculating_on_partial(self, on_partial: Optional[Callable[[str, str], None]]) -> Callable[[str, str], None]:
+        """Wrap the partial transcript callback so tool prefetch starts while the user is still speaking."""
+
+        def handle_partial(committed: str, tentative: str) -> None:
+            if on_partial:
+                on_partial(committed, tentative)
+            text = f"{committed} {tentative}".strip()
+            if text:
+                self.runtime.loop.call_soon_threadsafe(self.prefetcher.speculate, text, False)
+
+        return handle_partial
+
+    def _barge_in(self) -> None:
+        """Stop the spoken answer when the user starts talking. Called from capture threads."""
+        if self.tts is not None and self.tts.is_speaking:
+            self.tts.interrupt()
+
+    def close(self) -> None:
+        """Stop speech output and release the event loop and the clients bound to it."""
+        if self.tts is not None:
+            self.tts.close()
+        self.runtime.stop()
 
     def set_input_device(self, device_index: int) -> None:
         """
@@ -0,0 +1,273 @@
+"""
+Speech recognition backends behind a common interface.
+"""
+
+import importlib.util
+import logging
+import platform
+import threading
+import time
+from typing import Dict, Optional
+
+from kubewhisper.lazy import lazy_import
+
+# Only needed once audio is transcribed; the CLI imports this module for its option choices
+np = lazy_import("numpy")
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ("auto", "mlx", "faster-whisper")
+
+
+class RealTimeStats:
+    """Running real-time-factor statistics of a backend.
+
+    The real-time factor is processing time divided by audio duration; a backend
+    keeps up with live speech while it stays below 1.0.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+        self.last_rtf: Optional[float] = None
+        self.worst_rtf: Optional[float] = None
+
+    def record(self, audio_seconds: float, processing_seconds: float) -> None:
+        """Add one transcription."""
+        rtf = processing_seconds / audio_seconds if audio_seconds > 0 else None
+        with self._lock:
+            self.calls += 1
+            self.audio_seconds += audio_seconds
+            self.processing_seconds += processing_seconds
+            if rtf is not None:
+                self.last_rtf = rtf
+                self.worst_rtf = rtf if self.worst_rtf is None else max(self.worst_rtf, rtf)
+
+    @property
+    def rtf(self) -> Optional[float]:
+        """Real-time factor over all transcriptions so far."""
+        return self.processing_seconds / self.audio_seconds if self.audio_seconds > 0 else None
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        """Return the statistics as a dictionary."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "audio_seconds": round(self.audio_seconds, 3),
+                "processing_seconds": round(self.processing_seconds, 3),
+                "rtf": None if self.rtf is None else round(self.rtf, 3),
+                "last_rtf": None if self.last_rtf is None else round(self.last_rtf, 3),
+                "worst_rtf": None if self.worst_rtf is None else round(self.worst_rtf, 3),
+            }
+
+
+class ASRBackend:
+    """Base class for speech recognition backends.
+
+    Backends take 16 kHz mono float32 audio and return results normalized to
+    {"text": str, "segments": [{"start", "end", "text", "words": [{"start", "end", "word"}]}]}.
+    """
+
+    name = "base"
+    default_model = ""
+
+    def __init__(
+        self,
+        model: Optional[str] = None,
+        threads: int = 0,
+        beam_size: int = 1,
+        compute_type: str = "default",
+        sample_rate: int = 16000,
+        workers: int = 1,
+    ):
+        """Initialize the backend without loading the model.
+
+        Args:
+            model: Model name or path, or None for the backend default
+            threads: CPU threads used for inference (0 lets the backend decide)
+            beam_size: Beam size for decoding (1 is greedy)
+            compute_type: Numeric precision of the model weights, backend specific
+            sample_rate: Sample rate of the audio passed to transcribe
+            workers: Number of transcriptions the model may run at once; further calls wait
+        """
+        self.model = model or self.default_model
+        self.threads = threads
+        self.beam_size = beam_size
+        self.compute_type = compute_type
+        self.sample_rate = sample_rate
+        self.workers = workers
+        self._slots = threading.Semaphore(workers)
+        self.stats = RealTimeStats()
+        self.load_seconds: Optional[float] = None
+        self._loaded = False
+        self._load_lock = threading.Lock()
+
+    def load(self) -> None:
+        """Load the model if it is not loaded yet."""
+        with self._load_lock:
+            if self._loaded:
+                return
+            logger.info(f"Loading {self.name} model {self.model}...")
+            start = time.perf_counter()
+            self._load()
+            self.load_seconds = time.perf_counter() - start
+            self._loaded = True
+            logger.info(f"Loaded {self.name} model in {self.load_seconds:.2f}s")
+
+    def warmup(self, seconds: float = 1.0) -> None:
+        """Load the model and run one transcription so the first real query is fast.
+
+        Args:
+            seconds: Duration of the warmup audio
+        """
+        self.load()
+        audio = 0.01 * np.random.default_rng(0).standard_normal(int(seconds * self.sample_rate)).astype(np.float32)
+        start = time.perf_counter()
+        self._transcribe(audio, word_timestamps=False, initial_prompt=None)
+        logger.info(f"Warmed up {self.name} model in {time.perf_counter() - start:.2f}s")
+
+    def transcribe(
+        self, audio: "np.ndarray", word_timestamps: bool = False, initial_prompt: Optional[str] = None
+    ) -> Dict:
+        """Transcribe audio and record its real-time factor.
+
+        Args:
+            audio: Mono float32 audio at the backend sample rate
+            word_timestamps: Include per-word timestamps in the segments
+            initial_prompt: Text preceding the audio, used to condition decoding
+
+        Returns:
+            Normalized transcription result
+        """
+        self.load()
+        with self._slots:
+            start = time.perf_counter()
+            result = self._transcribe(audio, word_timestamps=word_timestamps, initial_prompt=initial_prompt)
+            elapsed = time.perf_counter() - start
+
+        audio_seconds = len(audio) / self.sample_rate
+        self.stats.record(audio_seconds, elapsed)
+        logger.debug(f"Transcribed {audio_seconds:.2f}s in {elapsed:.2f}s (RTF {self.stats.last_rtf or 0:.2f})")
+        return result
+
+    def _load(self) -> None:
+        raise NotImplementedError
+
+    def _transcribe(self, audio: "np.ndarray", word_timestamps: bool, initial_prompt: Optional[str]) -> Dict:
+        raise NotImplementedError
+
+
+class MLXWhisperBackend(ASRBackend):
+    """Whisper on Apple silicon through mlx-whisper."""
+
+    name = "mlx"
+    default_model = "mlx-community/whisper-large-v3-turbo"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # mlx-whisper keeps a single shared model that is not safe to run concurrently
+        self.workers = 1
+        self._slots = threading.Semaphore(1)
+
+    def _load(self) -> None:
+        import mlx.core as mx
+        import mlx_whisper
+        from mlx_whisper.transcribe import ModelHolder
+
+        if self.beam_size > 1:
+            logger.warning("mlx-whisper only supports greedy decoding, ignoring beam size")
+        self._mlx_whisper = mlx_whisper
+        dtype = mx.float32 if self.compute_type == "float32" else mx.float16
+        # Populates the model cache mlx_whisper.transcribe reads from
+        ModelHolder.get_model(self.model, dtype)
+
+    def _transcribe(self, audio: "np.ndarray", word_timestamps: bool, initial_prompt: Optional[str]) -> Dict:
+        result = self._mlx_whisper.transcribe(
+            audio,
+            path_or_hf_repo=self.model,
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            fp16=self.compute_type != "float32",
+        )
+        return {
+            "text": result.get("text", ""),
+            "segments": [
+                {
+                    "start": segment["start"],
+                    "end": segment["end"],
+                    "text": segment["text"],
+                    "words": [
+                        {"start": word["start"], "end": word["end"], "word": word["word"]}
+                        for word in segment.get("words", [])
+                    ],
+                }
+                for segment in result.get("segments", [])
+            ],
+        }
+
+
+class FasterWhisperBackend(ASRBackend):
+    """Whisper on the CPU through faster-whisper (CTranslate2), int8 quantized by default."""
+
+    name = "faster-whisper"
+    default_model = "small"
+
+    def _load(self) -> None:
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise ImportError("The CPU backend needs faster-whisper: pip install 'kubewhisper[cpu]'") from e
+
+        compute_type = "int8" if self.compute_type == "default" else self.compute_type
+        self._model = WhisperModel(
+            self.model, device="cpu", compute_type=compute_type, cpu_threads=self.threads, num_workers=self.workers
+        )
+
+    def _transcribe(self, audio: "np.ndarray", word_timestamps: bool, initial_prompt: Optional[str]) -> Dict:
+        segments, _ = self._model.transcribe(
+            audio,
+            beam_size=self.beam_size,
+            word_timestamps=word_timestamps,
+            initial_prompt=initial_prompt,
+            condition_on_previous_text=False,
+            vad_filter=False,
+        )
+        # Segments are decoded lazily while iterating
+        normalized = [
+            {
+                "start": segment.start,
+                "end": segment.end,
+                "text": segment.text,
+                "words": [{"start": word.start, "end": word.end, "word": word.word} for word in segment.words or []],
+            }
+            for segment in segments
+        ]
+        return {"text": "".join(segment["text"] for segment in normalized), "segments": normalized}
+
+
+def default_backend_name() -> str:
+    """Pick MLX on Apple silicon when it is installed, otherwise the CPU backend."""
+    if platform.system() == "Darwin" and platform.machine() == "arm64" and importlib.util.find_spec("mlx_whisper"):
+        return MLXWhisperBackend.name
+    return FasterWhisperBackend.name
+
+
+def create_backend(name: str = "auto", **kwargs) -> ASRBackend:
+    """Create a speech recognition backend.
+
+    Args:
+        name: One of BACKENDS
+        **kwargs: Passed to the backend constructor
+
+    Returns:
+        The backend, with its model not loaded yet
+    """
+    if name == "auto":
+        name = default_backend_name()
+    backends = {MLXWhisperBackend.name: MLXWhisperBackend, FasterWhisperBackend.name: FasterWhisperBackend}
+    if name not in backends:
+        raise ValueError(f"Unknown ASR backend: {name}")
+    return backends[name](**kwargs)
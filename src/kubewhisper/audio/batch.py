@@ -0,0 +1,209 @@
+"""
+Batch transcription of recorded audio files for regression tests and benchmarks.
+"""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Sequence, TextIO
+
+import numpy as np
+
+from kubewhisper.audio.asr import ASRBackend
+from kubewhisper.audio.dsp import build_preprocessing_chain, select_stages
+from kubewhisper.audio.wav_io import AUDIO_EXTENSIONS, iter_blocks, read_audio_file
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("decode", "preprocess", "transcribe", "query")
+
+
+def find_audio_files(files: Sequence[str] = (), directory: Optional[str] = None) -> List[str]:
+    """Collect audio files from explicit paths and a directory.
+
+    Args:
+        files: Paths of individual files
+        directory: Directory searched recursively for WAV and FLAC files
+
+    Returns:
+        The files, explicit paths first, directory contents sorted by path
+    """
+    paths = list(files)
+    if directory:
+        found = [
+            os.path.join(root, name)
+            for root, _, names in os.walk(directory)
+            for name in names
+            if name.lower().endswith(AUDIO_EXTENSIONS)
+        ]
+        paths.extend(sorted(found))
+    return paths
+
+
+class BatchTranscriber:
+    """Transcribes audio files through the capture preprocessing chain with a pool of workers.
+
+    Each file is decoded, split into capture-sized blocks and run through the same
+    streaming stages as live audio, then transcribed and optionally answered.
+    Results are written as JSONL in input order, one record per file followed by
+    a summary record with aggregate throughput.
+    """
+
+    def __init__(
+        self,
+        backend: ASRBackend,
+        stages: Optional[Sequence[str]] = None,
+        workers: int = 1,
+        min_amplitude: float = 0.01,
+        process_query: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ):
+        """Initialize the batch transcriber.
+
+        Args:
+            backend: Speech recognition backend; its sample rate is the target rate
+            stages: Preprocessing stages after resampling (default: the live capture defaults)
+            workers: Number of files processed at once
+            min_amplitude: Peak amplitude below which a file is treated as silent
+            process_query: Optional function answering a transcript, e.g. through the assistant
+        """
+        self.backend = backend
+        self.stages = tuple(select_stages() if stages is None else stages)
+        self.workers = workers
+        self.min_amplitude = min_amplitude
+        self.process_query = process_query
+
+    def preprocess(self, audio: np.ndarray, sample_rate: int) -> Dict[str, Any]:
+        """Run decoded audio through the preprocessing chain block by block.
+
+        Args:
+            audio: Audio shaped (frames, channels)
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            Dict with the processed "audio" and the "trimmed_seconds" of silence removed
+        """
+        chain = build_preprocessing_chain(sample_rate, self.backend.sample_rate, self.stages)
+        # The chain may reuse its output buffers, so every block is copied out
+        blocks = [
+            chain.process(block.mean(axis=1, dtype=np.float32)).copy() for block in iter_blocks(audio, sample_rate)
+        ]
+        blocks.append(chain.flush())
+        processed = np.concatenate(blocks).astype(np.float32, copy=False)
+
+        peak = float(np.max(np.abs(processed))) if len(processed) else 0.0
+        if peak > 0:
+            processed /= peak
+        return {
+            "audio": processed,
+            "peak": peak,
+            "trimmed_seconds": chain.removed_samples / self.backend.sample_rate,
+        }
+
+    def transcribe_audio(self, audio: np.ndarray, sample_rate: int, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Preprocess and transcribe decoded audio, adding the results to a record.
+
+        Args:
+            audio: Audio shaped (frames, channels)
+            sample_rate: Sample rate of the audio
+            record: Record receiving "text", "rtf", "audio_seconds", "trimmed_seconds"
+                and the stage "timings" (or "error" for silent audio)
+
+        Returns:
+            The record
+        """
+        timings = record.setdefault("timings", {})
+        record["audio_seconds"] = len(audio) / sample_rate
+
+        start = time.perf_counter()
+        prepared = self.preprocess(audio, sample_rate)
+        timings["preprocess"] = time.perf_counter() - start
+        record["trimmed_seconds"] = round(prepared["trimmed_seconds"], 3)
+
+        if prepared["peak"] < self.min_amplitude:
+            record["text"] = None
+            record["error"] = "Audio input level too low"
+            return record
+
+        start = time.perf_counter()
+        result = self.backend.transcribe(prepared["audio"])
+        timings["transcribe"] = time.perf_counter() - start
+        record["text"] = result["text"].strip()
+        record["rtf"] = round(timings["transcribe"] / record["audio_seconds"], 4)
+        return record
+
+    def process_file(self, path: str) -> Dict[str, Any]:
+        """Decode, preprocess, transcribe and optionally answer one file.
+
+        Returns:
+            The JSONL record for the file
+        """
+        record: Dict[str, Any] = {"type": "file", "file": path}
+        timings: Dict[str, float] = {}
+        record["timings"] = timings
+        try:
+            start = time.perf_counter()
+            audio, sample_rate = read_audio_file(path)
+            timings["decode"] = time.perf_counter() - start
+            self.transcribe_audio(audio, sample_rate, record)
+
+            if self.process_query is not None and record.get("text"):
+                start = time.perf_counter()
+                record["response"] = self.process_query(record["text"])
+                timings["query"] = time.perf_counter() - start
+        except Exception as e:
+            logger.error(f"Error processing {path}: {e}")
+            record["error"] = str(e)
+        finally:
+            for stage, seconds in timings.items():
+                timings[stage] = round(seconds, 4)
+        return record
+
+    def run(self, paths: Sequence[str], output: TextIO) -> Dict[str, Any]:
+        """Process files and write one JSONL record per file, then a summary record.
+
+        Args:
+            paths: Audio files to process
+            output: Stream the JSONL records are written to
+
+        Returns:
+            The summary record
+        """
+        logger.info(f"Transcribing {len(paths)} files with {self.workers} workers")
+        self.backend.load()
+
+        records = []
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="batch") as executor:
+            # map yields in input order while later files are already being processed
+            for record in executor.map(self.process_file, paths):
+                records.append(record)
+                output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+        wall_seconds = time.perf_counter() - start
+
+        audio_seconds = sum(record.get("audio_seconds", 0.0) for record in records)
+        stage_seconds = {
+            stage: round(sum(record["timings"].get(stage, 0.0) for record in records), 4)
+            for stage in STAGES
+            if any(stage in record["timings"] for record in records)
+        }
+        summary = {
+            "type": "summary",
+            "files": len(records),
+            "failed": sum(1 for record in records if "error" in record),
+            "workers": self.workers,
+            "audio_seconds": round(audio_seconds, 3),
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput": round(audio_seconds / wall_seconds, 3) if wall_seconds > 0 else None,
+            "stage_seconds": stage_seconds,
+            "asr": self.backend.stats.as_dict(),
+        }
+        output.write(json.dumps(summary) + "\n")
+        output.flush()
+        logger.info(
+            f"Transcribed {audio_seconds:.1f}s of audio in {wall_seconds:.1f}s "
+            f"({summary['throughput']} audio seconds per second)"
+        )
+        return summary
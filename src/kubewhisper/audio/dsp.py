@@ -0,0 +1,467 @@
+"""
+Streaming signal processing for captured audio.
+"""
+
+import functools
+import math
+from typing import List, Sequence
+
+import numpy as np
+from scipy import signal
+
+
+@functools.lru_cache(maxsize=16)
+def design_resampling_filter(up: int, down: int) -> np.ndarray:
+    """Design the anti-aliasing FIR filter used by resample_poly for a rate ratio.
+
+    Args:
+        up: Upsampling factor
+        down: Downsampling factor
+
+    Returns:
+        Filter taps, scaled by the upsampling factor
+    """
+    max_rate = max(up, down)
+    half_len = 10 * max_rate
+    taps = signal.firwin(2 * half_len + 1, 1.0 / max_rate, window=("kaiser", 5.0)) * up
+    taps.setflags(write=False)
+    return taps
+
+
+class StreamingResampler:
+    """Stateful polyphase resampler that converts audio block by block.
+
+    Produces the same output as scipy.signal.resample_poly over the whole
+    signal, but each block is converted as it arrives. The filter is designed
+    once per rate pair, and all working memory is preallocated and reused, so
+    steady-state processing of equally sized blocks does not allocate.
+    """
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        """Initialize the resampler.
+
+        Args:
+            orig_sr: Sample rate of the input blocks
+            target_sr: Sample rate of the output
+        """
+        divisor = math.gcd(orig_sr, target_sr)
+        self.orig_sr = orig_sr
+        self.target_sr = target_sr
+        self.up = target_sr // divisor
+        self.down = orig_sr // divisor
+
+        # Equal rates use a single unit tap, which makes the filter an identity
+        taps = np.ones(1) if self.up == self.down else design_resampling_filter(self.up, self.down)
+        self._delay = (len(taps) - 1) // 2
+        self._taps_per_phase = math.ceil(len(taps) / self.up)
+
+        # phases[m, p] holds taps[p + m * up], the m-th tap of polyphase branch p
+        padded = np.zeros(self._taps_per_phase * self.up, dtype=np.float32)
+        padded[: len(taps)] = taps
+        self._phases = padded.reshape(self._taps_per_phase, self.up)
+
+        self._input = np.zeros(0, dtype=np.float32)
+        self._spare = np.zeros(0, dtype=np.float32)
+        self._output_capacity = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard buffered input and start a new signal."""
+        # The buffer starts with zeros standing in for the samples before the signal
+        self._reserve_input(self._taps_per_phase)
+        self._input[: self._taps_per_phase] = 0
+        self._fill = self._taps_per_phase
+        self._buffer_start = -self._taps_per_phase
+        self._n_in = 0
+        self._n_out = 0
+
+    def _reserve_input(self, size: int) -> None:
+        """Grow the input buffers to hold at least size samples."""
+        if size <= len(self._input):
+            return
+        grown = np.zeros(max(size, 2 * len(self._input)), dtype=np.float32)
+        grown[: len(self._input)] = self._input
+        self._input = grown
+        self._spare = np.zeros_like(grown)
+
+    def _reserve_output(self, count: int) -> None:
+        """Grow the per-output scratch arrays to hold at least count samples."""
+        if count <= self._output_capacity:
+            return
+        size = max(count, 2 * self._output_capacity)
+        self._arange = np.arange(size)
+        self._positions = np.zeros(size, dtype=np.int64)
+        self._phase_index = np.zeros(size, dtype=np.int64)
+        self._samples = np.zeros(size, dtype=np.float32)
+        self._coefficients = np.zeros(size, dtype=np.float32)
+        self._output = np.zeros(size, dtype=np.float32)
+        self._output_capacity = size
+
+    def _produce(self, available: int, limit: int = None) -> np.ndarray:
+        """Compute every output sample whose inputs are available."""
+        n_end = (available * self.up - 1 - self._delay) // self.down + 1
+        if limit is not None:
+            n_end = min(n_end, limit)
+        count = max(n_end - self._n_out, 0)
+        self._reserve_output(count)
+
+        if count:
+            positions = self._positions[:count]
+            phase_index = self._phase_index[:count]
+            samples = self._samples[:count]
+            coefficients = self._coefficients[:count]
+            output = self._output[:count]
+
+            np.add(self._arange[:count], self._n_out, out=positions)
+            np.multiply(positions, self.down, out=positions)
+            np.add(positions, self._delay, out=positions)
+            np.remainder(positions, self.up, out=phase_index)
+
+            # Buffer index of the newest input sample each output depends on
+            np.floor_divide(positions, self.up, out=positions)
+            np.subtract(positions, self._buffer_start, out=positions)
+
+            # Accumulate one tap at a time so that only 1-D scratch arrays are needed
+            output.fill(0)
+            for tap in self._phases:
+                np.take(self._input, positions, out=samples, mode="clip")
+                np.take(tap, phase_index, out=coefficients, mode="clip")
+                np.multiply(samples, coefficients, out=samples)
+                np.add(output, samples, out=output)
+                np.subtract(positions, 1, out=positions)
+            self._n_out = n_end
+
+        # Drop input samples that no later output sample needs
+        keep_from = (self._n_out * self.down + self._delay) // self.up - self._taps_per_phase + 1
+        drop = min(max(keep_from - self._buffer_start, 0), self._fill)
+        if drop:
+            kept = self._fill - drop
+            self._spare[:kept] = self._input[drop : self._fill]
+            self._input, self._spare = self._spare, self._input
+            self._fill = kept
+            self._buffer_start += drop
+
+        return self._output[:count]
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Resample the next block of mono audio.
+
+        Args:
+            block: Mono input samples
+
+        Returns:
+            Resampled float32 samples available so far. The array is reused by the
+            next call, so copy it if it must outlive that.
+        """
+        self._reserve_input(self._fill + len(block))
+        self._input[self._fill : self._fill + len(block)] = block
+        self._fill += len(block)
+        self._n_in += len(block)
+        return self._produce(self._n_in)
+
+    def flush(self) -> np.ndarray:
+        """Return the remaining output samples of the signal and reset the resampler."""
+        total = math.ceil(self._n_in * self.up / self.down)
+        needed = ((total - 1) * self.down + self._delay) // self.up + 1 if total else 0
+        padding = max(needed - self._n_in, 0)
+        self._reserve_input(self._fill + padding)
+        self._input[self._fill : self._fill + padding] = 0
+        self._fill += padding
+
+        output = self._produce(self._n_in + padding, limit=total).copy()
+        self.reset()
+        return output
+
+
+@functools.lru_cache(maxsize=16)
+def design_lowpass(order: int, cutoff: float, sample_rate: int) -> np.ndarray:
+    """Design a Butterworth low-pass filter as second-order sections.
+
+    Args:
+        order: Filter order
+        cutoff: Cutoff frequency in Hz
+        sample_rate: Sample rate in Hz
+
+    Returns:
+        Second-order sections, shared between callers
+    """
+    sos = signal.butter(order, cutoff, btype="low", fs=sample_rate, output="sos").astype(np.float32)
+    sos.setflags(write=False)
+    return sos
+
+
+_EMPTY = np.zeros(0, dtype=np.float32)
+_EMPTY.setflags(write=False)
+
+
+class ProcessingStage:
+    """A stateful stage that transforms audio one block at a time.
+
+    Stages may change their input block in place, and the block they return may
+    be reused by their next call.
+    """
+
+    removed_samples = 0
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Process one block of mono float32 audio."""
+        raise NotImplementedError
+
+    def flush(self) -> np.ndarray:
+        """Return any audio held back by the stage at the end of a signal."""
+        return _EMPTY
+
+    def reset(self) -> None:
+        """Start a new signal."""
+
+
+class ResampleStage(ProcessingStage):
+    """Converts blocks from the capture rate to the model rate."""
+
+    def __init__(self, orig_sr: int, target_sr: int):
+        self.resampler = StreamingResampler(orig_sr, target_sr)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        return self.resampler.process(block)
+
+    def flush(self) -> np.ndarray:
+        return self.resampler.flush()
+
+    def reset(self) -> None:
+        self.resampler.reset()
+
+
+class DCRemovalStage(ProcessingStage):
+    """Subtracts a running estimate of the DC offset in place."""
+
+    def __init__(self, smoothing: float = 0.1):
+        """Initialize the stage.
+
+        Args:
+            smoothing: Weight of each block mean in the running estimate
+        """
+        self.smoothing = smoothing
+        self.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block
+        mean = float(block.mean())
+        self._offset = mean if self._offset is None else self._offset + self.smoothing * (mean - self._offset)
+        np.subtract(block, self._offset, out=block)
+        return block
+
+    def reset(self) -> None:
+        self._offset = None
+
+
+class LowPassStage(ProcessingStage):
+    """Butterworth low-pass filter that carries its state across blocks."""
+
+    def __init__(self, sample_rate: int, cutoff: float = 2000.0, order: int = 4):
+        """Initialize the stage.
+
+        Args:
+            sample_rate: Sample rate of the blocks
+            cutoff: Cutoff frequency in Hz
+            order: Filter order
+        """
+        # sosfilt needs a writable copy of the shared design
+        self._sos = design_lowpass(order, cutoff, sample_rate).copy()
+        self.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block
+        filtered, self._state = signal.sosfilt(self._sos, block, zi=self._state)
+        return filtered
+
+    def reset(self) -> None:
+        self._state = np.zeros((self._sos.shape[0], 2), dtype=np.float32)
+
+
+class NoiseGateStage(ProcessingStage):
+    """Zeroes samples below a multiple of an adaptively tracked noise floor."""
+
+    def __init__(self, ratio: float = 2.0, adapt_rate: float = 0.05):
+        """Initialize the stage.
+
+        Args:
+            ratio: Gate threshold as a multiple of the noise floor
+            adapt_rate: Smoothing factor for rising noise floor updates
+        """
+        self.ratio = ratio
+        self.adapt_rate = adapt_rate
+        self._magnitude = np.zeros(0, dtype=np.float32)
+        self._mask = np.zeros(0, dtype=bool)
+        self.reset()
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block
+        if len(self._magnitude) < len(block):
+            self._magnitude = np.zeros(len(block), dtype=np.float32)
+            self._mask = np.zeros(len(block), dtype=bool)
+        magnitude = np.abs(block, out=self._magnitude[: len(block)])
+        level = float(magnitude.mean())
+
+        # Follow drops in the noise floor immediately and rises slowly; blocks well
+        # above the floor are treated as speech and leave it unchanged
+        if self.noise_floor is None or level < self.noise_floor:
+            self.noise_floor = level
+        elif level < self.noise_floor * self.ratio * 2:
+            self.noise_floor += self.adapt_rate * (level - self.noise_floor)
+
+        mask = np.less(magnitude, self.noise_floor * self.ratio, out=self._mask[: len(block)])
+        np.putmask(block, mask, 0)
+        return block
+
+    def reset(self) -> None:
+        self.noise_floor = None
+
+
+class SilenceTrimStage(ProcessingStage):
+    """Drops leading and trailing silence, keeping a short pad around speech.
+
+    Silence is held back until it is known whether speech follows. If no speech
+    is detected at all, the audio is passed through untrimmed.
+    """
+
+    def __init__(self, sample_rate: int, lead_pad: float = 0.3, trail_pad: float = 0.3, max_pending: float = 30.0):
+        """Initialize the stage.
+
+        Args:
+            sample_rate: Sample rate of the blocks
+            lead_pad: Seconds of silence kept before the first speech
+            trail_pad: Seconds of silence kept after the last speech
+            max_pending: Maximum seconds of silence held back
+        """
+        from kubewhisper.audio.ring_buffer import AudioRingBuffer
+        from kubewhisper.audio.vad import VoiceActivityDetector
+
+        self.vad = VoiceActivityDetector(sample_rate=sample_rate)
+        self.lead_pad = int(lead_pad * sample_rate)
+        self.trail_pad = int(trail_pad * sample_rate)
+        self._pending = AudioRingBuffer(int(max_pending * sample_rate))
+        self.reset()
+
+    def _take_pending(self, keep: int = None, from_end: bool = False) -> np.ndarray:
+        """Return held-back silence, counting whatever is not returned as removed."""
+        start, end = self._pending.oldest_position, self._pending.write_position
+        if keep is not None and end - start > keep:
+            start, end = (end - keep, end) if from_end else (start, start + keep)
+        self.removed_samples += self._pending.write_position - (end - start)
+        pending = self._pending.read(start, end)
+        self._pending.reset()
+        return pending
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        if len(block) == 0:
+            return block
+        if not self.vad.process(block):
+            self._pending.write(block)
+            return _EMPTY
+
+        pending = self._take_pending(keep=None if self._seen_speech else self.lead_pad, from_end=True)
+        self._seen_speech = True
+        return np.concatenate([pending, block]) if len(pending) else block
+
+    def flush(self) -> np.ndarray:
+        return self._take_pending(keep=self.trail_pad if self._seen_speech else None)
+
+    def reset(self) -> None:
+        self.vad.reset()
+        self._pending.reset()
+        self._seen_speech = False
+        self.removed_samples = 0
+
+
+class ProcessingChain:
+    """Runs blocks through a sequence of streaming stages."""
+
+    def __init__(self, stages: List[ProcessingStage]):
+        """Initialize the chain.
+
+        Args:
+            stages: Stages applied in order
+        """
+        self.stages = stages
+
+    @property
+    def removed_samples(self) -> int:
+        """Number of samples the stages removed from the current signal."""
+        return sum(stage.removed_samples for stage in self.stages)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Run one block through every stage."""
+        for stage in self.stages:
+            block = stage.process(block)
+        return block
+
+    def flush(self) -> np.ndarray:
+        """Drain every stage at the end of a signal, in order."""
+        block = _EMPTY
+        for stage in self.stages:
+            processed = stage.process(block) if len(block) else _EMPTY
+            block = np.concatenate([processed, stage.flush()])
+        return block.astype(np.float32, copy=False)
+
+    def reset(self) -> None:
+        """Start a new signal in every stage."""
+        for stage in self.stages:
+            stage.reset()
+
+
+DEFAULT_STAGES = ("dc_removal", "lowpass", "noise_gate", "silence_trim")
+
+
+def select_stages(noise_reduction: bool = True, trim_silence: bool = True) -> List[str]:
+    """Return the default stage names for the given options.
+
+    Args:
+        noise_reduction: Include the low-pass filter and noise gate
+        trim_silence: Include silence trimming
+
+    Returns:
+        Stage names for build_preprocessing_chain
+    """
+    stages = ["dc_removal"]
+    if noise_reduction:
+        stages += ["lowpass", "noise_gate"]
+    if trim_silence:
+        stages.append("silence_trim")
+    return stages
+
+
+def build_preprocessing_chain(
+    orig_sr: int,
+    target_sr: int,
+    stages: Sequence[str] = DEFAULT_STAGES,
+    lowpass_cutoff: float = 2000.0,
+    gate_ratio: float = 2.0,
+    trim_pad: float = 0.3,
+) -> ProcessingChain:
+    """Build the capture preprocessing chain. Resampling always comes first.
+
+    Args:
+        orig_sr: Sample rate of the captured blocks
+        target_sr: Sample rate expected by the model
+        stages: Names of the stages after resampling, from DEFAULT_STAGES
+        lowpass_cutoff: Low-pass cutoff frequency in Hz
+        gate_ratio: Noise gate threshold as a multiple of the noise floor
+        trim_pad: Seconds of silence kept around speech when trimming
+
+    Returns:
+        The configured chain
+    """
+    factories = {
+        "dc_removal": lambda: DCRemovalStage(),
+        "lowpass": lambda: LowPassStage(target_sr, cutoff=lowpass_cutoff),
+        "noise_gate": lambda: NoiseGateStage(ratio=gate_ratio),
+        "silence_trim": lambda: SilenceTrimStage(target_sr, lead_pad=trim_pad, trail_pad=trim_pad),
+    }
+    unknown = set(stages) - set(factories)
+    if unknown:
+        raise ValueError(f"Unknown preprocessing stages: {', '.join(sorted(unknown))}")
+
+    return ProcessingChain([ResampleStage(orig_sr, target_sr), *(factories[name]() for name in stages)])
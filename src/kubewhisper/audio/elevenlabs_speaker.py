@@ -1,9 +1,15 @@
 import os
+import shutil
+import subprocess
+import threading
 from typing import Optional, Any
 from elevenlabs import ElevenLabs, stream
 
+from kubewhisper import tracing
+from kubewhisper.audio.tts_pipeline import SpeechBackend
 
-class ElevenLabsSpeaker:
+
+class ElevenLabsSpeaker(SpeechBackend):
     """
     A class for converting text to speech using the ElevenLabs API.
 
@@ -13,11 +19,14 @@ class ElevenLabsSpeaker:
         default_model_id (str): Default model ID to use for synthesis.
     """
 
+    PLAYBACK_CHUNK = 4096
+
     def __init__(
         self,
         api_key: Optional[str] = None,
         default_voice_id: str = "9BWtsMINqrJLrRacOk9x",
         default_model_id: str = "eleven_multilingual_v2",
+        base_url: Optional[str] = None,
     ):
         """Initialize the ElevenLabsSpeaker.
 
@@ -25,8 +34,13 @@ class ElevenLabsSpeaker:
             api_key: Optional API key for ElevenLabs. If not provided, reads from ELEVENLABS_API_KEY env var.
             default_voice_id: Default voice ID to use for speech synthesis.
             default_model_id: Default model ID to use for speech synthesis.
+            base_url: Optional API endpoint, e.g. a local stand-in. Falls back to ELEVENLABS_API_BASE, then the
+                public API.
         """
-        self.client = ElevenLabs(api_key=api_key or os.environ.get("ELEVENLABS_API_KEY"))
+        self.client = ElevenLabs(
+            api_key=api_key or os.environ.get("ELEVENLABS_API_KEY"),
+            base_url=base_url or os.environ.get("ELEVENLABS_API_BASE"),
+        )
         self.default_voice_id = default_voice_id
         self.default_model_id = default_model_id
 
@@ -54,6 +68,61 @@ class ElevenLabsSpeaker:
 
         return audio_stream
 
+    def synthesize(self, text: str) -> bytes:
+        """Convert one sentence to speech with the default voice and model.
+
+        Args:
+            text: The text to convert to speech.
+
+        Returns:
+            The encoded audio.
+        """
+        tts = self.client.text_to_speech
+        # The streaming call was renamed from convert_as_stream to stream in elevenlabs 2.x
+        convert_as_stream = getattr(tts, "convert_as_stream", None) or tts.stream
+        with tracing.span("tts.synthesize", characters=len(text)):
+            return b"".join(
+                convert_as_stream(text=text, voice_id=self.default_voice_id, model_id=self.default_model_id)
+            )
+
+    def play(self, audio: bytes, interrupted: Optional[threading.Event] = None) -> None:
+        """Play encoded audio with mpv and wait until playback has finished or is interrupted.
+
+        Args:
+            audio: Audio returned by synthesize.
+            interrupted: When set, the mpv process is stopped and playback ends early.
+        """
+        if shutil.which("mpv") is None:
+            raise ValueError("mpv not found, necessary to play audio. Install it from https://mpv.io/")
+
+        interrupted = interrupted or threading.Event()
+        with tracing.span("tts.play", bytes=len(audio)):
+            self._play(audio, interrupted)
+
+    def _play(self, audio: bytes, interrupted: threading.Event) -> None:
+        """Pipe the audio into an mpv process until it has played or is interrupted."""
+        player = subprocess.Popen(
+            ["mpv", "--no-cache", "--no-terminal", "--", "fd://0"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            # Write in chunks so an interruption is noticed while mpv is still reading
+            for start in range(0, len(audio), self.PLAYBACK_CHUNK):
+                if interrupted.is_set():
+                    break
+                player.stdin.write(audio[start : start + self.PLAYBACK_CHUNK])
+            player.stdin.close()
+            while player.poll() is None:
+                if interrupted.wait(0.05):
+                    player.terminate()
+                    break
+        except BrokenPipeError:
+            pass
+        finally:
+            player.wait()
+
     def speak_to_file(
         self, text: str, output_path: str, voice_id: Optional[str] = None, model_id: Optional[str] = None
     ) -> None:
@@ -0,0 +1,200 @@
+"""
+Background audio playback with handles for awaiting and interrupting speech.
+"""
+
+import asyncio
+import contextvars
+import logging
+import queue
+import threading
+import time
+from typing import Callable, Dict, List, Literal, Optional
+
+logger = logging.getLogger(__name__)
+
+PlaybackStatus = Literal["pending", "playing", "done", "interrupted", "failed"]
+
+_FINAL_STATUSES = ("done", "interrupted", "failed")
+_END = object()
+
+
+class PlaybackHandle:
+    """One text being spoken: awaitable, interruptible from any thread, and reporting its status.
+
+    Awaiting the handle returns True once everything was played and False if it
+    was interrupted; it raises the error if synthesis or playback failed.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        """Initialize the handle.
+
+        Args:
+            loop: Event loop on which the handle is awaited
+        """
+        self.status: PlaybackStatus = "pending"
+        self.error: Optional[BaseException] = None
+        self.stats: Dict[str, float] = {"sentences": 0, "characters": 0}
+        self.interrupted = threading.Event()
+        self._loop = loop
+        self._future = loop.create_future()
+        self._lock = threading.Lock()
+        self._start = time.perf_counter()
+        self._on_interrupt: List[Callable[[], None]] = []
+        self._on_done: List[Callable[["PlaybackHandle"], None]] = []
+
+    @property
+    def done(self) -> bool:
+        """Whether playback has finished, was interrupted or failed."""
+        return self.status in _FINAL_STATUSES
+
+    def add_interrupt_callback(self, callback: Callable[[], None]) -> None:
+        """Register a function called, on the interrupting thread, when the handle is interrupted."""
+        self._on_interrupt.append(callback)
+
+    def add_done_callback(self, callback: Callable[["PlaybackHandle"], None]) -> None:
+        """Register a function called with the handle when it finishes, on the finishing thread.
+
+        Called right away if the handle has already finished.
+        """
+        with self._lock:
+            if not self.done:
+                self._on_done.append(callback)
+                return
+        callback(self)
+
+    def interrupt(self) -> None:
+        """Stop speaking: queued audio is dropped and the sentence that is playing is cut off."""
+        if self._finish("interrupted"):
+            self.interrupted.set()
+            for callback in self._on_interrupt:
+                callback()
+
+    def _started(self, characters: int) -> None:
+        """Record that a sentence started playing. Called by the player."""
+        with self._lock:
+            if self.done:
+                return
+            self.status = "playing"
+            if self.stats["sentences"] == 0:
+                self.stats["first_audio_seconds"] = round(time.perf_counter() - self._start, 4)
+                logger.debug(f"First audio after {self.stats['first_audio_seconds']:.3f}s")
+            self.stats["sentences"] += 1
+            self.stats["characters"] += characters
+
+    def _finish(self, status: PlaybackStatus, error: Optional[BaseException] = None) -> bool:
+        """Move to a final status once; returns False if the handle had already finished."""
+        with self._lock:
+            if self.done:
+                return False
+            self.status = status
+            self.error = error
+            self.stats["total_seconds"] = round(time.perf_counter() - self._start, 4)
+            callbacks, self._on_done = self._on_done, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                logger.error(f"Error in playback done callback: {e}")
+        try:
+            self._loop.call_soon_threadsafe(self._resolve)
+        except RuntimeError:
+            # The loop has been closed; nobody can be waiting on it any more
+            pass
+        return True
+
+    def _resolve(self) -> None:
+        if not self._future.done():
+            self._future.set_result(None)
+
+    async def wait(self) -> bool:
+        """Wait until playback has finished.
+
+        Returns:
+            True if everything was played, False if playback was interrupted
+        """
+        # Shielded so that a cancelled waiter does not resolve the handle for other waiters
+        await asyncio.shield(self._future)
+        if self.status == "failed":
+            raise self.error
+        return self.status == "done"
+
+    def __await__(self):
+        return self.wait().__await__()
+
+
+class AudioPlayer:
+    """Plays queued audio on a background thread, in the order it was queued.
+
+    Audio belonging to a handle that has finished (e.g. was interrupted) is
+    skipped, and the backend is asked to cut off the sentence that is playing.
+    Each sentence plays in the context it was queued from, so playback is
+    traced with the query it answers.
+    """
+
+    def __init__(self, backend):
+        """Initialize the player.
+
+        Args:
+            backend: SpeechBackend whose play method outputs the audio
+        """
+        self.backend = backend
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the playback thread if it is not running."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name="tts-playback", daemon=True)
+            self._thread.start()
+
+    def enqueue(self, handle: PlaybackHandle, text: str, audio: bytes, on_start: Optional[Callable] = None) -> None:
+        """Queue a synthesized sentence.
+
+        Args:
+            handle: Handle the sentence belongs to
+            text: The sentence, for statistics
+            audio: Encoded audio of the sentence
+            on_start: Called on the playback thread when the sentence starts playing
+        """
+        self.start()
+        self._queue.put((handle, text, audio, on_start, contextvars.copy_context()))
+
+    def finish(self, handle: PlaybackHandle, error: Optional[BaseException] = None) -> None:
+        """Mark the end of a handle's audio; the handle completes after its queued sentences."""
+        self.start()
+        self._queue.put((handle, None, error if error is not None else _END, None, None))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            handle, text, audio, on_start, context = item
+            if handle.done:
+                continue
+            if audio is _END:
+                handle._finish("done")
+                continue
+            if isinstance(audio, BaseException):
+                handle._finish("failed", audio)
+                continue
+
+            handle._started(len(text))
+            if on_start is not None:
+                on_start()
+            try:
+                context.run(self.backend.play, audio, handle.interrupted)
+            except Exception as e:
+                logger.error(f"Audio playback failed: {e}")
+                handle._finish("failed", e)
+
+    def close(self) -> None:
+        """Stop the playback thread after the audio already queued."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
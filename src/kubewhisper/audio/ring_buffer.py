@@ -0,0 +1,89 @@
+"""
+Preallocated ring buffer for captured audio.
+"""
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Fixed-size float32 ring buffer with a single writer.
+
+    The writer (the audio callback) copies samples in without allocating or
+    locking. Samples are addressed by absolute positions, the number of samples
+    written before them since the last reset. Only the most recent `capacity`
+    samples are kept.
+    """
+
+    def __init__(self, capacity: int):
+        """Allocate the buffer.
+
+        Args:
+            capacity: Maximum number of samples kept
+        """
+        self.capacity = capacity
+        self._data = np.zeros(capacity, dtype=np.float32)
+        # Holds wrapped ranges unrolled into contiguous memory
+        self._scratch = np.zeros(capacity, dtype=np.float32)
+        self._write_position = 0
+
+    @property
+    def write_position(self) -> int:
+        """Absolute position of the next sample to be written."""
+        return self._write_position
+
+    @property
+    def oldest_position(self) -> int:
+        """Absolute position of the oldest sample still in the buffer."""
+        return max(0, self._write_position - self.capacity)
+
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the buffer in bytes."""
+        return self._data.nbytes + self._scratch.nbytes
+
+    def reset(self) -> None:
+        """Forget all samples."""
+        self._write_position = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples, overwriting the oldest ones when full."""
+        count = len(samples)
+        if count > self.capacity:
+            self._write_position += count - self.capacity
+            samples = samples[-self.capacity :]
+            count = self.capacity
+
+        start = self._write_position % self.capacity
+        first = min(count, self.capacity - start)
+        self._data[start : start + first] = samples[:first]
+        self._data[: count - first] = samples[first:]
+        # Publish the new position only after the samples are in place
+        self._write_position += count
+
+    def view(self, start: int, end: int = None) -> np.ndarray:
+        """Return the samples in [start, end) as a contiguous array without allocating.
+
+        The result is a view into the buffer, or into its scratch area when the
+        range wraps around. It is only valid until the range is overwritten or
+        the next wrapped view is taken.
+
+        Raises:
+            ValueError: If part of the range has already been overwritten
+        """
+        end = self._write_position if end is None else end
+        if start < self.oldest_position or end > self._write_position or start > end:
+            raise ValueError(f"Samples {start}-{end} are not in the buffer")
+
+        count = end - start
+        offset = start % self.capacity
+        if offset + count <= self.capacity:
+            return self._data[offset : offset + count]
+
+        first = self.capacity - offset
+        self._scratch[:first] = self._data[offset:]
+        self._scratch[first:count] = self._data[: count - first]
+        return self._scratch[:count]
+
+    def read(self, start: int, end: int = None) -> np.ndarray:
+        """Return a copy of the samples in [start, end)."""
+        return self.view(start, end).copy()
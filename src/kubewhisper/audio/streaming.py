@@ -0,0 +1,178 @@
+"""
+Streaming transcription with local-agreement commits.
+
+While the user is still speaking, the buffered audio is transcribed
+repeatedly. Words on which two consecutive hypotheses agree are committed and
+never change again, and the audio they cover is trimmed from the buffer, so
+finalizing an utterance only has to transcribe the trailing few seconds.
+"""
+
+import logging
+import string
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# (start seconds, end seconds, text) of a recognized word
+Word = Tuple[float, float, str]
+
+# Transcribes audio (float32 at the session sample rate) given a context prompt,
+# returning words with timestamps relative to the start of the audio
+WordTranscriber = Callable[[np.ndarray, str], List[Word]]
+
+_PUNCTUATION = str.maketrans("", "", string.punctuation)
+
+
+def _normalize_word(text: str) -> str:
+    """Normalize a word for agreement comparison."""
+    return text.strip().lower().translate(_PUNCTUATION)
+
+
+def join_words(words: List[Word]) -> str:
+    """Join recognized words into text."""
+    return "".join(text if text.startswith(" ") else f" {text}" for _, _, text in words).strip()
+
+
+class HypothesisBuffer:
+    """Commits the longest prefix on which two consecutive hypotheses agree."""
+
+    def __init__(self):
+        """Initialize an empty buffer."""
+        self.committed_in_buffer: List[Word] = []
+        self.last_committed_time = 0.0
+        self._previous: List[Word] = []
+        self._new: List[Word] = []
+
+    def insert(self, words: List[Word], offset: float) -> None:
+        """Insert a new hypothesis.
+
+        Args:
+            words: Words with timestamps relative to the audio buffer
+            offset: Start of the audio buffer in seconds since the utterance began
+        """
+        words = [(start + offset, end + offset, text) for start, end, text in words]
+        self._new = [word for word in words if word[0] > self.last_committed_time - 0.1]
+
+        # Drop words that repeat the tail of what was already committed
+        if self._new and abs(self._new[0][0] - self.last_committed_time) < 1 and self.committed_in_buffer:
+            for n in range(min(len(self.committed_in_buffer), len(self._new), 5), 0, -1):
+                tail = [_normalize_word(w[2]) for w in self.committed_in_buffer[-n:]]
+                head = [_normalize_word(w[2]) for w in self._new[:n]]
+                if tail == head:
+                    del self._new[:n]
+                    break
+
+    def flush(self) -> List[Word]:
+        """Commit and return the words the previous and the new hypothesis agree on."""
+        commit = []
+        while self._new and self._previous:
+            if _normalize_word(self._new[0][2]) != _normalize_word(self._previous[0][2]):
+                break
+            word = self._new.pop(0)
+            self._previous.pop(0)
+            commit.append(word)
+            self.last_committed_time = word[1]
+
+        self._previous = self._new
+        self._new = []
+        self.committed_in_buffer.extend(commit)
+        return commit
+
+    def pop_committed(self, time: float) -> None:
+        """Forget committed words that end before the given time."""
+        self.committed_in_buffer = [word for word in self.committed_in_buffer if word[1] > time]
+
+    def tentative(self) -> List[Word]:
+        """Return the uncommitted part of the latest hypothesis."""
+        return list(self._previous)
+
+
+class StreamingSession:
+    """Incrementally transcribes one utterance while audio is still arriving."""
+
+    def __init__(
+        self,
+        transcribe_words: WordTranscriber,
+        sample_rate: int = 16000,
+        min_chunk_seconds: float = 1.0,
+        trim_seconds: float = 4.0,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+    ):
+        """Initialize the session.
+
+        Args:
+            transcribe_words: Function transcribing an audio buffer into timestamped words
+            sample_rate: Sample rate of the inserted audio
+            min_chunk_seconds: Minimum buffered audio before a pass is run
+            trim_seconds: Buffer length after which committed audio is trimmed
+            on_partial: Optional callback receiving (committed text, tentative text) after each pass
+        """
+        self.transcribe_words = transcribe_words
+        self.sample_rate = sample_rate
+        self.min_chunk_seconds = min_chunk_seconds
+        self.trim_seconds = trim_seconds
+        self.on_partial = on_partial
+
+        self.committed: List[Word] = []
+        self._hypothesis = HypothesisBuffer()
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_offset = 0.0
+        self._pending_seconds = 0.0
+
+    @property
+    def buffered_seconds(self) -> float:
+        """Duration of the audio that is still buffered for transcription."""
+        return len(self._buffer) / self.sample_rate
+
+    def _prompt(self) -> str:
+        """Return recent committed text used as context for the next pass."""
+        return join_words(self.committed)[-200:]
+
+    def insert_audio(self, audio: np.ndarray) -> None:
+        """Append mono float32 audio to the buffer."""
+        self._buffer = np.concatenate([self._buffer, audio.astype(np.float32, copy=False)])
+        self._pending_seconds += len(audio) / self.sample_rate
+
+    def process_iter(self) -> str:
+        """Run one transcription pass over the buffer.
+
+        Returns:
+            Text newly committed by this pass
+        """
+        if self._pending_seconds < self.min_chunk_seconds:
+            return ""
+        self._pending_seconds = 0.0
+
+        words = self.transcribe_words(self._buffer, self._prompt())
+        self._hypothesis.insert(words, self._buffer_offset)
+        commit = self._hypothesis.flush()
+        self.committed.extend(commit)
+
+        if commit and self.buffered_seconds > self.trim_seconds:
+            self._trim(self._hypothesis.last_committed_time)
+
+        if self.on_partial:
+            self.on_partial(join_words(self.committed), join_words(self._hypothesis.tentative()))
+        return join_words(commit)
+
+    def _trim(self, time: float) -> None:
+        """Drop buffered audio before the given time (seconds since the utterance began)."""
+        cut = int((time - self._buffer_offset) * self.sample_rate)
+        if cut <= 0:
+            return
+        logger.debug(f"Trimming streaming buffer at {time:.2f}s")
+        self._buffer = self._buffer[cut:]
+        self._buffer_offset = time
+        self._hypothesis.pop_committed(time)
+
+    def finish(self) -> str:
+        """Transcribe the remaining tail and return the complete text of the utterance."""
+        if len(self._buffer) > 0:
+            words = self.transcribe_words(self._buffer, self._prompt())
+            self._hypothesis.insert(words, self._buffer_offset)
+            self.committed.extend(self._hypothesis.flush())
+            self.committed.extend(self._hypothesis.tentative())
+        self._buffer = np.zeros(0, dtype=np.float32)
+        return join_words(self.committed)
@@ -0,0 +1,175 @@
+"""
+Background transcription so capture threads never wait for speech recognition.
+"""
+
+import collections
+import contextvars
+import logging
+import threading
+from typing import Callable, Deque, Dict, List, Literal, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+TranscriptionJob = Callable[[], Optional[str]]
+OverflowPolicy = Literal["block", "drop_oldest", "drop_newest"]
+
+_DROPPED = object()
+
+
+class TranscriptionWorker:
+    """Runs transcription jobs on a pool of threads and delivers results in submission order.
+
+    Jobs are callables returning the transcribed text (or None). They are queued
+    by the capture side, transcribed by the pool, and their results are handed to
+    the deliver callback one at a time on a separate delivery thread, in the order
+    the jobs were submitted. A slow callback therefore never holds up the next
+    transcription, and a slow transcription never holds up capture. Jobs and
+    their delivery run in a copy of the submitter's context, so context
+    variables such as the query's trace follow the utterance.
+
+    When max_pending jobs are waiting, the overflow policy decides what happens:
+    "block" makes submit wait for room, "drop_oldest" discards the oldest waiting
+    job and "drop_newest" rejects the new one.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[str], None],
+        workers: int = 1,
+        max_pending: int = 4,
+        overflow: OverflowPolicy = "block",
+    ):
+        """Initialize the worker.
+
+        Args:
+            deliver: Called with each transcription, in submission order
+            workers: Number of transcription threads
+            max_pending: Maximum number of jobs waiting to be transcribed
+            overflow: What to do when max_pending jobs are waiting
+        """
+        if overflow not in ("block", "drop_oldest", "drop_newest"):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        self.deliver = deliver
+        self.workers = workers
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.dropped = 0
+
+        self._lock = threading.Lock()
+        self._jobs_changed = threading.Condition(self._lock)
+        self._results_changed = threading.Condition(self._lock)
+        self._jobs: Deque[Tuple[int, TranscriptionJob, contextvars.Context]] = collections.deque()
+        self._results: Dict[int, Tuple[object, Optional[contextvars.Context]]] = {}
+        self._next_sequence = 0
+        self._next_delivery = 0
+        self._closing = False
+        self._threads: List[threading.Thread] = []
+
+    @property
+    def pending(self) -> int:
+        """Number of submitted jobs whose results have not been delivered yet."""
+        with self._lock:
+            return self._next_sequence - self._next_delivery
+
+    def start(self) -> None:
+        """Start the transcription and delivery threads."""
+        with self._lock:
+            self._closing = False
+        self._threads = [
+            threading.Thread(target=self._run_jobs, name=f"transcription-{i}", daemon=True) for i in range(self.workers)
+        ]
+        self._threads.append(threading.Thread(target=self._run_delivery, name="transcription-delivery", daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, job: TranscriptionJob) -> bool:
+        """Queue a job.
+
+        Args:
+            job: Callable returning the transcription, or None if there is nothing to deliver
+
+        Returns:
+            False if the job was rejected by the "drop_newest" policy or the worker is stopping
+        """
+        with self._lock:
+            while len(self._jobs) >= self.max_pending and not self._closing:
+                if self.overflow == "drop_newest":
+                    self.dropped += 1
+                    logger.warning("Transcription queue full, dropping the new utterance")
+                    return False
+                if self.overflow == "drop_oldest":
+                    sequence, _, _ = self._jobs.popleft()
+                    self._results[sequence] = (_DROPPED, None)
+                    self._results_changed.notify_all()
+                    self.dropped += 1
+                    logger.warning("Transcription queue full, dropping the oldest waiting utterance")
+                else:
+                    self._jobs_changed.wait()
+            if self._closing:
+                return False
+
+            self._jobs.append((self._next_sequence, job, contextvars.copy_context()))
+            self._next_sequence += 1
+            self._jobs_changed.notify_all()
+            return True
+
+    def _run_jobs(self) -> None:
+        """Transcription thread: run queued jobs until the worker stops and the queue is empty."""
+        while True:
+            with self._lock:
+                while not self._jobs and not self._closing:
+                    self._jobs_changed.wait()
+                if not self._jobs:
+                    return
+                sequence, job, context = self._jobs.popleft()
+                # Wake a submitter blocked on a full queue
+                self._jobs_changed.notify_all()
+
+            try:
+                result = context.run(job)
+            except Exception as e:
+                logger.error(f"Error during transcription: {e}")
+                result = None
+
+            with self._lock:
+                self._results[sequence] = (result, context)
+                self._results_changed.notify_all()
+
+    def _run_delivery(self) -> None:
+        """Delivery thread: hand results to the callback in submission order."""
+        while True:
+            with self._lock:
+                while self._next_delivery not in self._results:
+                    if self._closing and self._next_delivery == self._next_sequence:
+                        return
+                    self._results_changed.wait()
+                result, context = self._results.pop(self._next_delivery)
+                self._next_delivery += 1
+
+            if result is None or result is _DROPPED:
+                continue
+            try:
+                context.run(self.deliver, result)
+            except Exception as e:
+                logger.error(f"Error while handling transcription: {e}")
+
+    def stop(self, wait: bool = True) -> None:
+        """Stop the worker.
+
+        Args:
+            wait: Finish and deliver the queued jobs first; otherwise discard them
+        """
+        with self._lock:
+            self._closing = True
+            if not wait:
+                while self._jobs:
+                    sequence, _, _ = self._jobs.popleft()
+                    self._results[sequence] = (_DROPPED, None)
+            self._jobs_changed.notify_all()
+            self._results_changed.notify_all()
+
+        current = threading.current_thread()
+        for thread in self._threads:
+            if thread is not current:
+                thread.join()
+        self._threads = []
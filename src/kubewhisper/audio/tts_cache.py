@@ -0,0 +1,280 @@
+"""
+Content-addressed on-disk cache of synthesized speech.
+
+Audio is stored under the SHA-256 of (text, voice, model), so an answer that
+was spoken before plays from a local file without an API call. Sentences
+produced from a tool's response template are split into the template's static
+fragments and the substituted values; the static fragments can be synthesized
+once at startup and are shared by every answer built from that template.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import string
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from kubewhisper.audio.tts_pipeline import SpeechBackend, split_sentences
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTS_CACHE_PATH = os.path.join("~", ".kubewhisper", "tts-cache")
+
+_FILE_SUFFIX = ".audio"
+
+
+def cache_key(text: str, voice_id: str, model_id: str) -> str:
+    """Return the cache key for a piece of text spoken with a voice and model."""
+    payload = json.dumps([text, voice_id, model_id], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class TTSCache:
+    """Directory of synthesized audio files with least-recently-used eviction.
+
+    The access time of an entry is its file modification time, which is bumped
+    on every hit, so the recency order survives restarts.
+    """
+
+    def __init__(self, directory: str = DEFAULT_TTS_CACHE_PATH, max_bytes: int = 64 * 1024 * 1024):
+        """Open (or create) the cache.
+
+        Args:
+            directory: Directory holding the audio files
+            max_bytes: Total size above which the least recently used entries are removed
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # key -> (size in bytes, last access time)
+        self._entries: Dict[str, Tuple[int, float]] = {}
+        for name in os.listdir(self.directory):
+            if name.endswith(_FILE_SUFFIX):
+                stat = os.stat(os.path.join(self.directory, name))
+                self._entries[name[: -len(_FILE_SUFFIX)]] = (stat.st_size, stat.st_mtime)
+        self._size = sum(size for size, _ in self._entries.values())
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + _FILE_SUFFIX)
+
+    @property
+    def size(self) -> int:
+        """Total size of the cached audio in bytes."""
+        return self._size
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the cached audio for a key, or None."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    audio = f.read()
+                now = time.time()
+                os.utime(path, (now, now))
+            except OSError as e:
+                logger.warning(f"Dropping unreadable TTS cache entry {key}: {e}")
+                self._forget(key)
+                self.misses += 1
+                return None
+            self._entries[key] = (len(audio), now)
+            self.hits += 1
+            return audio
+
+    def put(self, key: str, audio: bytes) -> None:
+        """Store audio under a key and evict old entries if the cache is too large."""
+        path = self._path(key)
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with self._lock:
+            # Write to a temporary file first so readers never see a partial entry
+            with open(temp_path, "wb") as f:
+                f.write(audio)
+            os.replace(temp_path, path)
+            self._forget(key, delete=False)
+            self._entries[key] = (len(audio), time.time())
+            self._size += len(audio)
+            self._evict()
+
+    def _forget(self, key: str, delete: bool = True) -> None:
+        """Remove an entry from the index and optionally its file. Caller holds the lock."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= entry[0]
+        if delete:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the size limit is met. Caller holds the lock."""
+        if self._size <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._size <= self.max_bytes or len(self._entries) == 1:
+                break
+            logger.debug(f"Evicting TTS cache entry {key}")
+            self._forget(key)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and size counters."""
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._size, "hits": self.hits, "misses": self.misses}
+
+
+class TemplateSegmenter:
+    """Splits sentences rendered from response templates into static fragments and values."""
+
+    def __init__(self, templates: Sequence[str], max_chars: int = 200, min_chars: int = 12):
+        """Compile the sentences of each template into patterns.
+
+        Args:
+            templates: Response templates in str.format syntax
+            max_chars: Length above which the TTS pipeline splits a sentence into clauses
+            min_chars: Minimum length of a piece the TTS pipeline synthesizes
+        """
+        self.fragments: List[str] = []
+        self._patterns: List[Tuple[re.Pattern, List[Optional[str]]]] = []
+        seen = set()
+        for template in templates:
+            for sentence in split_sentences(template, max_chars, min_chars):
+                parts = self._parse(sentence)
+                # A sentence without static words would match any text
+                if parts is None or sentence in seen or not any(self._speakable(part) for part in parts):
+                    continue
+                seen.add(sentence)
+                regex = "".join(re.escape(part) if part is not None else "(.+?)" for part in parts)
+                self._patterns.append((re.compile(regex), parts))
+                for part in parts:
+                    fragment = self._speakable(part)
+                    if fragment and fragment not in self.fragments:
+                        self.fragments.append(fragment)
+
+    @staticmethod
+    def _parse(sentence: str) -> Optional[List[Optional[str]]]:
+        """Literal parts of a template sentence with None for each field, or None if it cannot be parsed."""
+        parts: List[Optional[str]] = []
+        try:
+            for literal, field, _, _ in string.Formatter().parse(sentence):
+                if literal:
+                    parts.append(literal)
+                if field is not None:
+                    parts.append(None)
+        except ValueError:
+            return None
+        return parts
+
+    @staticmethod
+    def _speakable(part: Optional[str]) -> Optional[str]:
+        """A literal part as it is synthesized, or None if there is nothing to say."""
+        if part is None:
+            return None
+        text = part.strip().strip("'\"")
+        return text.strip() if re.search(r"\w", text) else None
+
+    def segments(self, sentence: str) -> List[str]:
+        """Split a sentence into the pieces synthesized separately.
+
+        Returns:
+            The static fragments and values of the first matching template sentence,
+            or the whole sentence if no template matches
+        """
+        for pattern, parts in self._patterns:
+            match = pattern.fullmatch(sentence)
+            if match is None:
+                continue
+            values = iter(match.groups())
+            pieces = []
+            for part in parts:
+                piece = self._speakable(part) if part is not None else next(values).strip()
+                if piece:
+                    pieces.append(piece)
+            return pieces
+        return [sentence]
+
+
+class CachedSpeechBackend(SpeechBackend):
+    """Speech backend that serves synthesized audio from a TTSCache.
+
+    Concatenating separately synthesized fragments loses some of the prosody of
+    a whole sentence, in exchange for answers that play without waiting for the
+    synthesis API. The backend must produce audio that can be concatenated, such
+    as MP3 frames.
+    """
+
+    def __init__(
+        self,
+        backend: SpeechBackend,
+        cache: TTSCache,
+        voice_id: str = "",
+        model_id: str = "",
+        templates: Sequence[str] = (),
+    ):
+        """Initialize the cached backend.
+
+        Args:
+            backend: Backend that synthesizes cache misses and plays audio
+            cache: Audio cache
+            voice_id: Voice of the backend, part of the cache key
+            model_id: Model of the backend, part of the cache key
+            templates: Response templates whose sentences are split into fragments
+        """
+        self.backend = backend
+        self.cache = cache
+        self.voice_id = voice_id
+        self.model_id = model_id
+        self.segmenter = TemplateSegmenter(templates)
+
+    def _synthesize_piece(self, text: str) -> bytes:
+        key = cache_key(text, self.voice_id, self.model_id)
+        audio = self.cache.get(key)
+        if audio is None:
+            audio = self.backend.synthesize(text)
+            self.cache.put(key, audio)
+        return audio
+
+    def synthesize(self, text: str) -> bytes:
+        return b"".join(self._synthesize_piece(piece) for piece in self.segmenter.segments(text))
+
+    def play(self, audio: bytes, interrupted: Optional[threading.Event] = None) -> None:
+        self.backend.play(audio, interrupted)
+
+    def prewarm(self) -> int:
+        """Synthesize the static template fragments that are not cached yet.
+
+        Returns:
+            Number of fragments synthesized
+        """
+        missing = [
+            fragment
+            for fragment in self.segmenter.fragments
+            if cache_key(fragment, self.voice_id, self.model_id) not in self.cache
+        ]
+        synthesized = 0
+        for fragment in missing:
+            try:
+                self._synthesize_piece(fragment)
+            except Exception as e:
+                logger.warning(f"Could not pre-synthesize '{fragment}': {e}")
+                break
+            synthesized += 1
+        logger.info(f"TTS cache holds {len(self.segmenter.fragments)} template fragments ({synthesized} new)")
+        return synthesized
@@ -0,0 +1,226 @@
+"""
+Sentence-level speech synthesis pipeline that overlaps synthesis with playback.
+"""
+
+import asyncio
+import logging
+import re
+import threading
+from typing import AsyncIterable, Dict, List, Optional, Union
+
+from kubewhisper.audio.playback import AudioPlayer, PlaybackHandle
+
+logger = logging.getLogger(__name__)
+
+# A sentence ends at terminal punctuation, optionally followed by closing quotes or brackets
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"')\]]*\s+")
+_CLAUSE_END = re.compile(r"(?<=[,;:])\s+")
+
+
+def _call_soon_threadsafe(loop: asyncio.AbstractEventLoop, callback) -> None:
+    """Schedule a callback on a loop from another thread, unless the loop has been closed."""
+    try:
+        loop.call_soon_threadsafe(callback)
+    except RuntimeError:
+        pass
+
+
+class SpeechBackend:
+    """Synthesizes text to encoded audio and plays it back.
+
+    Both methods are blocking; the pipeline synthesizes on worker threads and
+    plays on the playback thread.
+    """
+
+    def synthesize(self, text: str) -> bytes:
+        """Synthesize one sentence.
+
+        Returns:
+            Encoded audio for the sentence
+        """
+        raise NotImplementedError
+
+    def play(self, audio: bytes, interrupted: Optional[threading.Event] = None) -> None:
+        """Play encoded audio and return when playback has finished.
+
+        Args:
+            audio: Audio returned by synthesize
+            interrupted: Set when playback should be cut off
+        """
+        raise NotImplementedError
+
+
+class SentenceSplitter:
+    """Splits incrementally arriving text into sentences, or clauses for long sentences.
+
+    Sentences shorter than min_chars are joined with the next one so that short
+    interjections do not each cost a synthesis request. Text without a sentence
+    end is split at the last clause boundary (or space) once it exceeds max_chars.
+    """
+
+    def __init__(self, max_chars: int = 200, min_chars: int = 12):
+        """Initialize the splitter.
+
+        Args:
+            max_chars: Length above which a sentence is split into clauses
+            min_chars: Minimum length of a piece ending at a sentence boundary
+        """
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """Add text and return the pieces that are complete."""
+        self._buffer += text
+        pieces = []
+        while True:
+            cut = self._next_cut(self._buffer)
+            if cut is None:
+                break
+            self._emit(self._buffer[:cut], pieces)
+            self._buffer = self._buffer[cut:]
+        return pieces
+
+    def flush(self) -> List[str]:
+        """Return the remaining text as pieces and clear the buffer."""
+        pieces = self.feed("")
+        while len(self._buffer) > self.max_chars:
+            cut = self._long_cut(self._buffer)
+            self._emit(self._buffer[:cut], pieces)
+            self._buffer = self._buffer[cut:]
+        self._emit(self._buffer, pieces)
+        self._buffer = ""
+        return pieces
+
+    def _next_cut(self, text: str) -> Optional[int]:
+        """Position after the first complete piece of the text, or None."""
+        for match in _SENTENCE_END.finditer(text):
+            if match.start() >= self.min_chars:
+                if match.start() > self.max_chars:
+                    break
+                return match.end()
+        if len(text) > self.max_chars:
+            return self._long_cut(text)
+        return None
+
+    def _long_cut(self, text: str) -> int:
+        """Position at which a piece longer than max_chars is split."""
+        head = text[: self.max_chars + 1]
+        clauses = [match.end() for match in _CLAUSE_END.finditer(head)]
+        if clauses:
+            return clauses[-1]
+        space = head.rfind(" ")
+        return space + 1 if space > 0 else self.max_chars
+
+    @staticmethod
+    def _emit(piece: str, pieces: List[str]) -> None:
+        piece = piece.strip()
+        if piece:
+            pieces.append(piece)
+
+
+def split_sentences(text: str, max_chars: int = 200, min_chars: int = 12) -> List[str]:
+    """Split complete text into the pieces the pipeline synthesizes one at a time."""
+    splitter = SentenceSplitter(max_chars, min_chars)
+    return splitter.feed(text) + splitter.flush()
+
+
+class TTSPipeline:
+    """Speaks text sentence by sentence, synthesizing the next sentences while one plays.
+
+    speak() returns a PlaybackHandle right away. Sentences are synthesized on
+    worker threads and played on a background playback thread, so the event
+    loop stays free while an answer is spoken. At most `prefetch` synthesized
+    sentences wait for playback. Speaking a new text interrupts the one in
+    progress, as does interrupt(), e.g. when the user starts speaking.
+    """
+
+    def __init__(self, backend: SpeechBackend, prefetch: int = 2, max_chars: int = 200, min_chars: int = 12):
+        """Initialize the pipeline.
+
+        Args:
+            backend: Synthesis and playback backend
+            prefetch: Maximum number of synthesized sentences waiting for playback
+            max_chars: Length above which a sentence is split into clauses
+            min_chars: Minimum length of a synthesized piece
+        """
+        self.backend = backend
+        self.prefetch = prefetch
+        self.max_chars = max_chars
+        self.min_chars = min_chars
+        self.player = AudioPlayer(backend)
+        self._current: Optional[PlaybackHandle] = None
+
+    @property
+    def is_speaking(self) -> bool:
+        """Whether a text is being spoken."""
+        return self._current is not None and not self._current.done
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Statistics of the text spoken last."""
+        return self._current.stats if self._current is not None else {}
+
+    def speak(self, text: Union[str, AsyncIterable[str]]) -> PlaybackHandle:
+        """Start speaking a complete text, or text chunks as they are generated.
+
+        Must be called on the event loop, which runs the synthesis.
+
+        Args:
+            text: The text, or an async iterable of text chunks
+
+        Returns:
+            Handle to await, interrupt or query the playback
+        """
+        self.interrupt()
+        loop = asyncio.get_running_loop()
+        handle = PlaybackHandle(loop)
+        task = loop.create_task(self._synthesize(text, handle))
+        handle.add_interrupt_callback(lambda: _call_soon_threadsafe(loop, task.cancel))
+        self._current = handle
+        return handle
+
+    def interrupt(self) -> None:
+        """Stop speaking the current text. Safe to call from any thread."""
+        handle = self._current
+        if handle is not None and not handle.done:
+            logger.info("Interrupting speech output")
+            handle.interrupt()
+
+    def close(self) -> None:
+        """Interrupt speech and stop the playback thread."""
+        self.interrupt()
+        self.player.close()
+
+    async def _synthesize(self, text: Union[str, AsyncIterable[str]], handle: PlaybackHandle) -> None:
+        """Synthesize the sentences of the text and queue them for playback."""
+        loop = asyncio.get_running_loop()
+        slots = asyncio.Semaphore(self.prefetch)
+
+        def release_slot():
+            _call_soon_threadsafe(loop, slots.release)
+
+        try:
+            async for sentence in self._sentences(text):
+                await slots.acquire()
+                audio = await asyncio.to_thread(self.backend.synthesize, sentence)
+                self.player.enqueue(handle, sentence, audio, on_start=release_slot)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.error(f"Speech synthesis failed: {e}")
+            self.player.finish(handle, e)
+            return
+        self.player.finish(handle)
+
+    async def _sentences(self, text: Union[str, AsyncIterable[str]]):
+        splitter = SentenceSplitter(self.max_chars, self.min_chars)
+        if isinstance(text, str):
+            for sentence in splitter.feed(text) + splitter.flush():
+                yield sentence
+            return
+        async for chunk in text:
+            for sentence in splitter.feed(chunk):
+                yield sentence
+        for sentence in splitter.flush():
+            yield sentence
@@ -0,0 +1,201 @@
+"""
+Voice activity detection and utterance endpointing.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class VoiceActivityDetector:
+    """Frame-level energy and spectral voice-activity detector with an adaptive noise floor.
+
+    A frame is voiced when its energy is a margin above the tracked noise floor,
+    most of its energy lies in the speech band and its spectrum is not flat.
+    Detection is held for a number of hangover frames after the last voiced frame.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_duration: float = 0.02,
+        threshold_db: float = 9.0,
+        min_band_ratio: float = 0.5,
+        max_flatness: float = 0.4,
+        hangover_frames: int = 8,
+        noise_adapt_rate: float = 0.05,
+        min_noise_db: float = -80.0,
+    ):
+        """Initialize the detector.
+
+        Args:
+            sample_rate: Sample rate of the analysed audio
+            frame_duration: Analysis frame length in seconds
+            threshold_db: Required energy above the noise floor for speech
+            min_band_ratio: Required share of energy in the 300-3400 Hz band
+            max_flatness: Maximum spectral flatness (1.0 is white noise) for speech
+            hangover_frames: Frames speech is held after the last voiced frame
+            noise_adapt_rate: Smoothing factor for rising noise floor updates
+            min_noise_db: Lower bound of the noise floor estimate
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_duration)
+        self.threshold_db = threshold_db
+        self.min_band_ratio = min_band_ratio
+        self.max_flatness = max_flatness
+        self.hangover_frames = hangover_frames
+        self.noise_adapt_rate = noise_adapt_rate
+        self.min_noise_db = min_noise_db
+
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_length, 1 / sample_rate)
+        self._speech_band = (freqs >= 300) & (freqs <= 3400)
+        self._remainder = np.zeros(0, dtype=np.float32)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the noise floor and hangover state."""
+        self.noise_floor_db: Optional[float] = None
+        self._hangover = 0
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def _frame_features(self, frames: np.ndarray):
+        """Compute energy (dB), speech band ratio and spectral flatness for each frame."""
+        energy_db = 10 * np.log10(np.mean(frames**2, axis=1) + 1e-12)
+        power = np.abs(np.fft.rfft(frames * self._window, axis=1)) ** 2 + 1e-12
+        total = np.sum(power, axis=1)
+        band_ratio = np.sum(power[:, self._speech_band], axis=1) / total
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        return energy_db, band_ratio, flatness
+
+    def process(self, block: np.ndarray) -> bool:
+        """Analyse a block of mono audio.
+
+        Args:
+            block: Mono audio samples
+
+        Returns:
+            True if speech is active in this block (including hangover)
+        """
+        samples = np.concatenate([self._remainder, block.astype(np.float32, copy=False)])
+        n_frames = len(samples) // self.frame_length
+        self._remainder = samples[n_frames * self.frame_length :]
+        if n_frames == 0:
+            return self._hangover > 0
+
+        frames = samples[: n_frames * self.frame_length].reshape(n_frames, self.frame_length)
+        energies, band_ratios, flatnesses = self._frame_features(frames)
+
+        active = False
+        for energy_db, band_ratio, flatness in zip(energies, band_ratios, flatnesses):
+            if self.noise_floor_db is None:
+                self.noise_floor_db = max(energy_db, self.min_noise_db)
+
+            voiced = (
+                energy_db > self.noise_floor_db + self.threshold_db
+                and band_ratio >= self.min_band_ratio
+                and flatness <= self.max_flatness
+            )
+            if voiced:
+                self._hangover = self.hangover_frames
+            else:
+                # Follow drops in the noise floor immediately and rises slowly
+                if energy_db < self.noise_floor_db:
+                    self.noise_floor_db = max(energy_db, self.min_noise_db)
+                else:
+                    self.noise_floor_db += self.noise_adapt_rate * (energy_db - self.noise_floor_db)
+                self._hangover = max(self._hangover - 1, 0)
+            active = active or voiced or self._hangover > 0
+
+        return active
+
+
+class UtteranceSegmenter:
+    """Turns a continuous block stream into utterances using voice activity and trailing silence.
+
+    Utterances are reported as (start, end) sample positions counted from the
+    last reset, so the audio itself can stay in the capture buffer.
+    """
+
+    def __init__(
+        self,
+        vad: VoiceActivityDetector,
+        pre_roll: float = 0.3,
+        min_speech: float = 0.3,
+        end_silence: float = 0.6,
+        max_utterance: float = 15.0,
+    ):
+        """Initialize the segmenter.
+
+        Args:
+            vad: Voice activity detector, configured for the block sample rate
+            pre_roll: Seconds of audio kept before speech onset
+            min_speech: Minimum seconds of speech for an utterance to be emitted
+            end_silence: Seconds of trailing silence that end an utterance
+            max_utterance: Maximum utterance length in seconds
+        """
+        self.vad = vad
+        self.sample_rate = vad.sample_rate
+        self.pre_roll = int(pre_roll * self.sample_rate)
+        self.min_speech = int(min_speech * self.sample_rate)
+        self.end_silence = int(end_silence * self.sample_rate)
+        self.max_utterance = int(max_utterance * self.sample_rate)
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard any utterance in progress and restart position counting."""
+        self._position = 0
+        self._start: Optional[int] = None
+        self._speech_samples = 0
+        self._silence_samples = 0
+
+    @property
+    def in_utterance(self) -> bool:
+        """Whether an utterance is currently being captured."""
+        return self._start is not None
+
+    def process(self, block: np.ndarray) -> Optional[Tuple[int, int]]:
+        """Feed one block of mono audio.
+
+        Returns:
+            (start, end) positions of the completed utterance when trailing silence
+            ends it, otherwise None
+        """
+        speech = self.vad.process(block)
+        block_start = self._position
+        self._position += len(block)
+
+        if self._start is None:
+            if not speech:
+                return None
+            logger.debug("Speech onset detected")
+            self._start = max(block_start - self.pre_roll, 0)
+            self._speech_samples = 0
+            self._silence_samples = 0
+
+        if speech:
+            self._speech_samples += len(block)
+            self._silence_samples = 0
+        else:
+            self._silence_samples += len(block)
+
+        if self._silence_samples >= self.end_silence or self._position - self._start >= self.max_utterance:
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[Tuple[int, int]]:
+        """End the utterance in progress.
+
+        Returns:
+            (start, end) positions of the utterance if it contained enough speech, otherwise None
+        """
+        start, speech_samples = self._start, self._speech_samples
+        self._start = None
+        if start is None or speech_samples < self.min_speech:
+            return None
+
+        logger.debug(f"Utterance ended after {speech_samples / self.sample_rate:.2f}s of speech")
+        return start, self._position
@@ -0,0 +1,447 @@
+"""
+Always-on wake-word spotting over incrementally computed log-mel features.
+"""
+
+import functools
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from kubewhisper.audio.dsp import build_preprocessing_chain
+from kubewhisper.audio.wav_io import iter_blocks, read_audio_file
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=4)
+def mel_filterbank(sample_rate: int, n_fft: int, n_mels: int, fmin: float = 60.0, fmax: float = 7600.0) -> np.ndarray:
+    """Build a triangular mel filterbank.
+
+    Args:
+        sample_rate: Sample rate in Hz
+        n_fft: FFT size
+        n_mels: Number of mel bands
+        fmin: Lowest band edge in Hz
+        fmax: Highest band edge in Hz, capped at the Nyquist frequency
+
+    Returns:
+        Filterbank shaped (n_fft // 2 + 1, n_mels), shared between callers
+    """
+    fmax = min(fmax, sample_rate / 2)
+    mels = np.linspace(2595 * np.log10(1 + fmin / 700), 2595 * np.log10(1 + fmax / 700), n_mels + 2)
+    edges = 700 * (10 ** (mels / 2595) - 1)
+    freqs = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+
+    lower, center, upper = edges[:-2], edges[1:-1], edges[2:]
+    rising = (freqs[:, None] - lower) / (center - lower)
+    falling = (upper - freqs[:, None]) / (upper - center)
+    bank = np.maximum(0, np.minimum(rising, falling)).astype(np.float32)
+    bank.setflags(write=False)
+    return bank
+
+
+class LogMelFrontEnd:
+    """Computes log-mel frames incrementally from blocks of audio.
+
+    Samples that do not yet fill a frame are carried over to the next block, so
+    block boundaries do not change the features.
+    """
+
+    def __init__(
+        self,
+        sample_rate: int = 16000,
+        frame_duration: float = 0.025,
+        hop_duration: float = 0.01,
+        n_mels: int = 40,
+    ):
+        """Initialize the front end.
+
+        Args:
+            sample_rate: Sample rate of the audio
+            frame_duration: Analysis frame length in seconds
+            hop_duration: Time between frames in seconds
+            n_mels: Number of mel bands
+        """
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_duration)
+        self.base_hop = int(sample_rate * hop_duration)
+        self.n_mels = n_mels
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()
+        self._window = np.hanning(self.frame_length).astype(np.float32)
+        self._filterbank = mel_filterbank(sample_rate, self.n_fft, n_mels)
+        self.stride = 1
+        self.reset()
+
+    @property
+    def hop(self) -> int:
+        """Samples between frames at the current stride."""
+        return self.base_hop * self.stride
+
+    def reset(self) -> None:
+        """Forget carried-over samples."""
+        self._remainder = np.zeros(0, dtype=np.float32)
+
+    def process(self, block: np.ndarray) -> np.ndarray:
+        """Compute the frames completed by a block.
+
+        Args:
+            block: Mono audio samples
+
+        Returns:
+            Log-mel features shaped (frames, n_mels)
+        """
+        samples = np.concatenate([self._remainder, block.astype(np.float32, copy=False)])
+        if len(samples) < self.frame_length:
+            self._remainder = samples
+            return np.zeros((0, self.n_mels), dtype=np.float32)
+
+        n_frames = 1 + (len(samples) - self.frame_length) // self.hop
+        frames = np.lib.stride_tricks.sliding_window_view(samples, self.frame_length)[:: self.hop][:n_frames]
+        self._remainder = samples[n_frames * self.hop :]
+
+        power = np.abs(np.fft.rfft(frames * self._window, n=self.n_fft, axis=1)) ** 2
+        return np.log(power.astype(np.float32) @ self._filterbank + 1e-10)
+
+
+@functools.lru_cache(maxsize=4)
+def dct_matrix(n_mels: int, n_ceps: int) -> np.ndarray:
+    """Orthonormal DCT-II basis shaped (n_mels, n_ceps), without the c0 (energy) row."""
+    bands = np.arange(n_mels) + 0.5
+    basis = np.cos(np.pi / n_mels * np.outer(bands, np.arange(1, n_ceps + 1))) * np.sqrt(2 / n_mels)
+    basis = basis.astype(np.float32)
+    basis.setflags(write=False)
+    return basis
+
+
+def normalize_features(features: np.ndarray, n_ceps: int = 13) -> np.ndarray:
+    """Convert log-mel frames to unit-length cepstra.
+
+    Dropping c0 makes frames independent of gain, and the cepstra weigh formant
+    structure more than the overall spectral tilt that all voiced sounds share.
+    """
+    cepstra = features @ dct_matrix(features.shape[1], n_ceps)
+    return cepstra / (np.linalg.norm(cepstra, axis=1, keepdims=True) + 1e-8)
+
+
+class TemplateSpotter:
+    """Streaming subsequence DTW of the incoming frames against one enrolled template.
+
+    The alignment may start at any frame. Each step advances the template by 0, 1
+    or 2 frames, so every column of the cost matrix only depends on the previous
+    one and is computed for the whole template at once. The score is the mean
+    cosine distance along the best path ending at the template's last frame.
+    """
+
+    def __init__(self, template: np.ndarray):
+        """Initialize the spotter.
+
+        Args:
+            template: Normalized template features shaped (frames, coefficients)
+        """
+        self.template = template
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget partial alignments."""
+        length = len(self.template)
+        self._cost = np.full(length, np.inf, dtype=np.float32)
+        self._steps = np.ones(length, dtype=np.float32)
+
+    def process(self, frames: np.ndarray) -> np.ndarray:
+        """Advance the alignment over normalized frames.
+
+        Returns:
+            The score after each frame
+        """
+        distances = 1.0 - frames @ self.template.T
+        scores = np.empty(len(frames), dtype=np.float32)
+        cost, steps = self._cost, self._steps
+        for t, distance in enumerate(distances):
+            # Predecessors: previous template frame (or a fresh start), same frame, or two frames back
+            diagonal_cost = np.concatenate(([0.0], cost[:-1]))
+            diagonal_steps = np.concatenate(([0.0], steps[:-1]))
+            skip_cost = np.concatenate(([np.inf, np.inf], cost[:-2]))
+            skip_steps = np.concatenate(([1.0, 1.0], steps[:-2]))
+
+            candidates = np.stack([diagonal_cost, cost, skip_cost])
+            candidate_steps = np.stack([diagonal_steps, steps, skip_steps])
+            best = np.argmin(candidates / np.maximum(candidate_steps, 1.0), axis=0)
+            columns = np.arange(len(cost))
+            cost = candidates[best, columns] + distance
+            steps = candidate_steps[best, columns] + 1.0
+            scores[t] = cost[-1] / steps[-1]
+
+        self._cost, self._steps = cost, steps
+        return scores
+
+
+class CPUBudget:
+    """Keeps the detector's CPU time under a fraction of the audio time it processes.
+
+    Above half the budget, work is reduced by computing features at a coarser
+    stride. As a hard limit, blocks are skipped while the CPU time spent exceeds
+    the budget earned by the audio seen so far.
+    """
+
+    def __init__(self, budget: float = 0.05, max_stride: int = 3, burst: float = 1.0, smoothing: float = 0.1):
+        """Initialize the budget.
+
+        Args:
+            budget: Allowed CPU seconds per second of audio (0.05 is 5% of one core)
+            max_stride: Largest feature stride used to reduce work
+            burst: Seconds of audio whose unused budget may be saved up
+            smoothing: Weight of each block in the running usage estimate
+        """
+        self.budget = budget
+        self.max_stride = max_stride
+        self.burst = burst
+        self.smoothing = smoothing
+        self.stride = 1
+        self.usage = 0.0
+        self.cpu_seconds = 0.0
+        self.audio_seconds = 0.0
+        self._balance = 0.0
+
+    def allow(self) -> bool:
+        """Whether the next block may be processed."""
+        return self._balance >= 0
+
+    def account(self, cpu_seconds: float, audio_seconds: float) -> None:
+        """Record the CPU time spent on a block of audio and adapt the stride."""
+        self.cpu_seconds += cpu_seconds
+        self.audio_seconds += audio_seconds
+        self._balance = min(self._balance + self.budget * audio_seconds - cpu_seconds, self.budget * self.burst)
+        if audio_seconds <= 0 or cpu_seconds <= 0:
+            return
+
+        self.usage += self.smoothing * (cpu_seconds / audio_seconds - self.usage)
+        if self.usage > self.budget / 2 and self.stride < self.max_stride:
+            self.stride += 1
+            self.usage /= 2
+        elif self.usage < self.budget / 8 and self.stride > 1:
+            self.stride -= 1
+            self.usage *= 2
+
+    @property
+    def cpu_fraction(self) -> float:
+        """CPU seconds spent per second of audio so far."""
+        return self.cpu_seconds / self.audio_seconds if self.audio_seconds > 0 else 0.0
+
+
+class WakeWordDetector:
+    """Spots a wake phrase by matching the incoming audio against enrolled recordings of it."""
+
+    def __init__(
+        self,
+        templates: Sequence[np.ndarray],
+        sample_rate: int = 16000,
+        threshold: float = 0.12,
+        cpu_budget: Optional[float] = 0.05,
+        refractory: float = 1.0,
+        stages: Sequence[str] = ("dc_removal",),
+    ):
+        """Initialize the detector.
+
+        Args:
+            templates: Log-mel features of the wake phrase, one array per recording
+            sample_rate: Sample rate of the audio blocks
+            threshold: Maximum mean cosine distance for a detection; calibrate it with
+                measure_false_accepts on background audio from the operator's environment
+            cpu_budget: Allowed CPU seconds per second of audio, or None for no limit
+            refractory: Seconds after a detection during which no new detection is reported
+            stages: Preprocessing stages applied to the audio before it reaches the detector,
+                applied to enrollment and background recordings as well
+        """
+        if not templates:
+            raise ValueError("At least one wake word template is needed")
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.refractory = refractory
+        self.stages = tuple(stages)
+        self.frontend = LogMelFrontEnd(sample_rate)
+        self.budget = CPUBudget(cpu_budget) if cpu_budget is not None else None
+        self._templates = [normalize_features(template).astype(np.float32) for template in templates]
+        self.blocks = 0
+        self.skipped_blocks = 0
+        self.best_score = np.inf
+        self._set_stride(1)
+        self.reset()
+
+    @classmethod
+    def from_recordings(
+        cls, paths: Sequence[str], sample_rate: int = 16000, stages: Sequence[str] = ("dc_removal",), **kwargs
+    ) -> "WakeWordDetector":
+        """Create a detector from recordings of the wake phrase.
+
+        Args:
+            paths: WAV files, each containing the wake phrase once
+            sample_rate: Sample rate of the audio the detector will see
+            stages: Preprocessing stages applied before the detector
+            **kwargs: Passed to the constructor
+
+        Returns:
+            The detector
+        """
+        templates = []
+        for path in paths:
+            audio, file_sample_rate = read_audio_file(path)
+            samples = preprocess_recording(audio, file_sample_rate, sample_rate, stages)
+            templates.append(trim_template(LogMelFrontEnd(sample_rate).process(samples)))
+        logger.info(f"Enrolled wake word from {len(templates)} recordings")
+        return cls(templates, sample_rate=sample_rate, stages=stages, **kwargs)
+
+    def _set_stride(self, stride: int) -> None:
+        """Switch the feature stride; templates are decimated to match."""
+        self.frontend.stride = stride
+        self._spotters = [TemplateSpotter(template[::stride]) for template in self._templates]
+
+    def reset(self) -> None:
+        """Forget partial matches, e.g. after a capture window."""
+        self.frontend.reset()
+        for spotter in self._spotters:
+            spotter.reset()
+        self._quiet_samples = 0
+
+    def process(self, block: np.ndarray) -> bool:
+        """Analyse one block of mono audio.
+
+        Returns:
+            True if the wake phrase ended in this block
+        """
+        self.blocks += 1
+        audio_seconds = len(block) / self.sample_rate
+        if self.budget is not None and not self.budget.allow():
+            self.skipped_blocks += 1
+            self.budget.account(0.0, audio_seconds)
+            # The gap breaks frame continuity and any partial match
+            self.reset()
+            return False
+
+        start = time.thread_time()
+        detected = self._detect(block)
+        if self.budget is not None:
+            self.budget.account(time.thread_time() - start, audio_seconds)
+            if self.budget.stride != self.frontend.stride:
+                logger.debug(f"Wake word feature stride changed to {self.budget.stride}")
+                self._set_stride(self.budget.stride)
+                self.frontend.reset()
+        return detected
+
+    def _detect(self, block: np.ndarray) -> bool:
+        self._quiet_samples = max(self._quiet_samples - len(block), 0)
+        features = self.frontend.process(block)
+        if len(features) == 0:
+            return False
+
+        frames = normalize_features(features).astype(np.float32, copy=False)
+        score = min(float(spotter.process(frames).min()) for spotter in self._spotters)
+        self.best_score = min(self.best_score, score)
+        if score > self.threshold or self._quiet_samples > 0:
+            return False
+
+        logger.info(f"Wake word detected (score {score:.3f})")
+        for spotter in self._spotters:
+            spotter.reset()
+        self._quiet_samples = int(self.refractory * self.sample_rate)
+        return True
+
+    def stats(self) -> Dict[str, float]:
+        """Return processing statistics."""
+        stats = {"blocks": self.blocks, "skipped_blocks": self.skipped_blocks, "stride": self.frontend.stride}
+        if self.budget is not None:
+            stats["cpu_fraction"] = round(self.budget.cpu_fraction, 5)
+        return stats
+
+
+def preprocess_recording(audio: np.ndarray, sample_rate: int, target_sr: int, stages: Sequence[str]) -> np.ndarray:
+    """Run a recording shaped (frames, channels) through the capture preprocessing stages."""
+    chain = build_preprocessing_chain(sample_rate, target_sr, stages)
+    blocks = [chain.process(block.mean(axis=1)).copy() for block in iter_blocks(audio, sample_rate)]
+    blocks.append(chain.flush())
+    return np.concatenate(blocks)
+
+
+def trim_template(features: np.ndarray, floor_db: float = 30.0) -> np.ndarray:
+    """Drop leading and trailing frames more than floor_db below the loudest frame."""
+    energy = features.max(axis=1) * (10 / np.log(10))
+    voiced = np.flatnonzero(energy > energy.max() - floor_db)
+    return features[voiced[0] : voiced[-1] + 1] if len(voiced) else features
+
+
+def measure_false_accepts(
+    detector: WakeWordDetector, audio: np.ndarray, sample_rate: int, block_duration: float = 0.1
+) -> Dict[str, float]:
+    """Count detections on recorded background audio that does not contain the wake phrase.
+
+    Args:
+        detector: Detector to evaluate
+        audio: Background audio shaped (frames, channels)
+        sample_rate: Sample rate of the audio
+        block_duration: Capture block duration in seconds
+
+    Returns:
+        Dict with the audio "hours", "false_accepts", "false_accepts_per_hour" and the
+        lowest score seen, which shows the margin to the threshold
+    """
+    samples = preprocess_recording(audio, sample_rate, detector.sample_rate, detector.stages)
+    detector.reset()
+    detector.best_score = np.inf
+    false_accepts = 0
+    block_size = int(detector.sample_rate * block_duration)
+    for start in range(0, len(samples), block_size):
+        if detector.process(samples[start : start + block_size]):
+            false_accepts += 1
+
+    hours = len(audio) / sample_rate / 3600
+    return {
+        "hours": round(hours, 4),
+        "false_accepts": false_accepts,
+        "false_accepts_per_hour": round(false_accepts / hours, 2) if hours > 0 else None,
+        "best_score": round(float(detector.best_score), 4),
+        "threshold": detector.threshold,
+    }
+
+
+def benchmark_block_cost(
+    detector: WakeWordDetector, seconds: float = 30.0, block_duration: float = 0.1
+) -> Dict[str, float]:
+    """Measure the detector's processing cost per block on noise, without the CPU budget.
+
+    Args:
+        detector: Detector to measure
+        seconds: Seconds of audio to process
+        block_duration: Capture block duration in seconds
+
+    Returns:
+        Per-block timings in milliseconds and the share of real time used
+    """
+    budget, detector.budget = detector.budget, None
+    stride = detector.frontend.stride
+    detector._set_stride(1)
+    detector.reset()
+    try:
+        block_size = int(detector.sample_rate * block_duration)
+        rng = np.random.default_rng(0)
+        timings: List[float] = []
+        for _ in range(int(seconds / block_duration)):
+            block = 0.05 * rng.standard_normal(block_size).astype(np.float32)
+            start = time.perf_counter()
+            detector.process(block)
+            timings.append(time.perf_counter() - start)
+    finally:
+        detector.budget = budget
+        detector._set_stride(stride)
+        detector.reset()
+
+    timings_ms = np.array(timings) * 1000
+    return {
+        "blocks": len(timings),
+        "block_ms": block_duration * 1000,
+        "mean_ms": round(float(timings_ms.mean()), 4),
+        "p50_ms": round(float(np.percentile(timings_ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(timings_ms, 95)), 4),
+        "max_ms": round(float(timings_ms.max()), 4),
+        "real_time_fraction": round(float(timings_ms.mean()) / (block_duration * 1000), 5),
+    }
@@ -0,0 +1,86 @@
+"""
+Audio file input used to replay recordings through the capture path.
+"""
+
+import io
+from typing import Iterator, Tuple
+
+import numpy as np
+from scipy.io import wavfile
+
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+
+def read_audio_file(path: str) -> Tuple[np.ndarray, int]:
+    """Read a WAV or FLAC file as float32 samples in the range [-1, 1].
+
+    FLAC needs the optional soundfile package.
+
+    Args:
+        path: Path of the audio file
+
+    Returns:
+        Tuple of audio shaped (frames, channels) and its sample rate
+    """
+    if path.lower().endswith(".flac"):
+        try:
+            import soundfile
+        except ImportError as e:
+            raise ImportError("Reading FLAC files needs soundfile: pip install soundfile") from e
+        audio, sample_rate = soundfile.read(path, dtype="float32", always_2d=True)
+        return audio, int(sample_rate)
+
+    sample_rate, audio = wavfile.read(path)
+    return _to_float32(audio), int(sample_rate)
+
+
+def read_audio_bytes(data: bytes) -> Tuple[np.ndarray, int]:
+    """Decode the contents of a WAV or FLAC file, e.g. one received over a socket.
+
+    Args:
+        data: Encoded file contents; FLAC is recognized by its signature
+
+    Returns:
+        Tuple of audio shaped (frames, channels) and its sample rate
+    """
+    if data[:4] == b"fLaC":
+        try:
+            import soundfile
+        except ImportError as e:
+            raise ImportError("Reading FLAC files needs soundfile: pip install soundfile") from e
+        audio, sample_rate = soundfile.read(io.BytesIO(data), dtype="float32", always_2d=True)
+        return audio, int(sample_rate)
+
+    sample_rate, audio = wavfile.read(io.BytesIO(data))
+    return _to_float32(audio), int(sample_rate)
+
+
+def _to_float32(audio: np.ndarray) -> np.ndarray:
+    """Convert decoded WAV samples to float32 shaped (frames, channels)."""
+    if np.issubdtype(audio.dtype, np.integer):
+        info = np.iinfo(audio.dtype)
+        # 8-bit WAV is unsigned, wider formats are signed
+        audio = (audio.astype(np.float32) - (info.max + 1 + info.min) / 2) / ((info.max - info.min + 1) / 2)
+    else:
+        audio = audio.astype(np.float32)
+
+    if audio.ndim == 1:
+        audio = audio[:, np.newaxis]
+    return audio
+
+
+def iter_blocks(audio: np.ndarray, sample_rate: int, block_duration: float = 0.1) -> Iterator[np.ndarray]:
+    """Split audio into blocks like the ones delivered by the input stream.
+
+    Args:
+        audio: Audio shaped (frames, channels)
+        sample_rate: Sample rate of the audio
+        block_duration: Duration of each block in seconds
+
+    Yields:
+        Consecutive blocks; the last one may be shorter
+    """
+    block_size = int(sample_rate * block_duration)
+    for start in range(0, len(audio), block_size):
+        yield audio[start : start + block_size]
@@ -1,11 +1,23 @@
-import sounddevice as sd
 import numpy as np
-from typing import Optional, Callable
-import mlx_whisper
-from pynput import keyboard
+from typing import Optional, Callable, List, Literal, Sequence, Tuple, Union
 import logging
-from scipy import signal
 import queue
+import threading
+import time
+from kubewhisper.audio.asr import ASRBackend, create_backend
+from kubewhisper.audio.streaming import StreamingSession, Word
+from kubewhisper.audio.transcription_worker import OverflowPolicy, TranscriptionJob, TranscriptionWorker
+from kubewhisper.audio.dsp import ProcessingChain, build_preprocessing_chain, select_stages
+from kubewhisper.audio.ring_buffer import AudioRingBuffer
+from kubewhisper.audio.vad import UtteranceSegmenter, VoiceActivityDetector
+from kubewhisper.audio.wake_word import WakeWordDetector
+from kubewhisper.audio.wav_io import read_audio_file, iter_blocks
+from kubewhisper.lazy import lazy_import
+from kubewhisper import tracing
+
+# The audio device and keyboard are only touched when capture starts
+sd = lazy_import("sounddevice")
+keyboard = lazy_import("pynput.keyboard")
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -15,33 +27,162 @@ logger = logging.getLogger(__name__)
 class WhisperTranscriber:
     def __init__(
         self,
-        model_path: str = "mlx-community/whisper-large-v3-turbo",
+        model_path: Optional[str] = None,
         sample_rate: int = 16000,
         channels: int = 1,
         recording_duration: float = 5.0,
         input_device: Optional[int] = None,
         min_amplitude: float = 0.01,
         noise_reduction: bool = True,
+        streaming: bool = False,
+        stream_interval: float = 1.0,
+        on_partial: Optional[Callable[[str, str], None]] = None,
+        capture_mode: Literal["push_to_talk", "vad", "wake"] = "push_to_talk",
+        end_silence: float = 0.6,
+        max_recording_duration: float = 30.0,
+        preprocessing: Optional[Sequence[str]] = None,
+        lowpass_cutoff: float = 2000.0,
+        trim_silence: bool = True,
+        asr_backend: Union[str, ASRBackend] = "auto",
+        asr_threads: int = 0,
+        beam_size: int = 1,
+        compute_type: str = "default",
+        transcription_workers: int = 1,
+        max_pending: int = 4,
+        overflow: OverflowPolicy = "block",
+        wake_templates: Sequence[str] = (),
+        wake_threshold: float = 0.12,
+        wake_cpu_budget: Optional[float] = 0.05,
+        on_capture_start: Optional[Callable[[], None]] = None,
     ):
-        """Initialize the WhisperTranscriber."""
-        self.model_path = model_path
+        """Initialize the WhisperTranscriber.
+
+        Captured audio goes into a preallocated ring buffer holding the last
+        max_recording_duration seconds, so memory per utterance is fixed and the
+        audio callback does not allocate.
+
+        With streaming enabled, the audio is transcribed in overlapping passes while
+        recording continues and only the uncommitted tail is transcribed on release.
+        on_partial receives (committed text, tentative text) after every pass.
+
+        In "vad" capture mode no keyboard is needed: a voice activity detector starts
+        and ends utterances, and each one is transcribed after end_silence seconds of
+        trailing silence.
+
+        In "wake" capture mode a keyword spotter listens continuously, within a CPU
+        budget of wake_cpu_budget (share of one core), for the wake phrase recorded in
+        the wake_templates WAV files. Each detection opens a capture window of
+        recording_duration seconds that is transcribed as one utterance.
+
+        on_capture_start is called whenever the user starts an utterance: on the
+        spacebar press, at speech onset or on the wake word. In the hands-free modes
+        it runs on the audio callback thread and must return quickly.
+
+        Each captured block runs through a streaming preprocessing chain before it
+        reaches the buffer: resampling, DC removal, low-pass filtering, an adaptive
+        noise gate and silence trimming. preprocessing names the stages after
+        resampling explicitly; by default noise_reduction enables the filter and gate,
+        and trim_silence drops leading and trailing silence (not used in "vad" mode,
+        where the detector already endpoints utterances, and in "wake" mode).
+
+        Speech recognition runs on asr_backend: "mlx" on Apple silicon, "faster-whisper"
+        on the CPU, or "auto" to pick one for this machine. model_path defaults to the
+        backend's model. Call preload() to load and warm up the model before the first
+        utterance.
+
+        While listening, captured utterances are queued for a background transcription
+        worker with transcription_workers threads, so the next utterance can be recorded
+        while the previous one is transcribed. Transcriptions reach the callback in the
+        order they were spoken. When max_pending utterances are waiting, overflow decides
+        whether capture blocks ("block") or an utterance is dropped ("drop_oldest",
+        "drop_newest").
+        """
+        if isinstance(asr_backend, str):
+            asr_backend = create_backend(
+                asr_backend,
+                model=model_path,
+                threads=asr_threads,
+                beam_size=beam_size,
+                compute_type=compute_type,
+                sample_rate=sample_rate,
+                workers=transcription_workers,
+            )
+        self.asr = asr_backend
+        self.model_path = self.asr.model
         self.sample_rate = sample_rate
         self.channels = channels
         self.recording_duration = recording_duration
         self.input_device = input_device
         self.min_amplitude = min_amplitude
         self.noise_reduction = noise_reduction
+        self.streaming = streaming
+        self.stream_interval = stream_interval
+        self.on_partial = on_partial
+        self.on_capture_start = on_capture_start
+        self.capture_mode = capture_mode
+        self.end_silence = end_silence
+        self.max_recording_duration = max_recording_duration
+        self.lowpass_cutoff = lowpass_cutoff
+        self.transcription_workers = transcription_workers
+        self.max_pending = max_pending
+        self.overflow = overflow
+        if preprocessing is None:
+            preprocessing = select_stages(noise_reduction, trim_silence and capture_mode == "push_to_talk")
+        self.preprocessing = tuple(preprocessing)
 
         # State management
         self._is_recording = False
         self._is_listening = False
         self._callback = None
-        self._audio_queue = queue.Queue()
+        self._ring = AudioRingBuffer(int(sample_rate * max_recording_duration))
+        self._mono: Optional[np.ndarray] = None
         self._recording_thread = None
-
-        # Initialize audio stream
-        self._verify_audio_device()
-        self._init_audio_stream()
+        self._stream_session: Optional[StreamingSession] = None
+        self._stream_stop = threading.Event()
+        self._stream_position = 0
+        self._segmenter: Optional[UtteranceSegmenter] = None
+        self._chain: Optional[ProcessingChain] = None
+        self._chain_rate: Optional[int] = None
+        self._preprocess_seconds = 0.0
+        self._preprocess_blocks = 0
+        self._segment_queue = queue.Queue()
+        self._worker: Optional[TranscriptionWorker] = None
+
+        # Wake word spotting, on the same preprocessed audio the templates went through
+        self.wake_word: Optional[WakeWordDetector] = None
+        if capture_mode == "wake":
+            wake_stages = [stage for stage in self.preprocessing if stage != "silence_trim"]
+            self.wake_word = WakeWordDetector.from_recordings(
+                wake_templates,
+                sample_rate=sample_rate,
+                stages=wake_stages,
+                threshold=wake_threshold,
+                cpu_budget=wake_cpu_budget,
+            )
+        self._wake_listening = False
+        self._capture_start: Optional[int] = None
+
+        # The audio device is opened on first use, so file transcription never touches it
+        self._device_sample_rate: Optional[int] = None
+        self._stream = None
+
+    @property
+    def device_sample_rate(self) -> int:
+        """Sample rate of the input device, queried on first use."""
+        if self._device_sample_rate is None:
+            self._verify_audio_device()
+        return self._device_sample_rate
+
+    @device_sample_rate.setter
+    def device_sample_rate(self, sample_rate: int) -> None:
+        self._device_sample_rate = sample_rate
+
+    @property
+    def stream(self):
+        """Input stream of the audio device, opened on first use."""
+        if self._stream is None:
+            self._init_audio_stream()
+        return self._stream
 
     def _verify_audio_device(self) -> None:
         """Verify that the selected audio input device is working."""
@@ -60,7 +201,7 @@ class WhisperTranscriber:
     def _init_audio_stream(self):
         """Initialize the audio input stream."""
         try:
-            self.stream = sd.InputStream(
+            self._stream = sd.InputStream(
                 device=self.input_device,
                 channels=self.channels,
                 samplerate=self.device_sample_rate,
@@ -71,121 +212,384 @@ class WhisperTranscriber:
             logger.error(f"Error initializing audio stream: {e}")
             raise
 
-    def _audio_callback(self, indata, frames, time, status):
+    def _audio_callback(self, indata, frames, time_info, status):
         """Callback for the audio stream."""
         if status:
             logger.warning(f"Audio callback status: {status}")
-        if self._is_recording:
-            self._audio_queue.put(indata.copy())
-
-    def _resample_audio(self, audio_data: np.ndarray, orig_sr: int, target_sr: int) -> np.ndarray:
-        """Resample audio data to the target sample rate."""
-        duration = len(audio_data) / orig_sr
-        target_length = int(duration * target_sr)
-        logger.debug(f"Resampling {len(audio_data)} samples to {target_length}")
-        resampled = signal.resample(audio_data, target_length)
-        return resampled
+        if self._segmenter is None and not self._wake_listening and not self._is_recording:
+            return
+
+        # Preprocess each block as it arrives so audio is ready when recording stops
+        start = time.perf_counter()
+        block = self._chain.process(self._to_mono(indata))
+        self._preprocess_seconds += time.perf_counter() - start
+        self._preprocess_blocks += 1
+        if len(block) == 0:
+            return
+        self._ring.write(block)
+        if self._segmenter is not None:
+            in_utterance = self._segmenter.in_utterance
+            segment = self._segmenter.process(block)
+            if self._segmenter.in_utterance and not in_utterance:
+                self._capture_started()
+            if segment is not None:
+                self._segment_queue.put(segment)
+        elif self._wake_listening:
+            self._process_wake_block(block)
+
+    def _process_wake_block(self, block: np.ndarray):
+        """Look for the wake phrase, or close the capture window it opened once it is full."""
+        if self._capture_start is None:
+            if self.wake_word.process(block):
+                # The command follows the wake phrase
+                self._capture_start = self._ring.write_position
+                self._capture_started()
+            return
+
+        end = self._capture_start + int(self.recording_duration * self.sample_rate)
+        if self._ring.write_position >= end:
+            self._segment_queue.put((self._capture_start, end))
+            self._capture_start = None
+            self.wake_word.reset()
+
+    def _capture_started(self):
+        """Tell the on_capture_start callback that the user started an utterance."""
+        if self.on_capture_start is None:
+            return
+        try:
+            self.on_capture_start()
+        except Exception as e:
+            logger.error(f"Error in capture start callback: {e}")
+
+    def _to_mono(self, indata: np.ndarray) -> np.ndarray:
+        """Return the mono signal of a (frames, channels) block without allocating."""
+        if indata.ndim == 1 or indata.shape[1] == 1:
+            return indata.reshape(-1)
+        if self._mono is None or len(self._mono) < len(indata):
+            self._mono = np.zeros(len(indata), dtype=np.float32)
+        return np.mean(indata, axis=1, out=self._mono[: len(indata)])
+
+    def _reset_chain(self):
+        """Start a new preprocessed signal from the device rate to the model rate."""
+        if self._chain is None or self._chain_rate != self.device_sample_rate:
+            logger.debug(
+                f"Preprocessing blocks from {self.device_sample_rate}Hz to {self.sample_rate}Hz: "
+                f"{', '.join(self.preprocessing)}"
+            )
+            self._chain = build_preprocessing_chain(
+                self.device_sample_rate, self.sample_rate, self.preprocessing, lowpass_cutoff=self.lowpass_cutoff
+            )
+            self._chain_rate = self.device_sample_rate
+        else:
+            self._chain.reset()
+        self._preprocess_seconds = 0.0
+        self._preprocess_blocks = 0
+
+    def _record_capture(self, audio_seconds: float):
+        """Add the capture of an utterance and its preprocessing to the current trace."""
+        tracing.record_span("audio.capture", audio_seconds, mode=self.capture_mode)
+        # Blocks are preprocessed as they arrive; their total is shown as one span at the end of the capture.
+        # Hands-free modes also count the blocks between utterances.
+        tracing.record_span("audio.preprocess", self._preprocess_seconds, blocks=self._preprocess_blocks)
+        self._preprocess_seconds = 0.0
+        self._preprocess_blocks = 0
+
+    def _flush_chain(self):
+        """Write the audio still held by the preprocessing chain into the capture buffer."""
+        self._ring.write(self._chain.flush())
+        removed = self._chain.removed_samples
+        if removed:
+            logger.info(f"Trimmed {removed / self.sample_rate:.2f}s of silence before transcription")
+
+    @staticmethod
+    def _peak(audio_data: np.ndarray) -> float:
+        """Return the maximum absolute amplitude without allocating a temporary array."""
+        return float(max(audio_data.max(), -audio_data.min())) if len(audio_data) else 0.0
 
     def _normalize_audio(self, audio_data: np.ndarray) -> np.ndarray:
-        """Normalize audio data to the range [-1, 1]."""
+        """Normalize audio data to the range [-1, 1] in place."""
         if len(audio_data) == 0:
             logger.warning("Received empty audio data for normalization")
-            return np.array([])
+            return audio_data
 
-        audio_data = audio_data.flatten()
-        max_amplitude = np.max(np.abs(audio_data))
+        max_amplitude = self._peak(audio_data)
 
         if max_amplitude > 0:
-            audio_data = audio_data / max_amplitude
-            logger.debug(f"Normalized audio: max amplitude = {np.max(np.abs(audio_data))}")
+            np.multiply(audio_data, 1.0 / max_amplitude, out=audio_data)
+            logger.debug(f"Normalized audio: max amplitude = {self._peak(audio_data)}")
         else:
             logger.warning("Audio data is silent (max amplitude = 0)")
 
         return audio_data
 
-    def _apply_noise_reduction(self, audio_data: np.ndarray) -> np.ndarray:
-        """Apply noise reduction to the audio signal."""
-        if len(audio_data) == 0:
-            return audio_data
-
-        # Estimate noise from the first 0.1 seconds
-        noise_sample = audio_data[: int(self.sample_rate * 0.1)]
-        noise_profile = np.mean(np.abs(noise_sample))
-        logger.debug(f"Estimated noise profile: {noise_profile}")
-
-        # Apply noise gate
-        threshold = noise_profile * 2
-        audio_data = np.where(np.abs(audio_data) < threshold, 0, audio_data)
-
-        # Apply low-pass filter
-        b, a = signal.butter(4, 2000 / (self.sample_rate / 2), btype="low")
-        filtered_audio = signal.filtfilt(b, a, audio_data)
-
-        return filtered_audio
+    def _begin_capture(self):
+        """Reset capture state and mark the transcriber as recording."""
+        # Clear any old audio data
+        self._ring.reset()
+        self._reset_chain()
+        self._is_recording = True
+        if self.streaming:
+            self._start_streaming()
 
     def start_recording(self):
         """Start recording audio."""
         logger.info("Starting recording...")
-        # Clear any old audio data
-        while not self._audio_queue.empty():
-            self._audio_queue.get()
-
-        self._is_recording = True
+        self._begin_capture()
         self.stream.start()
 
     def stop_recording(self) -> Optional[np.ndarray]:
-        """Stop recording and process the audio."""
+        """Stop recording and process the audio.
+
+        Returns:
+            Processed float32 audio. It is a view into the capture buffer and is only
+            valid until the next recording starts.
+        """
         logger.info("Stopping recording...")
         self._is_recording = False
-        self.stream.stop()
+        if self._stream is not None and self._stream.active:
+            self._stream.stop()
 
-        # Collect all audio data from the queue
-        audio_chunks = []
-        while not self._audio_queue.empty():
-            audio_chunks.append(self._audio_queue.get())
+        # Collect the tail still held by the preprocessing stages
+        self._flush_chain()
+        self._record_capture(min(self._ring.write_position, self._ring.capacity) / self.sample_rate)
 
-        if not audio_chunks:
+        if self._ring.write_position == 0:
             logger.warning("No audio data collected")
             return None
+        if self._ring.write_position > self._ring.capacity:
+            logger.warning(f"Recording exceeded {self.max_recording_duration}s, keeping the last part")
 
-        # Combine audio chunks
-        audio_data = np.concatenate(audio_chunks)
+        return self._process_audio(self._ring.view(self._ring.oldest_position))
 
-        # Process audio
+    def _process_audio(self, audio_data: np.ndarray) -> Optional[np.ndarray]:
+        """Normalize captured (already preprocessed) audio in place for transcription."""
         logger.info(f"Processing audio data: shape={audio_data.shape}, dtype={audio_data.dtype}")
 
-        # Resample if necessary
-        if self.device_sample_rate != self.sample_rate:
-            logger.info(f"Resampling from {self.device_sample_rate}Hz to {self.sample_rate}Hz")
-            audio_data = self._resample_audio(audio_data, self.device_sample_rate, self.sample_rate)
-
         # Normalize
-        audio_data = self._normalize_audio(audio_data)
+        with tracing.span("audio.normalize"):
+            audio_data = self._normalize_audio(audio_data)
+            max_amplitude = self._peak(audio_data)
 
         # Check amplitude
-        max_amplitude = np.max(np.abs(audio_data))
         logger.info(f"Max amplitude: {max_amplitude}")
         if max_amplitude < self.min_amplitude:
             logger.warning("Audio input level too low")
             return None
 
-        # Apply noise reduction if enabled
-        if self.noise_reduction:
-            audio_data = self._apply_noise_reduction(audio_data)
-            audio_data = self._normalize_audio(audio_data)
+        return audio_data
+
+    def _start_streaming(self):
+        """Start a streaming session and the thread that feeds it while recording."""
+        self._stream_session = StreamingSession(
+            self._transcribe_words, sample_rate=self.sample_rate, on_partial=self.on_partial
+        )
+        self._stream_stop.clear()
+        self._stream_position = 0
+        self._recording_thread = threading.Thread(target=self._streaming_loop, name="streaming-asr", daemon=True)
+        self._recording_thread.start()
+
+    def _feed_stream_session(self, final: bool = False):
+        """Copy newly captured audio from the capture buffer into the streaming session."""
+        if final:
+            self._flush_chain()
+
+        end = self._ring.write_position
+        start = max(self._stream_position, self._ring.oldest_position)
+        if start > self._stream_position:
+            logger.warning("Streaming transcription fell behind the capture buffer, skipping audio")
+        if end > start:
+            self._stream_session.insert_audio(self._ring.view(start, end))
+        self._stream_position = end
+
+    def _streaming_loop(self):
+        """Transcribe the buffered audio in passes until recording stops."""
+        while not self._stream_stop.wait(self.stream_interval):
+            try:
+                self._feed_stream_session()
+                self._stream_session.process_iter()
+            except Exception as e:
+                logger.error(f"Error during streaming transcription: {e}")
+
+    def _stop_streaming(self) -> StreamingSession:
+        """Stop the streaming thread and hand the rest of the captured audio to the session."""
+        self._stream_stop.set()
+        if self._recording_thread is not None:
+            self._recording_thread.join()
+            self._recording_thread = None
+
+        self._feed_stream_session(final=True)
+        return self._stream_session
+
+    @staticmethod
+    def _finish_session(session: StreamingSession) -> str:
+        """Transcribe the remaining tail of a stopped streaming session."""
+        try:
+            with tracing.span("asr.finish"):
+                return session.finish()
+        except Exception as e:
+            logger.error(f"Error during transcription: {e}")
+            return "Error during transcription"
+
+    def preload(self) -> None:
+        """Load and warm up the speech recognition model."""
+        self.asr.warmup()
+
+    def _transcribe_words(self, audio_data: np.ndarray, prompt: str) -> List[Word]:
+        """Transcribe audio into words with timestamps relative to its start."""
+        max_amplitude = np.max(np.abs(audio_data)) if len(audio_data) else 0
+        if max_amplitude > 0:
+            audio_data = audio_data / max_amplitude
+
+        with tracing.span("asr.pass", audio_seconds=round(len(audio_data) / self.sample_rate, 2)):
+            result = self.asr.transcribe(audio_data, word_timestamps=True, initial_prompt=prompt or None)
+        return [
+            (word["start"], word["end"], word["word"])
+            for segment in result.get("segments", [])
+            for word in segment.get("words", [])
+        ]
+
+    def _collect_recording(self) -> Optional[TranscriptionJob]:
+        """Stop recording and return a job that transcribes the captured utterance.
+
+        The job owns its audio, so the next recording can start before it runs.
+        """
+        if self.streaming:
+            logger.info("Stopping recording...")
+            self._is_recording = False
+            if self._stream is not None and self._stream.active:
+                self._stream.stop()
+            session = self._stop_streaming()
+            self._record_capture(min(self._ring.write_position, self._ring.capacity) / self.sample_rate)
+            return lambda: self._finish_session(session)
+
+        audio_data = self.stop_recording()
+        if audio_data is None:
+            return None
+
+        # Copy out of the capture buffer, the next recording reuses it
+        audio_data = audio_data.copy()
+        return lambda: self.transcribe_audio(audio_data)
+
+    def finish_recording(self) -> Optional[str]:
+        """Stop recording and return the transcription of the captured utterance."""
+        job = self._collect_recording()
+        if job is None:
+            return None
+
+        logger.info("Processing recorded audio...")
+        return job()
+
+    def _start_segmenter(self):
+        """Start voice-activity driven utterance detection on the capture stream."""
+        self._ring.reset()
+        self._reset_chain()
+        vad = VoiceActivityDetector(sample_rate=self.sample_rate)
+        self._segmenter = UtteranceSegmenter(
+            vad, end_silence=self.end_silence, max_utterance=self.max_recording_duration / 2
+        )
+
+    def _collect_segment(self, segment: Tuple[int, int]) -> Optional[TranscriptionJob]:
+        """Return a job that transcribes one utterance detected by the segmenter."""
+        start, end = segment
+        try:
+            # Copy out, capture keeps writing into the buffer while we transcribe
+            audio_data = self._ring.read(start, end)
+        except ValueError:
+            logger.warning("Utterance was overwritten before it could be transcribed")
+            return None
+        self._record_capture((end - start) / self.sample_rate)
 
-        return audio_data.astype(np.float32)
+        audio_data = self._process_audio(audio_data)
+        if audio_data is None:
+            return None
+        return lambda: self.transcribe_audio(audio_data)
+
+    def _start_wake_word(self):
+        """Start listening for the wake phrase on the capture stream."""
+        self._ring.reset()
+        self._reset_chain()
+        self.wake_word.reset()
+        self._capture_start = None
+        self._wake_listening = True
+
+    def _start_hands_free(self):
+        """Start the detector that opens utterances in the current capture mode."""
+        if self.capture_mode == "wake":
+            self._start_wake_word()
+        else:
+            self._start_segmenter()
+
+    def _end_hands_free(self) -> Optional[Tuple[int, int]]:
+        """Stop hands-free detection and return the utterance still in progress, if any."""
+        if self.capture_mode == "wake":
+            self._wake_listening = False
+            start, self._capture_start = self._capture_start, None
+            return (start, self._ring.write_position) if start is not None else None
+
+        segment = self._segmenter.flush()
+        self._segmenter = None
+        return segment
+
+    def _transcribe_segment(self, segment: Tuple[int, int]) -> Optional[str]:
+        """Process and transcribe one utterance detected by the segmenter."""
+        job = self._collect_segment(segment)
+        return job() if job is not None else None
+
+    def transcribe_file(self, path: str, realtime: bool = False) -> Optional[str]:
+        """Transcribe a WAV file by feeding it through the microphone capture path.
+
+        In "vad" and "wake" capture modes, every utterance detected in the file is
+        transcribed and the transcriptions are joined.
+
+        Args:
+            path: Path of the WAV file
+            realtime: Feed blocks at recording speed so streaming passes overlap as they would live
+
+        Returns:
+            The transcription, or None if the audio was rejected
+        """
+        audio_data, file_sample_rate = read_audio_file(path)
+        # Swap the rate without going through the property, which would query the audio device
+        device_sample_rate = self._device_sample_rate
+        self._device_sample_rate = file_sample_rate
+        try:
+            hands_free = self.capture_mode != "push_to_talk"
+            if hands_free:
+                self._start_hands_free()
+            else:
+                self._begin_capture()
+
+            texts = []
+            for block in iter_blocks(audio_data, file_sample_rate):
+                self._audio_callback(block, len(block), None, None)
+                if realtime:
+                    time.sleep(len(block) / file_sample_rate)
+                while not self._segment_queue.empty():
+                    texts.append(self._transcribe_segment(self._segment_queue.get()))
+
+            if not hands_free:
+                return self.finish_recording()
+
+            segment = self._end_hands_free()
+            if segment is not None:
+                texts.append(self._transcribe_segment(segment))
+
+            texts = [text.strip() for text in texts if text]
+            return " ".join(texts) if texts else None
+        finally:
+            self._device_sample_rate = device_sample_rate
 
     def transcribe_audio(self, audio_data: np.ndarray) -> str:
-        """Transcribe audio data using mlx-whisper."""
+        """Transcribe audio data with the configured speech recognition backend."""
         try:
             logger.info(f"Starting transcription... Audio shape: {audio_data.shape}")
             logger.debug(
                 f"Audio stats - min: {np.min(audio_data)}, max: {np.max(audio_data)}, mean: {np.mean(audio_data)}"
             )
 
-            result = mlx_whisper.transcribe(audio_data, path_or_hf_repo=self.model_path)
-            logger.info("Transcription completed")
+            with tracing.span("asr.transcribe", audio_seconds=round(len(audio_data) / self.sample_rate, 2)):
+                result = self.asr.transcribe(audio_data)
+            logger.info(f"Transcription completed (RTF {self.asr.stats.last_rtf or 0:.2f})")
             if not result.get("text"):
                 logger.warning("No text in transcription result")
                 return ""
@@ -199,6 +603,7 @@ class WhisperTranscriber:
         try:
             if key == keyboard.Key.space and not self._is_recording:
                 logger.info("Space pressed - starting recording")
+                self._capture_started()
                 self.start_recording()
             return True
         except Exception as e:
@@ -210,15 +615,12 @@ class WhisperTranscriber:
         try:
             if key == keyboard.Key.space and self._is_recording:
                 logger.info("Space released - stopping recording")
-                audio_data = self.stop_recording()
-
-                if audio_data is not None:
-                    logger.info("Processing recorded audio...")
-                    transcribed_text = self.transcribe_audio(audio_data)
-                    if self._callback:
-                        self._callback(transcribed_text)
-                    else:
-                        print(f"Transcription: {transcribed_text}")
+                # Only queue the utterance, so the next one can be recorded while it is transcribed;
+                # the job and the answer to its transcript carry the utterance's trace
+                with tracing.activate(tracing.start_trace("voice", capture=self.capture_mode)):
+                    job = self._collect_recording()
+                    if job is not None:
+                        self._worker.submit(job)
 
             elif key == keyboard.Key.esc:
                 logger.info("Escape pressed - stopping listener")
@@ -229,31 +631,85 @@ class WhisperTranscriber:
             logger.error(f"Error during key release: {e}")
             return True
 
+    def _deliver(self, transcribed_text: str):
+        """Hand a transcription to the callback, or print it if there is none."""
+        if self._callback:
+            self._callback(transcribed_text)
+        else:
+            print(f"Transcription: {transcribed_text}")
+
     def start_listening(self, callback: Optional[Callable[[str], None]] = None):
-        """Start listening for keyboard events to trigger recording."""
+        """Start listening for input: spacebar push-to-talk, or hands-free in "vad" and "wake" capture modes."""
         self._is_listening = True
         self._callback = callback
-        logger.info("Started listening for input (Press and hold spacebar to record, ESC to quit)")
 
-        with keyboard.Listener(on_press=self.on_press, on_release=self.on_release) as listener:
-            listener.join()
+        self._worker = TranscriptionWorker(
+            self._deliver,
+            workers=self.transcription_workers,
+            max_pending=self.max_pending,
+            overflow=self.overflow,
+        )
+        self._worker.start()
+        try:
+            if self.capture_mode != "push_to_talk":
+                self._listen_hands_free()
+                return
+
+            logger.info("Started listening for input (Press and hold spacebar to record, ESC to quit)")
+
+            with keyboard.Listener(on_press=self.on_press, on_release=self.on_release) as listener:
+                listener.join()
+        finally:
+            # Finish and deliver the utterances that were already captured
+            self._worker.stop(wait=True)
+            self._worker = None
+
+    def _listen_hands_free(self):
+        """Capture continuously and transcribe each utterance as soon as it ends."""
+        if self.capture_mode == "wake":
+            logger.info("Started listening for the wake word (hands-free, Ctrl+C to quit)")
+        else:
+            logger.info("Started listening for speech (hands-free, Ctrl+C to quit)")
+        self._start_hands_free()
+        self.stream.start()
+        try:
+            while self._is_listening:
+                try:
+                    segment = self._segment_queue.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+
+                logger.info("Utterance detected - queueing for transcription")
+                with tracing.activate(tracing.start_trace("voice", capture=self.capture_mode)):
+                    job = self._collect_segment(segment)
+                    if job is not None:
+                        self._worker.submit(job)
+        finally:
+            self._segmenter = None
+            self._wake_listening = False
+            if self.stream.active:
+                self.stream.stop()
+            if self.wake_word is not None:
+                logger.info(f"Wake word detector: {self.wake_word.stats()}")
+
+    def _close_stream(self):
+        """Close the input stream; the next capture opens it again."""
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+            self._stream = None
 
     def stop_listening(self):
         """Stop the continuous listening loop."""
         self._is_listening = False
-        if hasattr(self, "stream"):
-            self.stream.stop()
-            self.stream.close()
+        self._close_stream()
         logger.info("Stopped listening")
 
     def set_input_device(self, device_index: int):
         """Set the audio input device by its index."""
         logger.info(f"Changing input device to index: {device_index}")
-        if hasattr(self, "stream"):
-            self.stream.stop()
-            self.stream.close()
+        self._close_stream()
 
         self.input_device = device_index
         self._verify_audio_device()
-        self._init_audio_stream()
         logger.info(f"Input device changed to index: {device_index}")
@@ -0,0 +1,3 @@
+"""
+Offline end-to-end benchmarks with local stand-ins for the LLM, TTS and Kubernetes APIs.
+"""
@@ -0,0 +1,388 @@
+"""
+End-to-end benchmark of the query path against local stand-ins, with baseline comparison.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, TextIO
+
+from kubewhisper import tracing
+from kubewhisper.audio.elevenlabs_speaker import ElevenLabsSpeaker
+from kubewhisper.audio.tts_pipeline import TTSPipeline
+from kubewhisper.bench.stubs import StubKubernetesServer, StubLLMServer, StubTTSServer
+from kubewhisper.runtime import AsyncRuntime
+
+logger = logging.getLogger(__name__)
+
+
+def _call(name: str, **parameters) -> Dict[str, Any]:
+    return {"type": "function", "name": name, "parameters": parameters}
+
+
+DEFAULT_CONFIG: Dict[str, Any] = {
+    "llm": {
+        "latency_ms": 300,
+        "token_ms": 10,
+        "rules": [
+            {"match": r"\bnodes?\b", "response": _call("get_number_of_nodes")},
+            {"match": r"\bnamespaces?\b", "response": _call("get_number_of_namespaces")},
+            {"match": r"\bstatus\b|\bhealth", "response": _call("get_cluster_status")},
+            {"match": r"\bevents?\b", "response": _call("get_last_events")},
+            {"match": r"\bversion\b", "response": _call("get_version_info")},
+            {"match": r"\bpods?\b", "response": _call("get_number_of_pods")},
+        ],
+    },
+    "tts": {"latency_ms": 150, "char_ms": 1.0},
+    "kubernetes": {"latency_ms": 20, "nodes": 3, "pods": 40, "namespaces": 5},
+    "scenarios": [
+        {"name": "nodes", "text": "How many nodes are in the cluster?"},
+        {"name": "pods", "text": "How many pods are running?"},
+        {"name": "status", "text": "What is the status of the cluster?"},
+        {"name": "chat", "text": "What is a Kubernetes operator?"},
+        {"name": "spoken-status", "text": "Is my cluster healthy?", "output": "voice"},
+    ],
+}
+
+
+def load_config(path: Optional[str]) -> Dict[str, Any]:
+    """Load a benchmark configuration; sections that are missing come from DEFAULT_CONFIG.
+
+    Audio scenario paths are resolved relative to the configuration file.
+
+    Args:
+        path: JSON configuration file, or None for the defaults
+    """
+    config = dict(DEFAULT_CONFIG)
+    if path is None:
+        return config
+    with open(path) as f:
+        config.update(json.load(f))
+    base_dir = os.path.dirname(os.path.abspath(path))
+    for scenario in config["scenarios"]:
+        if "audio" in scenario:
+            scenario["audio"] = os.path.join(base_dir, scenario["audio"])
+    return config
+
+
+class SilentSpeaker(ElevenLabsSpeaker):
+    """ElevenLabs speaker whose playback only waits for the audio's duration, or not at all."""
+
+    def __init__(self, base_url: str, bytes_per_second: Optional[float] = None):
+        """Initialize the speaker.
+
+        Args:
+            base_url: URL of the text-to-speech stand-in
+            bytes_per_second: Rate at which playback is simulated, or None to return immediately
+        """
+        super().__init__(api_key="bench", base_url=base_url)
+        self.bytes_per_second = bytes_per_second
+
+    def play(self, audio: bytes, interrupted: Optional[threading.Event] = None) -> None:
+        with tracing.span("tts.play", bytes=len(audio)):
+            if self.bytes_per_second:
+                (interrupted or threading.Event()).wait(len(audio) / self.bytes_per_second)
+
+
+@contextlib.contextmanager
+def _environment(**overrides: str) -> Iterator[None]:
+    """Temporarily set environment variables."""
+    saved = {name: os.environ.get(name) for name in overrides}
+    os.environ.update(overrides)
+    try:
+        yield
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+
+class BenchRunner:
+    """Runs scenarios through the Assistant against stand-ins for every remote service.
+
+    The LLM, text-to-speech and Kubernetes stand-ins run on their own event loop
+    thread with the configured latencies; the assistant reaches them through
+    DEEPSEEK_API_BASE, the speaker's base URL and a generated kubeconfig. Each
+    scenario run is traced, and the report holds per-scenario end-to-end and
+    per-stage latency distributions and throughput.
+    """
+
+    def __init__(
+        self,
+        config: Dict[str, Any],
+        runs: int = 5,
+        warmup: int = 1,
+        concurrency: int = 1,
+        simulate_playback: bool = False,
+        asr_backend: str = "auto",
+        model: Optional[str] = None,
+        speculate: bool = False,
+        hedge: bool = False,
+    ):
+        """Initialize the runner.
+
+        Args:
+            config: Benchmark configuration, see DEFAULT_CONFIG
+            runs: Timed runs per scenario (a scenario's own "runs" takes precedence)
+            warmup: Untimed runs per scenario before the timed ones
+            concurrency: Runs of a scenario in flight at once
+            simulate_playback: Wait for the duration of the synthesized audio instead of skipping playback
+            asr_backend: Speech recognition backend for audio scenarios
+            model: Speech recognition model for audio scenarios
+            speculate: Let the assistant prefetch the likely tool call while the LLM answers
+            hedge: Let the assistant ask the LLM again when an answer is slower than usual
+        """
+        self.config = config
+        self.runs = runs
+        self.warmup = warmup
+        self.concurrency = concurrency
+        self.simulate_playback = simulate_playback
+        self.asr_backend = asr_backend
+        self.model = model
+        self.speculate = speculate
+        self.hedge = hedge
+        self.llm = StubLLMServer(**config.get("llm", {}))
+        self.tts = StubTTSServer(**config.get("tts", {}))
+        self.kubernetes = StubKubernetesServer(**config.get("kubernetes", {}))
+        self._stubs = (self.llm, self.tts, self.kubernetes)
+
+    def run(self) -> Dict[str, Any]:
+        """Run every scenario and return the report."""
+        runtime = AsyncRuntime(name="bench-stubs")
+        runtime.start()
+        try:
+            for stub in self._stubs:
+                runtime.run(stub.start())
+            with tempfile.TemporaryDirectory() as tmpdir:
+                kubeconfig = os.path.join(tmpdir, "kubeconfig")
+                with open(kubeconfig, "w") as f:
+                    json.dump(self.kubernetes.kubeconfig(), f)
+                with _environment(DEEPSEEK_API_KEY="bench", DEEPSEEK_API_BASE=self.llm.url, KUBECONFIG=kubeconfig):
+                    return self._run_scenarios()
+        finally:
+            for stub in self._stubs:
+                runtime.run(stub.stop())
+            runtime.stop()
+
+    def _run_scenarios(self) -> Dict[str, Any]:
+        from kubewhisper.assistant import Assistant
+        from kubewhisper.k8s import connections
+
+        # The API client may have been created for another cluster
+        connections.reset_api_client()
+        assistant = Assistant(
+            output_mode="text", voice_input=False, tts_cache_dir=None, speculate=self.speculate, hedge=self.hedge
+        )
+        try:
+            transcriber = self._create_transcriber()
+            scenarios = {}
+            start = time.perf_counter()
+            for scenario in self.config["scenarios"]:
+                logger.info(f"Running scenario {scenario['name']}")
+                scenarios[scenario["name"]] = assistant.runtime.run(
+                    self._run_scenario(assistant, transcriber, scenario)
+                )
+            wall_seconds = time.perf_counter() - start
+            speculation = assistant.prefetcher.snapshot() if assistant.prefetcher else None
+            llm = assistant.llm.snapshot()
+        finally:
+            assistant.close()
+            connections.reset_api_client()
+
+        runs = sum(result["runs"] for result in scenarios.values())
+        return {
+            "settings": {
+                "runs": self.runs,
+                "warmup": self.warmup,
+                "concurrency": self.concurrency,
+                "speculate": self.speculate,
+                "hedge": self.hedge,
+            },
+            "runs": runs,
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput": round(runs / wall_seconds, 3) if wall_seconds > 0 else None,
+            "scenarios": scenarios,
+            "requests": {
+                "llm": self.llm.requests,
+                "tts": self.tts.requests,
+                "kubernetes": self.kubernetes.requests,
+            },
+            "llm": llm,
+            **({"speculation": speculation} if speculation else {}),
+        }
+
+    def _create_transcriber(self):
+        if not any("audio" in scenario for scenario in self.config["scenarios"]):
+            return None
+        from kubewhisper.audio.asr import create_backend
+        from kubewhisper.audio.batch import BatchTranscriber
+
+        backend = create_backend(self.asr_backend, model=self.model)
+        backend.warmup()
+        return BatchTranscriber(backend)
+
+    async def _run_scenario(self, assistant, transcriber, scenario: Dict[str, Any]) -> Dict[str, Any]:
+        audio = None
+        if "audio" in scenario:
+            from kubewhisper.audio.wav_io import read_audio_file
+
+            audio = read_audio_file(scenario["audio"])
+
+        for _ in range(self.warmup):
+            await self._run_once(assistant, transcriber, scenario, audio)
+
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def timed_run() -> Dict[str, Any]:
+            async with slots:
+                return await self._run_once(assistant, transcriber, scenario, audio)
+
+        runs = scenario.get("runs", self.runs)
+        start = time.perf_counter()
+        results = await asyncio.gather(*(timed_run() for _ in range(runs)))
+        wall_seconds = time.perf_counter() - start
+
+        latency = tracing.Histogram()
+        stages: Dict[str, tracing.Histogram] = {}
+        for result in results:
+            latency.observe(result["seconds"])
+            for stage, seconds in result["stages"].items():
+                stages.setdefault(stage, tracing.Histogram()).observe(seconds)
+        errors = [result["error"] for result in results if "error" in result]
+        return {
+            "runs": runs,
+            "failed": len(errors),
+            **({"first_error": errors[0]} if errors else {}),
+            "throughput": round(runs / wall_seconds, 3) if wall_seconds > 0 else None,
+            "latency": latency.as_dict(),
+            "stages": {stage: histogram.as_dict() for stage, histogram in sorted(stages.items())},
+        }
+
+    async def _run_once(self, assistant, transcriber, scenario: Dict[str, Any], audio) -> Dict[str, Any]:
+        """Answer a scenario once and return its duration and the time spent per stage."""
+        result: Dict[str, Any] = {}
+        trace = tracing.start_trace("bench", scenario=scenario["name"])
+        with tracing.activate(trace):
+            try:
+                text = scenario.get("text")
+                if audio is not None:
+                    text = await asyncio.to_thread(self._transcribe, transcriber, audio)
+                response = await assistant.process_query(text)
+                if isinstance(response, dict) and "error" in response:
+                    result["error"] = str(response["error"])
+                elif scenario.get("output", self.config.get("output", "text")) == "voice":
+                    await self._speak(str(response.get("response", response)), result)
+            except Exception as e:
+                result["error"] = str(e)
+        trace.finish()
+
+        stages: Dict[str, float] = {}
+        for span in trace.spans:
+            stages[span.name] = stages.get(span.name, 0.0) + span.duration
+        if "first_audio" in result:
+            stages["tts.first_audio"] = result.pop("first_audio")
+        result["seconds"] = trace.duration
+        result["stages"] = stages
+        return result
+
+    @staticmethod
+    def _transcribe(transcriber, audio) -> str:
+        samples, sample_rate = audio
+        with tracing.span("asr.transcribe", audio_seconds=round(len(samples) / sample_rate, 2)):
+            record = transcriber.transcribe_audio(samples, sample_rate, {})
+        if "error" in record:
+            raise ValueError(record["error"])
+        return record["text"]
+
+    async def _speak(self, text: str, result: Dict[str, Any]) -> None:
+        # Each run gets its own pipeline, as speaking a new text interrupts the one in progress
+        bytes_per_second = 16000 if self.simulate_playback else None
+        pipeline = TTSPipeline(SilentSpeaker(self.tts.url, bytes_per_second))
+        try:
+            handle = pipeline.speak(text)
+            await handle
+            result["first_audio"] = handle.stats.get("first_audio_seconds", 0.0)
+        finally:
+            await asyncio.to_thread(pipeline.close)
+
+
+def compare_to_baseline(
+    report: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = 0.2, min_delta: float = 0.005
+) -> List[str]:
+    """List the latencies that got worse than in a baseline report.
+
+    A p50 or p95 latency, end to end or of a stage, regresses when it exceeds the
+    baseline by more than the tolerance and by more than min_delta seconds.
+
+    Args:
+        report: Report of the current run
+        baseline: Report of an earlier run
+        tolerance: Allowed relative increase
+        min_delta: Increase in seconds below which changes are ignored as noise
+
+    Returns:
+        One description per regression
+    """
+    regressions = []
+    for name, current in report["scenarios"].items():
+        previous = baseline.get("scenarios", {}).get(name)
+        if previous is None:
+            continue
+        pairs = [("latency", current["latency"], previous["latency"])]
+        pairs += [
+            (stage, summary, previous["stages"][stage])
+            for stage, summary in current["stages"].items()
+            if stage in previous.get("stages", {})
+        ]
+        for label, now, before in pairs:
+            for key in ("p50", "p95"):
+                if now.get(key) is None or before.get(key) is None:
+                    continue
+                if now[key] > before[key] * (1 + tolerance) and now[key] - before[key] > min_delta:
+                    regressions.append(
+                        f"{name} {label} {key}: {before[key] * 1000:.1f} ms -> {now[key] * 1000:.1f} ms "
+                        f"(+{(now[key] / before[key] - 1) * 100 if before[key] else float('inf'):.0f}%)"
+                    )
+    return regressions
+
+
+def print_report(report: Dict[str, Any], output: TextIO) -> None:
+    """Write a readable summary of a report."""
+    output.write(
+        f"{'scenario':<18}{'runs':>5}{'fail':>5}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}  slowest stages (p50)\n"
+    )
+
+    def ms(value: Optional[float]) -> str:
+        return "-" if value is None else f"{value * 1000:.1f}"
+
+    for name, result in report["scenarios"].items():
+        latency = result["latency"]
+        stages = sorted(result["stages"].items(), key=lambda item: item[1]["p50"] or 0, reverse=True)[:3]
+        slowest = ", ".join(f"{stage} {summary['p50'] * 1000:.0f}" for stage, summary in stages)
+        output.write(
+            f"{name:<18}{result['runs']:>5}{result['failed']:>5}{ms(latency['p50']):>9}{ms(latency['p95']):>9}"
+            f"{ms(latency['max']):>9}  {slowest}\n"
+        )
+    if "llm" in report:
+        llm = report["llm"]
+        output.write(
+            f"\nLLM: {llm['questions']} questions, {llm['timeouts']} timeouts, {llm['hedged']} hedged "
+            f"({llm['hedge_wins']} won by the hedge), request p95 {ms(llm['latency']['p95'])} ms, "
+            f"p99 {ms(llm['latency']['p99'])} ms\n"
+        )
+    if "speculation" in report:
+        speculation = report["speculation"]
+        output.write(
+            f"\nTool speculation: {speculation['hits']} hits, {speculation['misses']} misses "
+            f"(hit rate {speculation['hit_rate']}), {speculation['saved_seconds']}s saved, "
+            f"{speculation['wasted_seconds']}s wasted\n"
+        )
+    output.write(f"\n{report['runs']} runs in {report['wall_seconds']:.2f}s ({report['throughput']} runs per second)\n")
+    output.flush()
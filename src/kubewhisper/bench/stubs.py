@@ -0,0 +1,327 @@
+"""
+Local stand-ins for the DeepSeek, ElevenLabs and Kubernetes APIs with configurable latency.
+"""
+
+import asyncio
+import json
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from aiohttp import web
+
+logger = logging.getLogger(__name__)
+
+
+class StubServer:
+    """Base class of the stand-in HTTP servers; each listens on a free localhost port.
+
+    The client addresses of the requests are collected in peers, so tests can
+    tell how many connections a client opened.
+    """
+
+    def __init__(self, latency_ms: float = 0.0):
+        """Initialize the server without starting it.
+
+        Args:
+            latency_ms: Delay added to every response
+        """
+        self.latency_ms = latency_ms
+        self.requests = 0
+        self.peers: Set[Tuple[str, int]] = set()
+        self.port: Optional[int] = None
+        self._runner: Optional[web.AppRunner] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL of the running server."""
+        return f"http://127.0.0.1:{self.port}"
+
+    def routes(self) -> List[web.RouteDef]:
+        raise NotImplementedError
+
+    async def start(self) -> None:
+        """Start listening; must run on the loop that serves the requests."""
+        app = web.Application(middlewares=[self._count])
+        app.add_routes(self.routes())
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        self.port = self._runner.addresses[0][1]
+        logger.debug(f"{type(self).__name__} listening on {self.url}")
+
+    async def stop(self) -> None:
+        """Stop listening."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @web.middleware
+    async def _count(self, request: web.Request, handler):
+        self.requests += 1
+        self.peers.add(request.transport.get_extra_info("peername"))
+        if self.latency_ms:
+            await asyncio.sleep(self.latency_ms / 1000)
+        return await handler(request)
+
+
+class StubLLMServer(StubServer):
+    """OpenAI-compatible chat completion endpoint answering from scripted rules.
+
+    The question is taken from the "Question:" line of the prompt the assistant
+    sends. The first rule whose regular expression matches it supplies the
+    answer: a string is returned as text, a dict as a JSON function call.
+    Generation time is simulated as latency_ms before the first token plus
+    token_ms per token (about four characters); streamed requests receive the
+    tokens as server-sent events at that pace. Every tail_every-th completion
+    is delayed by another tail_ms, like a slow response from a busy provider.
+    """
+
+    def __init__(
+        self,
+        rules: Sequence[Dict[str, Any]] = (),
+        default: Union[str, Dict[str, Any]] = "I can only help with questions about your Kubernetes cluster.",
+        latency_ms: float = 300.0,
+        token_ms: float = 10.0,
+        tail_every: int = 0,
+        tail_ms: float = 0.0,
+    ):
+        """Initialize the server.
+
+        Args:
+            rules: Dicts with a "match" regular expression and a "response" (text or function call)
+            default: Response when no rule matches
+            latency_ms: Time to the first token
+            token_ms: Time per generated token
+            tail_every: Delay every N-th completion (0 for none)
+            tail_ms: Extra time of a delayed completion
+        """
+        super().__init__(latency_ms)
+        self.rules = [(re.compile(rule["match"], re.IGNORECASE), rule["response"]) for rule in rules]
+        self.default = default
+        self.token_ms = token_ms
+        self.tail_every = tail_every
+        self.tail_ms = tail_ms
+        self.completions = 0
+        self.questions: List[str] = []
+
+    def routes(self) -> List[web.RouteDef]:
+        return [
+            web.post("/chat/completions", self._complete),
+            web.post("/v1/chat/completions", self._complete),
+            web.get("/models", self._models),
+            web.get("/v1/models", self._models),
+        ]
+
+    async def _models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": "deepseek-chat", "object": "model"}]})
+
+    def answer(self, prompt: str) -> str:
+        """Return the scripted answer to a prompt."""
+        question = prompt.rsplit("Question:", 1)[-1].strip()
+        self.questions.append(question)
+        response = next((response for pattern, response in self.rules if pattern.search(question)), self.default)
+        return response if isinstance(response, str) else json.dumps(response)
+
+    async def _complete(self, request: web.Request) -> web.StreamResponse:
+        self.completions += 1
+        if self.tail_every and self.completions % self.tail_every == 0:
+            await asyncio.sleep(self.tail_ms / 1000)
+        body = await request.json()
+        prompt = "\n".join(str(message.get("content", "")) for message in body.get("messages", []))
+        content = self.answer(prompt)
+        tokens = [content[i : i + 4] for i in range(0, len(content), 4)]
+        completion_id = f"chatcmpl-{self.requests}"
+        model = body.get("model", "stub")
+
+        if not body.get("stream"):
+            await asyncio.sleep(len(tokens) * self.token_ms / 1000)
+            return web.json_response(
+                {
+                    "id": completion_id,
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}
+                    ],
+                    "usage": {
+                        "prompt_tokens": len(prompt) // 4,
+                        "completion_tokens": len(tokens),
+                        "total_tokens": len(prompt) // 4 + len(tokens),
+                    },
+                }
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, token in enumerate(tokens):
+            if i:
+                await asyncio.sleep(self.token_ms / 1000)
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": model,
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": token}, "finish_reason": None}],
+            }
+            await response.write(f"data: {json.dumps(chunk)}\n\n".encode())
+        done = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+        }
+        await response.write(f"data: {json.dumps(done)}\n\ndata: [DONE]\n\n".encode())
+        await response.write_eof()
+        return response
+
+
+class StubTTSServer(StubServer):
+    """ElevenLabs-compatible text-to-speech endpoint returning silent audio of a plausible size."""
+
+    def __init__(self, latency_ms: float = 150.0, char_ms: float = 1.0, bytes_per_char: int = 1000):
+        """Initialize the server.
+
+        Args:
+            latency_ms: Time before the audio is returned
+            char_ms: Additional synthesis time per character
+            bytes_per_char: Size of the returned audio per character (about 128 kbps speech)
+        """
+        super().__init__(latency_ms)
+        self.char_ms = char_ms
+        self.bytes_per_char = bytes_per_char
+        self.characters = 0
+
+    def routes(self) -> List[web.RouteDef]:
+        return [
+            web.post("/v1/text-to-speech/{voice_id}", self._synthesize),
+            web.post("/v1/text-to-speech/{voice_id}/stream", self._synthesize),
+        ]
+
+    async def _synthesize(self, request: web.Request) -> web.Response:
+        text = (await request.json()).get("text", "")
+        self.characters += len(text)
+        await asyncio.sleep(len(text) * self.char_ms / 1000)
+        return web.Response(body=bytes(len(text) * self.bytes_per_char), content_type="audio/mpeg")
+
+
+class StubKubernetesServer(StubServer):
+    """Kubernetes API server with a synthetic fleet, enough for the registered tools."""
+
+    def __init__(self, latency_ms: float = 20.0, nodes: int = 3, pods: int = 40, namespaces: int = 5):
+        """Initialize the server.
+
+        Args:
+            latency_ms: Delay of every API response
+            nodes: Number of nodes in the cluster
+            pods: Number of pods, spread over the namespaces
+            namespaces: Number of namespaces
+        """
+        super().__init__(latency_ms)
+        self.nodes = nodes
+        self.pods = pods
+        self.namespaces = namespaces
+
+    def routes(self) -> List[web.RouteDef]:
+        return [
+            web.get("/version", self._version),
+            web.get("/api/v1/nodes", self._nodes),
+            web.get("/api/v1/namespaces", self._namespaces),
+            web.get("/api/v1/pods", self._pods),
+            web.get("/api/v1/namespaces/{namespace}/pods", self._pods),
+            web.get("/api/v1/namespaces/{namespace}/pods/{name}/log", self._log),
+            web.get("/api/v1/events", self._events),
+        ]
+
+    @staticmethod
+    def _list(kind: str, items: List[Dict[str, Any]]) -> web.Response:
+        return web.json_response({"kind": kind, "apiVersion": "v1", "metadata": {}, "items": items})
+
+    async def _version(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "major": "1",
+                "minor": "30",
+                "gitVersion": "v1.30.0",
+                "gitCommit": "stub",
+                "gitTreeState": "clean",
+                "buildDate": "2024-04-17T00:00:00Z",
+                "goVersion": "go1.22.2",
+                "compiler": "gc",
+                "platform": "linux/amd64",
+            }
+        )
+
+    async def _nodes(self, request: web.Request) -> web.Response:
+        node_info = {
+            "architecture": "amd64",
+            "bootID": "stub",
+            "containerRuntimeVersion": "containerd://1.7.0",
+            "kernelVersion": "6.1.0",
+            "kubeProxyVersion": "v1.30.0",
+            "kubeletVersion": "v1.30.0",
+            "machineID": "stub",
+            "operatingSystem": "linux",
+            "osImage": "Stub Linux",
+            "systemUUID": "stub",
+        }
+        items = [
+            {
+                "metadata": {"name": f"node-{i}"},
+                "status": {"conditions": [{"type": "Ready", "status": "True"}], "nodeInfo": node_info},
+            }
+            for i in range(self.nodes)
+        ]
+        return self._list("NodeList", items)
+
+    async def _namespaces(self, request: web.Request) -> web.Response:
+        items = [
+            {"metadata": {"name": f"namespace-{i}"}, "status": {"phase": "Active"}} for i in range(self.namespaces)
+        ]
+        return self._list("NamespaceList", items)
+
+    async def _pods(self, request: web.Request) -> web.Response:
+        namespace = request.match_info.get("namespace")
+        items = [
+            {
+                "metadata": {"name": f"pod-{i}", "namespace": f"namespace-{i % self.namespaces}"},
+                "status": {"phase": "Running" if i % 10 else "Pending"},
+            }
+            for i in range(self.pods)
+            if namespace is None or f"namespace-{i % self.namespaces}" == namespace
+        ]
+        return self._list("PodList", items)
+
+    async def _log(self, request: web.Request) -> web.Response:
+        lines = ["INFO request served"] * 20 + ["WARNING slow response", "ERROR upstream timeout"]
+        return web.Response(text="\n".join(lines) + "\n")
+
+    async def _events(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get("limit", 10))
+        items = [
+            {
+                "metadata": {"name": f"event-{i}", "namespace": "default"},
+                "involvedObject": {"kind": "Pod", "name": f"pod-{i}"},
+                "type": "Normal",
+                "reason": "Started",
+                "message": f"Started container in pod-{i}",
+                "lastTimestamp": "2024-04-17T00:00:00Z",
+            }
+            for i in range(limit)
+        ]
+        return self._list("EventList", items)
+
+    def kubeconfig(self) -> Dict[str, Any]:
+        """A kubeconfig whose current context points at this server."""
+        return {
+            "apiVersion": "v1",
+            "kind": "Config",
+            "current-context": "bench",
+            "clusters": [{"name": "bench", "cluster": {"server": self.url}}],
+            "contexts": [{"name": "bench", "context": {"cluster": "bench", "user": "bench"}}],
+            "users": [{"name": "bench", "user": {"token": "bench"}}],
+        }
@@ -3,11 +3,23 @@ Command-line interface for the Kubernetes Assistant.
 """
 
 import argparse
-import asyncio
+import json
 import logging
-from typing import Optional
-from kubewhisper.k8s import k8s_tools  # noqa: F401
-from kubewhisper.assistant import Assistant
+import sys
+from typing import TYPE_CHECKING, Optional
+from kubewhisper.k8s.stats_store import StatsSampler, StatsStore, set_default_store
+from kubewhisper.audio.asr import BACKENDS
+from kubewhisper.audio.tts_cache import DEFAULT_TTS_CACHE_PATH
+from kubewhisper.daemon import DEFAULT_SOCKET_PATH, DaemonError, connect_daemon
+from kubewhisper.llm.deepseek import DEFAULT_TIMEOUT as DEFAULT_LLM_TIMEOUT
+from kubewhisper.registry.compaction import DEFAULT_BUDGET_TOKENS, ResultCompactor, set_default_compactor
+from kubewhisper.registry.plugins import register_plugins
+from kubewhisper.startup_profile import ImportProfiler
+from kubewhisper import tracing
+
+# Each mode imports the subsystems it uses (LLM, audio, DSP) when it starts
+if TYPE_CHECKING:
+    from kubewhisper.assistant import Assistant
 
 
 def setup_logging(verbose: bool) -> None:
@@ -20,22 +32,292 @@ def setup_logging(verbose: bool) -> None:
     logging.basicConfig(level=log_level, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
 
 
-async def run_text_mode(assistant: Assistant, query: str) -> None:
+async def run_text_mode(assistant: "Assistant", query: str) -> None:
     """Run the assistant in text mode with a single query.
 
     Args:
         assistant: Initialized Assistant instance
         query: Text query to process
     """
-    response = await assistant.process_query(query)
-    response_text = response.get("response", response)
-    if assistant.output_mode == "voice" and assistant.speaker:
-        assistant.speaker.speak(response_text)
-    else:
-        print(f"Assistant: {response_text}")
+    trace = tracing.start_trace("text")
+    try:
+        with tracing.activate(trace):
+            response = await assistant.process_query(query)
+            response_text = response.get("response", response)
+            if assistant.output_mode == "voice" and assistant.tts:
+                await assistant.tts.speak(str(response_text))
+            else:
+                print(f"Assistant: {response_text}")
+    finally:
+        trace.finish()
+
+
+def run_text_via_daemon(args: argparse.Namespace) -> Optional[int]:
+    """Hand a text query to a running daemon instead of starting an assistant.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Exit code, or None if no daemon is running and the query must be answered locally
+    """
+    client = connect_daemon(args.socket)
+    if client is None:
+        return None
+    logging.debug(f"Sending query to the daemon at {client.socket_path}")
+    try:
+        response = client.query(args.text)
+    except DaemonError as e:
+        logging.error(f"Error: {e}")
+        return 1
+    response_text = response.get("response", response) if isinstance(response, dict) else response
+    print(f"Assistant: {response_text}")
+    return 0
+
+
+def needs_local_assistant(args: argparse.Namespace) -> bool:
+    """Return whether a text query uses options a running daemon would not apply to it.
+
+    The daemon answers with its own LLM, tool result, tracing and stats store
+    settings, so queries that set any of them are answered in this process.
+    """
+    return bool(
+        args.record_stats
+        or args.stats_db
+        or args.full_results
+        or args.result_budget != DEFAULT_BUDGET_TOKENS
+        or args.speculate
+        or args.hedge
+        or args.llm_timeout != DEFAULT_LLM_TIMEOUT
+        or args.trace
+        or args.metrics_port is not None
+        or args.metrics_json
+    )
+
+
+def print_trace(trace: tracing.Trace) -> None:
+    """Print the waterfall of a finished query to stderr."""
+    print(trace.waterfall(), file=sys.stderr, flush=True)
+
+
+def add_tracing_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the tracing and metrics export options to a parser."""
+    parser.add_argument("--trace", action="store_true", help="Print a waterfall of the stages of each query to stderr")
+    parser.add_argument(
+        "--metrics-port", type=int, help="Serve stage latency histograms on localhost (/metrics, /metrics.json)"
+    )
+    parser.add_argument("--metrics-json", metavar="FILE", help="Write stage latency percentiles as JSON on exit")
+
+
+def start_tracing(args: argparse.Namespace):
+    """Apply the tracing options.
+
+    Returns:
+        The metrics server, or None
+    """
+    if args.trace:
+        tracing.add_trace_listener(print_trace)
+    return tracing.start_metrics_server(args.metrics_port) if args.metrics_port is not None else None
+
+
+def add_result_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the tool result size options to a parser."""
+    parser.add_argument(
+        "--result-budget",
+        type=int,
+        default=DEFAULT_BUDGET_TOKENS,
+        metavar="TOKENS",
+        help="Summarize tool results larger than this (lists become counts, top items and rollups)",
+    )
+    parser.add_argument("--full-results", action="store_true", help="Never summarize tool results")
+
+
+def apply_result_arguments(args: argparse.Namespace) -> None:
+    """Apply the tool result size options."""
+    set_default_compactor(None if args.full_results else ResultCompactor(args.result_budget))
+
+
+def stop_tracing(args: argparse.Namespace, metrics_server) -> None:
+    """Stop the metrics server and write the metrics file."""
+    if metrics_server is not None:
+        metrics_server.shutdown()
+    if args.metrics_json:
+        with open(args.metrics_json, "w") as f:
+            f.write(tracing.get_metrics().to_json() + "\n")
+
+
+def run_serve(argv) -> int:
+    """Run the resident daemon until it is interrupted or asked to shut down.
+
+    Args:
+        argv: Arguments following "serve"
+
+    Returns:
+        Exit code
+    """
+    parser = argparse.ArgumentParser(
+        prog="kubewhisper serve",
+        description="Keep the assistant and its models loaded and answer queries from clients",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket the daemon listens on")
+    parser.add_argument("--http-port", type=int, help="Also accept POST /request on this localhost port")
+    parser.add_argument("--no-audio", action="store_true", help="Do not load speech recognition for audio requests")
+    parser.add_argument("--model", help="Path or name of the Whisper model to use (default: backend's model)")
+    parser.add_argument("--asr-backend", choices=BACKENDS, default="auto", help="Speech recognition backend")
+    parser.add_argument("--asr-threads", type=int, default=0, help="CPU threads for speech recognition (0 = auto)")
+    parser.add_argument("--beam-size", type=int, default=1, help="Beam size for speech recognition (1 = greedy)")
+    parser.add_argument(
+        "--compute-type", default="default", help="Model precision, e.g. int8, int8_float32, float16, float32"
+    )
+    parser.add_argument("--workers", type=int, default=1, help="Audio requests transcribed at once")
+    parser.add_argument("--stats-db", help="Path of the stats database (default: ~/.kubewhisper/stats.db)")
+    parser.add_argument(
+        "--speculate", action="store_true", help="Start the likely tool call of each query while the LLM answers"
+    )
+    parser.add_argument("--hedge", action="store_true", help="Ask the LLM again when an answer is slower than its p95")
+    parser.add_argument("--llm-timeout", type=float, default=DEFAULT_LLM_TIMEOUT, help="Seconds the LLM may take")
+    add_tracing_arguments(parser)
+    add_result_arguments(parser)
+    args = parser.parse_args(argv)
+
+    setup_logging(args.verbose)
+    if args.stats_db:
+        set_default_store(StatsStore(args.stats_db))
+    metrics_server = start_tracing(args)
+    apply_result_arguments(args)
+
+    from kubewhisper.assistant import Assistant
+    from kubewhisper.daemon import DaemonServer
+
+    assistant = Assistant(
+        output_mode="text",
+        voice_input=False,
+        tts_cache_dir=None,
+        speculate=args.speculate,
+        llm_timeout=args.llm_timeout,
+        hedge=args.hedge,
+    )
+    server = None
+    try:
+        transcriber = None
+        if not args.no_audio:
+            from kubewhisper.audio.asr import create_backend
+            from kubewhisper.audio.batch import BatchTranscriber
+
+            backend = create_backend(
+                args.asr_backend,
+                model=args.model,
+                threads=args.asr_threads,
+                beam_size=args.beam_size,
+                compute_type=args.compute_type,
+                workers=args.workers,
+            )
+            backend.warmup()
+            transcriber = BatchTranscriber(backend, workers=args.workers)
+
+        server = DaemonServer(assistant, args.socket, http_port=args.http_port, transcriber=transcriber)
+        server.start()
+        server.wait()
+    except KeyboardInterrupt:
+        print("\nStopping daemon...")
+    except Exception as e:
+        logging.error(f"Error: {str(e)}")
+        return 1
+    finally:
+        if server:
+            server.stop()
+        assistant.close()
+        stop_tracing(args, metrics_server)
+    return 0
+
+
+def run_bench(argv) -> int:
+    """Benchmark the query path against local stand-ins and compare with a baseline.
+
+    Args:
+        argv: Arguments following "bench"
+
+    Returns:
+        Exit code: 1 if a scenario failed or a latency regressed against the baseline
+    """
+    parser = argparse.ArgumentParser(
+        prog="kubewhisper bench",
+        description="Run text and recorded-audio scenarios through the assistant with local stand-ins "
+        "for the LLM, text-to-speech and Kubernetes APIs",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
+    )
+    parser.add_argument("config", nargs="?", help="JSON file with stand-in settings and scenarios (default: built-in)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario")
+    parser.add_argument("--warmup", type=int, default=1, help="Untimed runs per scenario")
+    parser.add_argument("--concurrency", type=int, default=1, help="Runs of a scenario in flight at once")
+    parser.add_argument(
+        "--simulate-playback", action="store_true", help="Wait for the synthesized audio's duration when speaking"
+    )
+    parser.add_argument("--asr-backend", choices=BACKENDS, default="auto", help="Backend for audio scenarios")
+    parser.add_argument("--model", help="Speech recognition model for audio scenarios")
+    parser.add_argument(
+        "--speculate", action="store_true", help="Start the likely tool call of each query while the LLM answers"
+    )
+    parser.add_argument("--hedge", action="store_true", help="Ask the LLM again when an answer is slower than its p95")
+    parser.add_argument("--results", metavar="FILE", help="Write the JSON report to a file")
+    parser.add_argument("--baseline", metavar="FILE", help="Report of an earlier run to compare against")
+    parser.add_argument("--save-baseline", metavar="FILE", help="Write the JSON report as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative latency increase")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.verbose)
+    if not args.verbose:
+        # Per-query log lines would drown the report
+        logging.getLogger().setLevel(logging.WARNING)
+
+    from kubewhisper.bench.runner import BenchRunner, compare_to_baseline, load_config, print_report
+
+    runner = BenchRunner(
+        load_config(args.config),
+        runs=args.runs,
+        warmup=args.warmup,
+        concurrency=args.concurrency,
+        simulate_playback=args.simulate_playback,
+        asr_backend=args.asr_backend,
+        model=args.model,
+        speculate=args.speculate,
+        hedge=args.hedge,
+    )
+    report = runner.run()
+    print_report(report, sys.stdout)
+    for path in (args.results, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+
+    failed = sum(result["failed"] for result in report["scenarios"].values())
+    if failed:
+        logging.error(f"{failed} runs failed")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_to_baseline(report, json.load(f), tolerance=args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against the baseline")
+    return 1 if failed else 0
+
+
+def print_partial_transcript(committed: str, tentative: str) -> None:
+    """Print a partial transcript while the user is still speaking.
+
+    Args:
+        committed: Text that will no longer change
+        tentative: Text that may still be revised
+    """
+    print(f"\r... {committed} {tentative}", end="", flush=True)
 
 
-def run_voice_mode(assistant: Assistant, duration: float, device_index: Optional[int]) -> None:
+def run_voice_mode(assistant: "Assistant", duration: float, device_index: Optional[int]) -> None:
     """Run the assistant in voice interaction mode.
 
     Args:
@@ -54,9 +336,119 @@ def run_voice_mode(assistant: Assistant, duration: float, device_index: Optional
         assistant.stop_voice_interaction()
 
 
-def main():
+def run_batch_mode(args: argparse.Namespace, assistant: Optional["Assistant"]) -> int:
+    """Transcribe recorded audio files and write JSONL results.
+
+    Args:
+        args: Parsed command-line arguments
+        assistant: Assistant answering the transcripts, or None to only transcribe
+
+    Returns:
+        Exit code: 1 if no files were found or any file failed
+    """
+    from kubewhisper.audio.asr import create_backend
+    from kubewhisper.audio.batch import BatchTranscriber, find_audio_files
+
+    paths = find_audio_files(args.audio_file or [], args.audio_dir)
+    if not paths:
+        logging.error("No WAV or FLAC files found")
+        return 1
+
+    backend = create_backend(
+        args.asr_backend,
+        model=args.model,
+        threads=args.asr_threads,
+        beam_size=args.beam_size,
+        compute_type=args.compute_type,
+        workers=args.workers,
+    )
+
+    process_query = None
+    if assistant is not None:
+
+        def process_query(text: str) -> dict:
+            return assistant.runtime.run(assistant.process_query(text))
+
+    batch = BatchTranscriber(backend, workers=args.workers, process_query=process_query)
+    if args.results:
+        with open(args.results, "w") as output:
+            summary = batch.run(paths, output)
+    else:
+        summary = batch.run(paths, sys.stdout)
+    return 1 if summary["failed"] else 0
+
+
+def run_query_batch_mode(args: argparse.Namespace, assistant: "Assistant") -> int:
+    """Answer the queries of a file (or stdin) concurrently and write JSONL results.
+
+    Args:
+        args: Parsed command-line arguments
+        assistant: Assistant answering the queries
+
+    Returns:
+        Exit code: 1 if the input is invalid or any query failed
+    """
+    from kubewhisper.query_batch import QueryBatch, read_queries
+
+    try:
+        if args.batch == "-":
+            queries = read_queries(sys.stdin)
+        else:
+            with open(args.batch) as f:
+                queries = read_queries(f)
+    except (OSError, ValueError) as e:
+        logging.error(f"Cannot read queries: {e}")
+        return 1
+
+    batch = QueryBatch(assistant.process_query, concurrency=args.concurrency)
+    if args.results:
+        with open(args.results, "w") as output:
+            summary = assistant.runtime.run(batch.run(queries, output))
+    else:
+        summary = assistant.runtime.run(batch.run(queries, sys.stdout))
+    return 1 if summary["failed"] else 0
+
+
+def run_wake_word_measurement(args: argparse.Namespace) -> int:
+    """Print the wake word false-accept rate on background audio and the per-block cost.
+
+    Args:
+        args: Parsed command-line arguments
+
+    Returns:
+        Exit code
+    """
+    if not args.wake_template:
+        logging.error("--measure-wake-word needs at least one --wake-template recording")
+        return 1
+
+    from kubewhisper.audio.wake_word import WakeWordDetector, benchmark_block_cost, measure_false_accepts
+    from kubewhisper.audio.wav_io import read_audio_file
+
+    detector = WakeWordDetector.from_recordings(
+        args.wake_template, threshold=args.wake_threshold, cpu_budget=args.wake_cpu_budget
+    )
+    audio, sample_rate = read_audio_file(args.measure_wake_word)
+    report = {
+        "false_accepts": measure_false_accepts(detector, audio, sample_rate),
+        "detector": detector.stats(),
+        "block_cost": benchmark_block_cost(detector),
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["serve"]:
+        return run_serve(argv[1:])
+    if argv[:1] == ["bench"]:
+        return run_bench(argv[1:])
+
     parser = argparse.ArgumentParser(
-        description="Kubernetes Voice Assistant CLI", formatter_class=argparse.ArgumentDefaultsHelpFormatter
+        description="Kubernetes Voice Assistant CLI (also: 'kubewhisper serve' keeps a warm daemon, "
+        "'kubewhisper bench' benchmarks offline)",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter,
     )
 
     # General options
@@ -66,38 +458,208 @@ def main():
     mode_group = parser.add_mutually_exclusive_group(required=True)
     mode_group.add_argument("-t", "--text", help="Run in text mode with the provided query")
     mode_group.add_argument("--voice", action="store_true", help="Run in voice interaction mode")
+    mode_group.add_argument(
+        "--audio-file", action="append", metavar="FILE", help="Transcribe a WAV or FLAC file (repeatable)"
+    )
+    mode_group.add_argument("--audio-dir", help="Transcribe every WAV and FLAC file in a directory")
+    mode_group.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Answer the queries in a file (one per line, or JSONL with 'query' and 'id'; - for stdin) concurrently",
+    )
+    mode_group.add_argument(
+        "--measure-wake-word",
+        metavar="BACKGROUND_FILE",
+        help="Measure wake word false accepts on a recording without the wake phrase, and per-block cost",
+    )
 
     # Output mode selection
     parser.add_argument(
         "--output", choices=["text", "voice"], default="text", help="Choose output mode (text or voice via ElevenLabs)"
     )
+    parser.add_argument(
+        "--tts-cache",
+        default=DEFAULT_TTS_CACHE_PATH,
+        metavar="DIR",
+        help="Directory caching synthesized speech for voice output",
+    )
+    parser.add_argument("--tts-cache-size", type=int, default=64, help="Size limit of the speech cache in MB")
+    parser.add_argument("--no-tts-cache", action="store_true", help="Synthesize every spoken answer remotely")
+    parser.add_argument(
+        "--no-barge-in", action="store_true", help="Finish speaking an answer even when a new utterance starts"
+    )
     parser.add_argument("--elevenlabs-key", help="ElevenLabs API key (can also be set via ELEVENLABS_API_KEY env var)")
+    parser.add_argument(
+        "--speculate",
+        action="store_true",
+        help="Start the likely tool call of each query while the LLM is still answering (read-only tools only)",
+    )
+    parser.add_argument(
+        "--llm-timeout", type=float, default=DEFAULT_LLM_TIMEOUT, help="Seconds the LLM may take to answer a query"
+    )
+    parser.add_argument(
+        "--hedge",
+        action="store_true",
+        help="Send a query to the LLM a second time when it takes longer than the recent p95; the first answer wins",
+    )
 
     # Voice mode options
+    parser.add_argument("--model", help="Path or name of the Whisper model to use (default: backend's model)")
     parser.add_argument(
-        "--model", default="mlx-community/whisper-large-v3-turbo", help="Path or name of the Whisper model to use"
+        "--asr-backend",
+        choices=BACKENDS,
+        default="auto",
+        help="Speech recognition backend; auto uses MLX on Apple silicon and faster-whisper on the CPU elsewhere",
+    )
+    parser.add_argument("--asr-threads", type=int, default=0, help="CPU threads for speech recognition (0 = auto)")
+    parser.add_argument("--beam-size", type=int, default=1, help="Beam size for speech recognition (1 = greedy)")
+    parser.add_argument(
+        "--compute-type", default="default", help="Model precision, e.g. int8, int8_float32, float16, float32"
     )
     parser.add_argument("--duration", type=float, default=4.0, help="Recording duration in seconds for voice mode")
     parser.add_argument("--device", type=int, help="Audio input device index")
+    parser.add_argument(
+        "--streaming", action="store_true", help="Transcribe while speaking and show partial transcripts"
+    )
+    parser.add_argument(
+        "--capture",
+        choices=["push-to-talk", "vad", "wake"],
+        default="push-to-talk",
+        help="Start and stop recordings with the spacebar, hands-free with voice activity detection, "
+        "or with a wake word followed by a --duration capture window",
+    )
+    parser.add_argument(
+        "--end-silence", type=float, default=0.6, help="Seconds of trailing silence that end an utterance (vad)"
+    )
+
+    parser.add_argument(
+        "--wake-template",
+        action="append",
+        metavar="FILE",
+        help="WAV recording of the wake phrase for --capture wake (repeat for several recordings)",
+    )
+    parser.add_argument(
+        "--wake-threshold", type=float, default=0.12, help="Wake word detection threshold (lower is stricter)"
+    )
+    parser.add_argument(
+        "--wake-cpu-budget", type=float, default=0.05, help="Share of one CPU core the wake word detector may use"
+    )
+
+    # Batch audio options
+    parser.add_argument("--workers", type=int, default=1, help="Audio files transcribed at once in batch mode")
+    parser.add_argument(
+        "--process-queries", action="store_true", help="Also answer each transcript with the assistant in batch mode"
+    )
+    parser.add_argument("--concurrency", type=int, default=4, help="Queries answered at once with --batch")
+    parser.add_argument(
+        "--results", metavar="FILE", help="Write batch or --batch JSONL results to a file instead of stdout"
+    )
+
+    # Stats recording options
+    parser.add_argument(
+        "--record-stats",
+        action="append",
+        metavar="TOOL[:PARAM=VALUE,...]",
+        help="Periodically record the numeric output of a tool for trend questions (repeatable)",
+    )
+    parser.add_argument("--record-interval", type=float, default=60.0, help="Seconds between stats samples")
+    parser.add_argument("--stats-db", help="Path of the stats database (default: ~/.kubewhisper/stats.db)")
+
+    # Daemon client options
+    parser.add_argument("--socket", default=DEFAULT_SOCKET_PATH, help="Unix socket of a running daemon")
+    parser.add_argument(
+        "--no-daemon", action="store_true", help="Answer text queries in this process even when a daemon is running"
+    )
+
+    add_tracing_arguments(parser)
+    add_result_arguments(parser)
+    parser.add_argument(
+        "--profile-startup",
+        action="store_true",
+        help="Print per-module import times and startup phase timings to stderr on exit",
+    )
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    profiler = ImportProfiler().install() if args.profile_startup else None
 
     # Setup logging
     setup_logging(args.verbose)
 
-    # Initialize assistant
-    assistant = Assistant(
-        model_path=args.model,
-        input_device=args.device,
-        recording_duration=args.duration,
-        output_mode=args.output,
-        elevenlabs_api_key=args.elevenlabs_key,
-    )
+    if args.stats_db:
+        set_default_store(StatsStore(args.stats_db))
+
+    if args.measure_wake_word:
+        exit_code = run_wake_word_measurement(args)
+        if profiler:
+            profiler.mark("wake word measurement")
+            profiler.uninstall()
+            profiler.report()
+        return exit_code
+    metrics_server = start_tracing(args)
+    apply_result_arguments(args)
+
+    # A running daemon answers text queries without this process loading the assistant
+    if args.text and args.output == "text" and not args.no_daemon and not needs_local_assistant(args):
+        exit_code = run_text_via_daemon(args)
+        if exit_code is not None:
+            if profiler:
+                profiler.mark("query answered by daemon")
+                profiler.uninstall()
+                profiler.report()
+            return exit_code
+
+    batch_mode = bool(args.audio_file or args.audio_dir)
+
+    # Initialize assistant; transcribing files alone needs neither the LLM nor a microphone
+    assistant = None
+    if not batch_mode or args.process_queries:
+        from kubewhisper.assistant import Assistant
+
+        assistant = Assistant(
+            model_path=args.model,
+            input_device=args.device,
+            recording_duration=args.duration,
+            output_mode=args.output,
+            elevenlabs_api_key=args.elevenlabs_key,
+            streaming=args.streaming,
+            on_partial=print_partial_transcript if args.streaming else None,
+            capture_mode=args.capture.replace("-", "_"),
+            end_silence=args.end_silence,
+            asr_backend=args.asr_backend,
+            asr_threads=args.asr_threads,
+            beam_size=args.beam_size,
+            compute_type=args.compute_type,
+            preload_model=args.voice,
+            voice_input=args.voice,
+            wake_templates=args.wake_template or (),
+            wake_threshold=args.wake_threshold,
+            wake_cpu_budget=args.wake_cpu_budget,
+            tts_cache_dir=None if args.no_tts_cache else args.tts_cache,
+            tts_cache_bytes=args.tts_cache_size * 1024 * 1024,
+            barge_in=not args.no_barge_in,
+            speculate=args.speculate,
+            llm_timeout=args.llm_timeout,
+            hedge=args.hedge,
+        )
+    if profiler:
+        profiler.mark("assistant initialized")
+
+    # Record stats in the background while the assistant runs
+    sampler = None
+    if args.record_stats:
+        runtime = assistant.runtime if assistant else None
+        register_plugins()
+        sampler = StatsSampler(args.record_stats, interval=args.record_interval, runtime=runtime)
+        sampler.start()
 
     # Run in selected mode
     try:
         if args.text:
-            asyncio.run(run_text_mode(assistant, args.text))
+            assistant.runtime.run(run_text_mode(assistant, args.text))
+        elif args.batch:
+            return run_query_batch_mode(args, assistant)
+        elif batch_mode:
+            return run_batch_mode(args, assistant)
         else:  # voice mode
             run_voice_mode(assistant, args.duration, args.device)
     except KeyboardInterrupt:
@@ -105,6 +667,21 @@ def main():
     except Exception as e:
         logging.error(f"Error: {str(e)}")
         return 1
+    finally:
+        if sampler:
+            sampler.stop()
+        if args.voice:
+            logging.info(f"Speech recognition real-time factor: {assistant.transcriber.asr.stats.as_dict()}")
+        if assistant:
+            if assistant.prefetcher:
+                logging.info(f"Tool speculation: {assistant.prefetcher.snapshot()}")
+            logging.info(f"LLM requests: {assistant.llm.snapshot()}")
+            assistant.close()
+        stop_tracing(args, metrics_server)
+        if profiler:
+            profiler.mark("run and shutdown")
+            profiler.uninstall()
+            profiler.report()
 
     return 0
 
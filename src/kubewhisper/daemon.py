@@ -0,0 +1,360 @@
+"""
+Resident daemon that keeps the assistant warm, and the thin client the CLI uses to reach it.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from kubewhisper import tracing
+
+if TYPE_CHECKING:
+    from kubewhisper.assistant import Assistant
+    from kubewhisper.audio.batch import BatchTranscriber
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET_PATH = os.path.join("~", ".kubewhisper", "daemon.sock")
+
+# Upper bound of one request line; base64 audio payloads make up most of it
+MAX_REQUEST_BYTES = 64 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    """Raised by the client when the daemon cannot be reached or rejects a request."""
+
+
+class DaemonServer:
+    """Answers queries from clients with one long-lived assistant.
+
+    The assistant, its LLM and Kubernetes clients and the speech recognition
+    model stay loaded between queries. Clients connect over a Unix socket and
+    exchange newline-delimited JSON: one request object per line, answered by
+    one response object per line. Every connection is a session handled by its
+    own task, so slow queries from one client do not hold up the others;
+    requests within a session are answered in order. The same requests are
+    accepted as POST /request on an optional localhost HTTP port.
+
+    Requests carry an "op":
+        {"op": "query", "text": "...", "full_results": false}: answer a text query; with
+            full_results, a tool result that was summarized is returned in full as well
+        {"op": "audio", "audio": "<base64 WAV or FLAC>", "answer": true}: transcribe and answer
+        {"op": "ping"}: liveness and statistics
+        {"op": "metrics"}: stage latency percentiles, LLM request statistics
+        {"op": "shutdown"}: stop the daemon
+    Responses have "ok" and either the result fields or an "error".
+    """
+
+    def __init__(
+        self,
+        assistant: "Assistant",
+        socket_path: str = DEFAULT_SOCKET_PATH,
+        http_port: Optional[int] = None,
+        transcriber: Optional["BatchTranscriber"] = None,
+    ):
+        """Initialize the server without starting it.
+
+        Args:
+            assistant: Assistant answering the queries; its runtime loop runs the server
+            socket_path: Path of the Unix socket
+            http_port: Localhost port for HTTP requests, or None for the socket only
+            transcriber: Transcriber for audio requests, or None to reject them
+        """
+        self.assistant = assistant
+        self.socket_path = os.path.expanduser(socket_path)
+        self.http_port = http_port
+        self.transcriber = transcriber
+        self.started = time.time()
+        self.requests = 0
+        self.active_sessions = 0
+        self._stopped = threading.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._http_runner = None
+
+    def start(self) -> None:
+        """Bind the socket (and HTTP port) and start accepting clients on the assistant's loop.
+
+        Raises:
+            RuntimeError: If another daemon is already listening on the socket
+        """
+        if connect_daemon(self.socket_path) is not None:
+            raise RuntimeError(f"A daemon is already listening on {self.socket_path}")
+        # A socket file left behind by a daemon that did not shut down cleanly
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(self.socket_path), exist_ok=True)
+
+        self.assistant.runtime.run(self._start())
+        logger.info(f"Daemon listening on {self.socket_path}")
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until the daemon is asked to shut down.
+
+        Returns:
+            Whether shutdown was requested within the timeout
+        """
+        return self._stopped.wait(timeout)
+
+    def stop(self) -> None:
+        """Stop accepting clients and remove the socket."""
+        self._stopped.set()
+        if self._server is not None:
+            try:
+                self.assistant.runtime.run(self._stop(), timeout=5.0)
+            except Exception as e:
+                logger.warning(f"Daemon shutdown did not complete: {e}")
+            self._server = None
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    async def _start(self) -> None:
+        self._server = await asyncio.start_unix_server(
+            self._handle_session, path=self.socket_path, limit=MAX_REQUEST_BYTES
+        )
+        # The socket answers queries with cluster access, so only its owner may connect
+        os.chmod(self.socket_path, 0o600)
+
+        if self.http_port is not None:
+            from aiohttp import web
+
+            app = web.Application(client_max_size=MAX_REQUEST_BYTES)
+            app.router.add_post("/request", self._handle_http)
+            self._http_runner = web.AppRunner(app)
+            await self._http_runner.setup()
+            await web.TCPSite(self._http_runner, "127.0.0.1", self.http_port).start()
+            logger.info(f"Daemon accepting HTTP requests on http://127.0.0.1:{self.http_port}/request")
+
+    async def _stop(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+        if self._http_runner is not None:
+            await self._http_runner.cleanup()
+            self._http_runner = None
+
+    async def _handle_session(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Answer the requests of one connection until the client disconnects."""
+        self.active_sessions += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    writer.write(_encode({"ok": False, "error": "Request too large"}))
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                except json.JSONDecodeError as e:
+                    response = {"ok": False, "error": f"Invalid JSON: {e}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(_encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def _handle_http(self, request):
+        from aiohttp import web
+
+        try:
+            payload = await request.json()
+        except json.JSONDecodeError as e:
+            return web.json_response({"ok": False, "error": f"Invalid JSON: {e}"}, status=400)
+        response = await self.handle(payload)
+        return web.json_response(response, status=200 if response["ok"] else 400, dumps=_dumps)
+
+    async def handle(self, request: Any) -> Dict[str, Any]:
+        """Answer one request.
+
+        Args:
+            request: Decoded request object
+
+        Returns:
+            The response object
+        """
+        if not isinstance(request, dict):
+            return {"ok": False, "error": "Request must be a JSON object"}
+        op = request.get("op", "query")
+        self.requests += 1
+        start = time.perf_counter()
+        try:
+            if op == "query":
+                result = await self._query(request)
+            elif op == "audio":
+                result = await self._audio(request)
+            elif op == "ping":
+                result = self.stats()
+            elif op == "metrics":
+                result = {"stages": tracing.get_metrics().snapshot(), "llm": self.assistant.llm.snapshot()}
+                if self.assistant.prefetcher is not None:
+                    result["speculation"] = self.assistant.prefetcher.snapshot()
+            elif op == "shutdown":
+                logger.info("Shutdown requested by a client")
+                self._stopped.set()
+                result = {}
+            else:
+                return {"ok": False, "error": f"Unknown op: {op}"}
+        except Exception as e:
+            logger.error(f"Error handling {op} request: {e}")
+            return {"ok": False, "error": str(e)}
+        result["ok"] = True
+        result["seconds"] = round(time.perf_counter() - start, 4)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Uptime and load of the daemon."""
+        return {
+            "pid": os.getpid(),
+            "uptime": round(time.time() - self.started, 1),
+            "requests": self.requests,
+            "active_sessions": self.active_sessions,
+            "audio": self.transcriber is not None,
+        }
+
+    async def _query(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        text = request.get("text")
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError("Query needs a non-empty 'text'")
+        return {"response": await self._answer(text, request)}
+
+    async def _answer(self, text: str, request: Dict[str, Any]) -> Any:
+        response = await self.assistant.process_query(text)
+        if isinstance(response, dict) and not request.get("full_results"):
+            response.pop("full_result", None)
+        return response
+
+    async def _audio(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        if self.transcriber is None:
+            raise ValueError("The daemon was started without speech recognition")
+        from kubewhisper.audio.wav_io import read_audio_bytes
+
+        data = base64.b64decode(request.get("audio") or "", validate=True)
+
+        def transcribe() -> Dict[str, Any]:
+            audio, sample_rate = read_audio_bytes(data)
+            with tracing.span("asr.transcribe", audio_seconds=round(len(audio) / sample_rate, 2)):
+                return self.transcriber.transcribe_audio(audio, sample_rate, {})
+
+        trace = tracing.start_trace("audio")
+        try:
+            with tracing.activate(trace):
+                # Decoding and the model run on a worker thread so other sessions keep being served
+                record = await asyncio.to_thread(transcribe)
+                if "error" in record:
+                    raise ValueError(record["error"])
+                result = {"text": record["text"], "timings": record["timings"], "rtf": record["rtf"]}
+                if request.get("answer", True) and record["text"]:
+                    result["response"] = await self._answer(record["text"], request)
+        finally:
+            trace.finish()
+        return result
+
+
+def _dumps(obj: Any) -> str:
+    return json.dumps(obj, default=str)
+
+
+def _encode(obj: Dict[str, Any]) -> bytes:
+    return (_dumps(obj) + "\n").encode()
+
+
+class DaemonClient:
+    """Sends requests to a running daemon over its Unix socket.
+
+    Uses only the standard library, so a CLI invocation that hands its query to
+    the daemon does not import the assistant's dependencies.
+    """
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET_PATH, timeout: Optional[float] = 120.0):
+        """Initialize the client.
+
+        Args:
+            socket_path: Path of the daemon's Unix socket
+            timeout: Seconds to wait for a response
+        """
+        self.socket_path = os.path.expanduser(socket_path)
+        self.timeout = timeout
+
+    def request(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Send one request and wait for its response.
+
+        Raises:
+            DaemonError: If the daemon cannot be reached or answers with an error
+        """
+        try:
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+                sock.sendall(_encode(payload))
+                with sock.makefile("rb") as stream:
+                    line = stream.readline()
+        except OSError as e:
+            raise DaemonError(f"Cannot reach daemon at {self.socket_path}: {e}") from e
+        if not line:
+            raise DaemonError("Daemon closed the connection without answering")
+        response = json.loads(line)
+        if not response.get("ok"):
+            raise DaemonError(response.get("error", "Request failed"))
+        return response
+
+    def ping(self) -> Dict[str, Any]:
+        """Return the daemon's statistics."""
+        return self.request({"op": "ping"})
+
+    def query(self, text: str) -> Dict[str, Any]:
+        """Answer a text query.
+
+        Returns:
+            The assistant's response
+        """
+        return self.request({"op": "query", "text": text})["response"]
+
+    def transcribe(self, path: str, answer: bool = True) -> Dict[str, Any]:
+        """Transcribe a WAV or FLAC file and optionally answer the transcript.
+
+        Returns:
+            Response with "text", "timings" and, when answered, "response"
+        """
+        with open(path, "rb") as f:
+            audio = base64.b64encode(f.read()).decode("ascii")
+        return self.request({"op": "audio", "audio": audio, "answer": answer})
+
+    def shutdown(self) -> None:
+        """Ask the daemon to stop."""
+        self.request({"op": "shutdown"})
+
+
+def connect_daemon(socket_path: str = DEFAULT_SOCKET_PATH, timeout: float = 0.5) -> Optional[DaemonClient]:
+    """Return a client for the daemon listening on a socket, or None if none is running.
+
+    Args:
+        socket_path: Path of the daemon's Unix socket
+        timeout: Seconds to wait for the daemon to accept the connection
+
+    Returns:
+        Client for the daemon, or None if the socket is missing or nobody is listening
+    """
+    path = os.path.expanduser(socket_path)
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(path):
+        return None
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(path)
+    except OSError:
+        return None
+    return DaemonClient(path)
@@ -0,0 +1,102 @@
+"""
+Connections shared by the Kubernetes tools: API client, transport and HTTP session.
+"""
+
+import asyncio
+import os
+import threading
+import weakref
+from typing import Optional, Set
+
+from kubewhisper.k8s.transport import KubeTransport
+from kubewhisper.lazy import lazy_import
+
+# Loaded when the first tool connects, so importing this module stays cheap
+aiohttp = lazy_import("aiohttp")
+client = lazy_import("kubernetes.client")
+config = lazy_import("kubernetes.config")
+
+_api_client: Optional["client.ApiClient"] = None
+_api_client_lock = threading.Lock()
+_http_sessions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = (
+    weakref.WeakKeyDictionary()
+)
+_transports: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, KubeTransport]" = weakref.WeakKeyDictionary()
+_closing: Set[asyncio.Task] = set()
+
+
+def get_api_client() -> "client.ApiClient":
+    """Return the Kubernetes API client for the current context, loading the kubeconfig once.
+
+    The client and its connection pool are reused by every tool until reset_api_client is called.
+    """
+    global _api_client
+    with _api_client_lock:
+        if _api_client is None:
+            configuration = client.Configuration()
+            # KUBECONFIG is read now rather than when the kubernetes package was imported
+            config.load_kube_config(config_file=os.environ.get("KUBECONFIG"), client_configuration=configuration)
+            _api_client = client.ApiClient(configuration)
+        return _api_client
+
+
+def reset_api_client() -> None:
+    """Drop the cached API client so the next tool call reads the kubeconfig again."""
+    global _api_client
+    with _api_client_lock:
+        if _api_client is not None:
+            _api_client.close()
+        _api_client = None
+
+
+def core_v1() -> "client.CoreV1Api":
+    """Return a CoreV1Api bound to the shared API client."""
+    return client.CoreV1Api(get_api_client())
+
+
+def get_http_session() -> "aiohttp.ClientSession":
+    """Return the HTTP session of the running event loop, creating it on first use.
+
+    Sessions are bound to a loop, so each loop gets its own; with a long-lived
+    loop, connections are kept alive across tool calls.
+    """
+    loop = asyncio.get_running_loop()
+    session = _http_sessions.get(loop)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession()
+        _http_sessions[loop] = session
+    return session
+
+
+async def close_http_session() -> None:
+    """Close the HTTP session of the running event loop."""
+    session = _http_sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None:
+        await session.close()
+
+
+def get_transport() -> KubeTransport:
+    """Return the Kubernetes API transport of the running event loop for the current context.
+
+    Like the HTTP session, each loop gets its own transport and connection pool;
+    after reset_api_client (e.g. a cluster switch) the next call replaces it.
+    """
+    loop = asyncio.get_running_loop()
+    configuration = get_api_client().configuration
+    transport = _transports.get(loop)
+    if transport is None or transport.configuration is not configuration:
+        if transport is not None:
+            # Held until done, as the loop only keeps weak references to tasks
+            closing = loop.create_task(transport.close())
+            _closing.add(closing)
+            closing.add_done_callback(_closing.discard)
+        transport = KubeTransport(configuration)
+        _transports[loop] = transport
+    return transport
+
+
+async def close_transport() -> None:
+    """Close the Kubernetes API transport of the running event loop."""
+    transport = _transports.pop(asyncio.get_running_loop(), None)
+    if transport is not None:
+        await transport.close()
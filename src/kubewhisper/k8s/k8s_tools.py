@@ -2,17 +2,28 @@
 Kubernetes tools and utilities.
 """
 
+import asyncio
 import os
 import re
 from collections import defaultdict
 from typing import Any, Dict
 
-import aiohttp
 import yaml
-from kubernetes import client, config
 
+from kubewhisper.k8s.connections import (  # noqa: F401  re-exported for callers of the tools module
+    close_http_session,
+    close_transport,
+    core_v1,
+    get_api_client,
+    get_http_session,
+    get_transport,
+    reset_api_client,
+)
+from kubewhisper.lazy import lazy_import
 from kubewhisper.registry.function_registry import FunctionRegistry
 
+config = lazy_import("kubernetes.config")
+
 
 @FunctionRegistry.register(
     description="Get the number of nodes in the Kubernetes cluster.",
@@ -20,10 +31,8 @@ from kubewhisper.registry.function_registry import FunctionRegistry
 )
 async def get_number_of_nodes() -> Dict[str, Any]:
     """Get the total number of nodes in the cluster."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-    nodes = v1.list_node()
-    return {"node_count": len(nodes.items)}
+    nodes = await get_transport().list("/api/v1/nodes")
+    return {"node_count": len(nodes)}
 
 
 @FunctionRegistry.register(
@@ -32,10 +41,8 @@ async def get_number_of_nodes() -> Dict[str, Any]:
 )
 async def get_number_of_pods() -> Dict[str, Any]:
     """Get the total number of pods across all namespaces."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-    pods = v1.list_pod_for_all_namespaces()
-    return {"pod_count": len(pods.items)}
+    pods = await get_transport().list("/api/v1/pods")
+    return {"pod_count": len(pods)}
 
 
 @FunctionRegistry.register(
@@ -44,10 +51,8 @@ async def get_number_of_pods() -> Dict[str, Any]:
 )
 async def get_number_of_namespaces() -> Dict[str, Any]:
     """Get the total number of namespaces in the cluster."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-    namespaces = v1.list_namespace()
-    return {"namespace_count": len(namespaces.items)}
+    namespaces = await get_transport().list("/api/v1/namespaces")
+    return {"namespace_count": len(namespaces)}
 
 
 @FunctionRegistry.register(
@@ -80,24 +85,27 @@ async def analyze_deployment_logs(deployment_name: str, namespace: str = "defaul
     Returns:
         Dict containing analysis results
     """
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
+    transport = get_transport()
 
     # Get pods for deployment
-    pods = v1.list_namespaced_pod(namespace=namespace, label_selector=f"app={deployment_name}")
+    pods = await transport.list(f"/api/v1/namespaces/{namespace}/pods", labelSelector=f"app={deployment_name}")
 
-    log_analysis = defaultdict(int)
-    for pod in pods.items:
-        try:
-            logs = v1.read_namespaced_pod_log(name=pod.metadata.name, namespace=namespace, since_seconds=3600)
+    # The logs of all pods are read at once, over the transport's connection pool
+    names = [pod["metadata"]["name"] for pod in pods]
+    all_logs = await asyncio.gather(
+        *(transport.read_log(namespace, name, since_seconds=3600) for name in names), return_exceptions=True
+    )
 
-            # Count occurrences
-            log_analysis["CRITICAL"] += logs.count("CRITICAL")
-            log_analysis["ERROR"] += logs.count("ERROR")
-            log_analysis["WARNING"] += logs.count("WARNING")
+    log_analysis = defaultdict(int)
+    for name, logs in zip(names, all_logs):
+        if isinstance(logs, Exception):
+            print(f"Error getting logs for pod {name}: {str(logs)}")
+            continue
 
-        except Exception as e:
-            print(f"Error getting logs for pod {pod.metadata.name}: {str(e)}")
+        # Count occurrences
+        log_analysis["CRITICAL"] += logs.count("CRITICAL")
+        log_analysis["ERROR"] += logs.count("ERROR")
+        log_analysis["WARNING"] += logs.count("WARNING")
 
     return {"deployment_name": deployment_name, "namespace": namespace, "log_counts": dict(log_analysis)}
 
@@ -108,14 +116,11 @@ async def analyze_deployment_logs(deployment_name: str, namespace: str = "defaul
 )
 async def get_version_info() -> Dict[str, Any]:
     """Get version information for the Kubernetes cluster."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-    version = client.VersionApi().get_code()
+    transport = get_transport()
+    version, nodes = await asyncio.gather(transport.get("/version"), transport.list("/api/v1/nodes"))
+    node_versions = [node["status"]["nodeInfo"]["kubeletVersion"] for node in nodes]
 
-    nodes = v1.list_node()
-    node_versions = [node.status.node_info.kubelet_version for node in nodes.items]
-
-    return {"api_version": version.git_version, "node_versions": node_versions}
+    return {"api_version": version["gitVersion"], "node_versions": node_versions}
 
 
 @FunctionRegistry.register(
@@ -126,9 +131,8 @@ async def get_kubernetes_latest_version_information() -> Dict[str, Any]:
     """Get the latest stable Kubernetes version from GitHub."""
     url = "https://raw.githubusercontent.com/kubernetes/kubernetes/master/CHANGELOG/CHANGELOG-1.28.md"
 
-    async with aiohttp.ClientSession() as session:
-        async with session.get(url) as response:
-            content = await response.text()
+    async with get_http_session().get(url) as response:
+        content = await response.text()
 
     # Extract version using regex
     version_match = re.search(r"# v1\.28\.(\d+)", content)
@@ -146,7 +150,8 @@ async def get_kubernetes_latest_version_information() -> Dict[str, Any]:
 )
 async def get_available_clusters() -> Dict[str, Any]:
     """Get information about available Kubernetes clusters."""
-    kubeconfig = os.path.expanduser("~/.kube/config")
+    # Like kubectl, use the first file listed in KUBECONFIG if it is set
+    kubeconfig = os.path.expanduser(os.environ.get("KUBECONFIG", "~/.kube/config").split(os.pathsep)[0])
     with open(kubeconfig, "r") as f:
         config_data = yaml.safe_load(f)
 
@@ -179,6 +184,7 @@ async def get_available_clusters() -> Dict[str, Any]:
         },
         "required": ["cluster_name"],
     },
+    side_effects=True,
 )
 async def switch_cluster(cluster_name: str) -> Dict[str, Any]:
     """
@@ -196,6 +202,8 @@ async def switch_cluster(cluster_name: str) -> Dict[str, Any]:
         # Use kubectl command through os.system
         result = os.system(f"kubectl config use-context {cluster_name}")
         success = result == 0
+        if success:
+            reset_api_client()
 
         return {
             "cluster_name": cluster_name,
@@ -231,15 +239,17 @@ async def get_last_events(count: int = 4) -> Dict[str, Any]:
     Returns:
         Dict containing the events
     """
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
-
-    events = v1.list_event_for_all_namespaces(limit=count)
+    events = await get_transport().list("/api/v1/events", limit=count)
 
     event_list = []
-    for event in events.items:
+    for event in events:
         event_list.append(
-            {"type": event.type, "reason": event.reason, "message": event.message, "timestamp": event.last_timestamp}
+            {
+                "type": event.get("type"),
+                "reason": event.get("reason"),
+                "message": event.get("message"),
+                "timestamp": event.get("lastTimestamp"),
+            }
         )
 
     return {"events": event_list, "count": len(event_list)}
@@ -251,28 +261,25 @@ async def get_last_events(count: int = 4) -> Dict[str, Any]:
 )
 async def get_cluster_status() -> Dict[str, Any]:
     """Get comprehensive status information about the cluster."""
-    config.load_kube_config()
-    v1 = client.CoreV1Api()
+    transport = get_transport()
+
+    # Nodes and pods are listed side by side
+    nodes, pods = await asyncio.gather(transport.list("/api/v1/nodes"), transport.list("/api/v1/pods"))
 
     # Get nodes status
-    nodes = v1.list_node()
     node_status = defaultdict(int)
-    for node in nodes.items:
-        for condition in node.status.conditions:
-            if condition.type == "Ready":
-                node_status[condition.status] += 1
+    for node in nodes:
+        for condition in node["status"].get("conditions") or []:
+            if condition["type"] == "Ready":
+                node_status[condition["status"]] += 1
 
     # Get pods status
-    pods = v1.list_pod_for_all_namespaces()
     pod_status = defaultdict(int)
-    for pod in pods.items:
-        pod_status[pod.status.phase] += 1
+    for pod in pods:
+        pod_status[pod["status"].get("phase")] += 1
 
     status_summary = (
-        f"{len(nodes.items)} nodes "
-        f"({node_status['True']} ready), "
-        f"{len(pods.items)} pods "
-        f"({pod_status['Running']} running)"
+        f"{len(nodes)} nodes ({node_status['True']} ready), {len(pods)} pods ({pod_status['Running']} running)"
     )
 
     return {"node_status": dict(node_status), "pod_status": dict(pod_status), "status_summary": status_summary}
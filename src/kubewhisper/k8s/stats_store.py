@@ -0,0 +1,363 @@
+"""
+Local time-series store for sampled cluster statistics.
+
+Numeric fields from tool results are appended to a SQLite database so that
+trend questions can be answered from local reads instead of re-scanning the
+cluster. Raw samples are rolled up into fixed buckets once they age past the
+raw retention window, and rollups are dropped after the rollup retention.
+"""
+
+import asyncio
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from kubewhisper.registry.function_registry import FunctionRegistry
+from kubewhisper.runtime import AsyncRuntime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STATS_PATH = os.path.join("~", ".kubewhisper", "stats.db")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id INTEGER PRIMARY KEY,
+    name TEXT UNIQUE NOT NULL
+);
+CREATE TABLE IF NOT EXISTS samples (
+    series_id INTEGER NOT NULL,
+    ts INTEGER NOT NULL,
+    value REAL NOT NULL,
+    PRIMARY KEY (series_id, ts)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS rollups (
+    series_id INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    total REAL NOT NULL,
+    minimum REAL NOT NULL,
+    maximum REAL NOT NULL,
+    PRIMARY KEY (series_id, bucket)
+) WITHOUT ROWID;
+"""
+
+
+def flatten_result(result: Any, prefix: str = "") -> Dict[str, float]:
+    """Flatten the numeric leaves of a tool result into dotted metric names.
+
+    Args:
+        result: Tool result (usually a dict) to flatten
+        prefix: Name prefix for the current nesting level
+
+    Returns:
+        Dict mapping metric names to float values. Lists are recorded as their length.
+    """
+    values = {}
+    if isinstance(result, bool):
+        values[prefix] = float(result)
+    elif isinstance(result, (int, float)):
+        values[prefix] = float(result)
+    elif isinstance(result, dict):
+        for key, value in result.items():
+            name = f"{prefix}.{key}" if prefix else str(key)
+            values.update(flatten_result(value, name))
+    elif isinstance(result, (list, tuple)):
+        values[f"{prefix}.count" if prefix else "count"] = float(len(result))
+    return {name: value for name, value in values.items() if name}
+
+
+class StatsStore:
+    """Append-only SQLite store of sampled metric values with rollup-based downsampling."""
+
+    def __init__(
+        self,
+        path: str = DEFAULT_STATS_PATH,
+        raw_retention: float = 24 * 3600,
+        rollup_interval: int = 300,
+        rollup_retention: float = 30 * 24 * 3600,
+    ):
+        """Open (or create) the store.
+
+        Args:
+            path: Path of the SQLite database, or ":memory:"
+            raw_retention: Seconds raw samples are kept before being rolled up
+            rollup_interval: Width of a rollup bucket in seconds
+            rollup_retention: Seconds rollup buckets are kept
+        """
+        self.path = path if path == ":memory:" else os.path.expanduser(path)
+        self.raw_retention = raw_retention
+        self.rollup_interval = int(rollup_interval)
+        self.rollup_retention = rollup_retention
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        if self.path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._series_ids: Dict[str, int] = {
+            name: series_id for series_id, name in self._conn.execute("SELECT id, name FROM series")
+        }
+
+    def _series_id(self, name: str) -> int:
+        """Return the id for a series name, creating it if needed. Caller holds the lock."""
+        series_id = self._series_ids.get(name)
+        if series_id is None:
+            cursor = self._conn.execute("INSERT INTO series (name) VALUES (?)", (name,))
+            series_id = cursor.lastrowid
+            self._series_ids[name] = series_id
+        return series_id
+
+    def record(self, source: str, values: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """Append one sample per metric.
+
+        Args:
+            source: Name of the sampled source, used as series name prefix
+            values: Metric names mapped to values
+            timestamp: Sample time in seconds since the epoch (default: now)
+        """
+        ts = int(timestamp if timestamp is not None else time.time())
+        with self._lock, self._conn:
+            rows = [(self._series_id(f"{source}.{metric}"), ts, float(value)) for metric, value in values.items()]
+            self._conn.executemany("INSERT OR REPLACE INTO samples (series_id, ts, value) VALUES (?, ?, ?)", rows)
+
+    def series_names(self) -> List[str]:
+        """Return all known series names."""
+        with self._lock:
+            return sorted(self._series_ids)
+
+    def resolve_series(self, metric: str) -> str:
+        """Resolve a (possibly partial) metric name to a single series name.
+
+        An exact name or dotted suffix match wins. Otherwise every word of the
+        metric must occur in the series name, case-insensitively.
+
+        Raises:
+            ValueError: If no series or more than one series matches
+        """
+        names = self.series_names()
+        exact = [name for name in names if name == metric or name.endswith(f".{metric}")]
+        if len(exact) == 1:
+            return exact[0]
+
+        tokens = [token for token in re.split(r"[\s./_]+", metric.lower()) if token]
+        candidates = exact or [name for name in names if all(token in name.lower() for token in tokens)]
+        if not candidates:
+            raise ValueError(f"No recorded metric matches '{metric}'")
+        if len(candidates) > 1:
+            raise ValueError(f"Metric '{metric}' is ambiguous: {', '.join(candidates[:5])}")
+        return candidates[0]
+
+    def query_range(self, series: str, start: float, end: Optional[float] = None) -> List[Tuple[int, float]]:
+        """Return (timestamp, value) points for a series within [start, end], oldest first.
+
+        Rolled-up buckets contribute their mean value at the bucket start.
+        """
+        end = end if end is not None else time.time()
+        with self._lock:
+            series_id = self._series_ids.get(series)
+            if series_id is None:
+                return []
+            rows = self._conn.execute(
+                """
+                SELECT bucket, total / count FROM rollups WHERE series_id = ? AND bucket BETWEEN ? AND ?
+                UNION ALL
+                SELECT ts, value FROM samples WHERE series_id = ? AND ts BETWEEN ? AND ?
+                ORDER BY 1
+                """,
+                (series_id, int(start), int(end), series_id, int(start), int(end)),
+            ).fetchall()
+        return [(int(ts), float(value)) for ts, value in rows]
+
+    def value_at(self, series: str, timestamp: float) -> Optional[Tuple[int, float]]:
+        """Return the most recent (timestamp, value) point at or before the given time."""
+        with self._lock:
+            series_id = self._series_ids.get(series)
+            if series_id is None:
+                return None
+            row = self._conn.execute(
+                """
+                SELECT ts, value FROM (
+                    SELECT bucket AS ts, total / count AS value FROM rollups WHERE series_id = ? AND bucket <= ?
+                    UNION ALL
+                    SELECT ts, value FROM samples WHERE series_id = ? AND ts <= ?
+                ) ORDER BY ts DESC LIMIT 1
+                """,
+                (series_id, int(timestamp), series_id, int(timestamp)),
+            ).fetchone()
+        return (int(row[0]), float(row[1])) if row else None
+
+    def compact(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Roll up raw samples older than the raw retention and drop expired rollups.
+
+        Args:
+            now: Reference time in seconds since the epoch (default: now)
+
+        Returns:
+            Dict with the number of raw samples rolled up and rollup buckets removed
+        """
+        now = now if now is not None else time.time()
+        raw_cutoff = int(now - self.raw_retention)
+        rollup_cutoff = int(now - self.rollup_retention)
+        interval = self.rollup_interval
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                """
+                INSERT INTO rollups (series_id, bucket, count, total, minimum, maximum)
+                SELECT series_id, ts - ts % ?, COUNT(*), SUM(value), MIN(value), MAX(value)
+                FROM samples WHERE ts < ? GROUP BY series_id, ts - ts % ?
+                ON CONFLICT (series_id, bucket) DO UPDATE SET
+                    count = count + excluded.count,
+                    total = total + excluded.total,
+                    minimum = MIN(minimum, excluded.minimum),
+                    maximum = MAX(maximum, excluded.maximum)
+                """,
+                (interval, raw_cutoff, interval),
+            )
+            rolled_up = self._conn.execute("DELETE FROM samples WHERE ts < ?", (raw_cutoff,)).rowcount
+            expired = self._conn.execute("DELETE FROM rollups WHERE bucket < ?", (rollup_cutoff,)).rowcount
+
+        logger.debug(f"Compacted stats store: {rolled_up} samples rolled up, {expired} buckets expired")
+        return {"rolled_up": rolled_up, "expired": expired}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+_default_store: Optional[StatsStore] = None
+
+
+def get_default_store() -> StatsStore:
+    """Return the process-wide store, opening it from KUBEWHISPER_STATS_DB on first use."""
+    global _default_store
+    if _default_store is None:
+        _default_store = StatsStore(os.environ.get("KUBEWHISPER_STATS_DB", DEFAULT_STATS_PATH))
+    return _default_store
+
+
+def set_default_store(store: StatsStore) -> None:
+    """Replace the process-wide store."""
+    global _default_store
+    _default_store = store
+
+
+def parse_sample_target(spec: str) -> Tuple[str, Dict[str, str]]:
+    """Parse a sample target of the form 'tool_name[:param=value,...]'.
+
+    Returns:
+        Tuple of tool name and its parameters
+    """
+    name, _, params_spec = spec.partition(":")
+    params = {}
+    for item in filter(None, params_spec.split(",")):
+        key, sep, value = item.partition("=")
+        if not sep:
+            raise ValueError(f"Invalid sample target parameter '{item}' in '{spec}'")
+        params[key.strip()] = value.strip()
+    return name.strip(), params
+
+
+class StatsSampler:
+    """Background thread that periodically runs registered tools and records their numeric output."""
+
+    def __init__(
+        self,
+        targets: List[str],
+        store: Optional[StatsStore] = None,
+        interval: float = 60.0,
+        compact_interval: float = 3600.0,
+        runtime: Optional[AsyncRuntime] = None,
+    ):
+        """Initialize the sampler.
+
+        Args:
+            targets: Sample targets, e.g. ["get_cluster_status", "analyze_deployment_logs:deployment_name=web"]
+            store: Store to record into (default: the process-wide store)
+            interval: Seconds between samples
+            compact_interval: Seconds between store compactions
+            runtime: Event loop to run the tools on (default: a new loop per sample)
+        """
+        self.targets = [parse_sample_target(spec) for spec in targets]
+        self.store = store or get_default_store()
+        self.interval = interval
+        self.compact_interval = compact_interval
+        self.runtime = runtime
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._last_compaction = 0.0
+
+    @staticmethod
+    def source_name(tool_name: str, params: Dict[str, str]) -> str:
+        """Return the series prefix for a tool and its parameters."""
+        return ".".join([tool_name, *params.values()])
+
+    async def sample_once(self) -> None:
+        """Run every target once and record the results."""
+        from kubewhisper.registry.function_executor import FunctionExecutor
+
+        timestamp = time.time()
+        for tool_name, params in self.targets:
+            func = next((f for f in FunctionRegistry.functions if f.__name__ == tool_name), None)
+            if func is None:
+                logger.warning(f"Cannot sample unknown tool: {tool_name}")
+                continue
+
+            execution = await FunctionExecutor.execute_function(func, **params)
+            if not execution.get("success"):
+                logger.warning(f"Sampling {tool_name} failed: {execution.get('error')}")
+                continue
+
+            values = flatten_result(execution["result"])
+            if values:
+                self.store.record(self.source_name(tool_name, params), values, timestamp)
+
+    async def _sample_on_new_loop(self) -> None:
+        """Sample once on a loop of its own, closing the connections bound to it afterwards."""
+        from kubewhisper.k8s import connections
+
+        try:
+            await self.sample_once()
+        finally:
+            await connections.close_transport()
+            await connections.close_http_session()
+
+    def _run(self) -> None:
+        """Sampling loop executed on the background thread."""
+        while not self._stop_event.is_set():
+            try:
+                if self.runtime is not None:
+                    self.runtime.run(self.sample_once())
+                else:
+                    asyncio.run(self._sample_on_new_loop())
+                if time.time() - self._last_compaction >= self.compact_interval:
+                    self.store.compact()
+                    self._last_compaction = time.time()
+            except Exception as e:
+                logger.error(f"Error while sampling cluster stats: {e}")
+            self._stop_event.wait(self.interval)
+
+    def start(self) -> None:
+        """Start sampling in a background thread."""
+        if self._thread is not None:
+            return
+        logger.info(f"Recording stats for {len(self.targets)} targets every {self.interval}s")
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="stats-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the background thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval)
+            self._thread = None
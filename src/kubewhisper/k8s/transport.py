@@ -0,0 +1,238 @@
+"""
+Asyncio Kubernetes API transport on a pooled aiohttp session.
+"""
+
+import json
+import logging
+import ssl
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from kubewhisper.lazy import lazy_import
+
+# Loaded when the first request is made, so importing the tools stays cheap
+aiohttp = lazy_import("aiohttp")
+
+logger = logging.getLogger(__name__)
+
+
+class KubeApiError(Exception):
+    """The API server answered a request with an error status."""
+
+    def __init__(self, status: int, reason: str, message: str = ""):
+        self.status = status
+        self.reason = reason
+        self.message = message
+        super().__init__(f"({status}) {reason}{': ' + message if message else ''}")
+
+
+def ssl_context(configuration) -> Any:
+    """Build the TLS settings of a kubernetes client configuration for aiohttp.
+
+    Args:
+        configuration: kubernetes.client.Configuration loaded from the kubeconfig
+
+    Returns:
+        An SSL context with the cluster CA and client certificate, False when
+        verification is turned off, or None for plain HTTP
+    """
+    if not configuration.host.startswith("https"):
+        return None
+    if not configuration.verify_ssl:
+        return False
+    context = ssl.create_default_context(cafile=configuration.ssl_ca_cert, cadata=configuration.ca_cert_data)
+    if configuration.cert_file:
+        context.load_cert_chain(configuration.cert_file, configuration.key_file)
+    if configuration.assert_hostname is False:
+        context.check_hostname = False
+    return context
+
+
+class KubeTransport:
+    """Minimal asyncio client of the Kubernetes REST API.
+
+    Requests go through one aiohttp session whose connector pools connections
+    with a per-host limit, so hundreds of concurrent requests (e.g. one log
+    read per pod) run from the event loop thread over a bounded number of
+    connections. Server, bearer token (refreshed through the configuration's
+    hook, as exec plugins need), client certificate, CA and proxy come from a
+    kubernetes client configuration loaded from the kubeconfig.
+
+    The session is bound to the event loop that first uses the transport.
+    """
+
+    def __init__(self, configuration, limit: int = 100, limit_per_host: int = 32, timeout: float = 30.0):
+        """Initialize the transport without connecting.
+
+        Args:
+            configuration: kubernetes.client.Configuration with the cluster's address and credentials
+            limit: Connections open at once in total
+            limit_per_host: Connections open at once to one API server
+            timeout: Seconds before a request without streaming gives up
+        """
+        self.configuration = configuration
+        self.base_url = configuration.host.rstrip("/")
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session: Optional["aiohttp.ClientSession"] = None
+
+    @property
+    def session(self) -> "aiohttp.ClientSession":
+        """The pooled session, created on first use on the running loop."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit, limit_per_host=self.limit_per_host, ssl=ssl_context(self.configuration)
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the session and its connections."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _headers(self, accept: str = "application/json") -> Dict[str, str]:
+        headers = {"Accept": accept}
+        for setting in self.configuration.auth_settings().values():
+            if setting["in"] == "header" and setting["value"]:
+                headers[setting["key"]] = setting["value"]
+        if "authorization" not in headers and self.configuration.username:
+            headers["authorization"] = self.configuration.get_basic_auth_token()
+        return headers
+
+    def _request(
+        self, method: str, path: str, params: Optional[Dict[str, Any]], timeout, accept: str = "application/json"
+    ):
+        query = {key: _query_value(value) for key, value in (params or {}).items() if value is not None}
+        return self.session.request(
+            method,
+            self.base_url + path,
+            params=query,
+            headers=self._headers(accept),
+            proxy=self.configuration.proxy or None,
+            server_hostname=self.configuration.tls_server_name or None,
+            timeout=timeout,
+        )
+
+    @staticmethod
+    async def _raise_for_status(response: "aiohttp.ClientResponse") -> None:
+        if response.status < 400:
+            return
+        message = ""
+        try:
+            # Errors come as a Status object with a readable message
+            message = (await response.json(content_type=None)).get("message", "")
+        except (ValueError, AttributeError, aiohttp.ClientError):
+            pass
+        raise KubeApiError(response.status, response.reason or "", message)
+
+    async def get(self, path: str, **params) -> Dict[str, Any]:
+        """GET a resource and return the decoded JSON object.
+
+        Args:
+            path: API path, e.g. "/version" or "/api/v1/namespaces/default/pods/web-0"
+            params: Query parameters, e.g. labelSelector
+        """
+        async with self._request("GET", path, params, aiohttp.ClientTimeout(total=self.timeout)) as response:
+            await self._raise_for_status(response)
+            return await response.json(content_type=None)
+
+    async def list(
+        self, path: str, limit: Optional[int] = None, page_size: int = 500, **params
+    ) -> List[Dict[str, Any]]:
+        """List a collection, following continue tokens across pages.
+
+        Args:
+            path: Collection path, e.g. "/api/v1/pods"
+            limit: Items to return at most (default: all)
+            page_size: Items requested per page
+            params: Query parameters, e.g. labelSelector or fieldSelector
+
+        Returns:
+            The items of the collection
+        """
+        items: List[Dict[str, Any]] = []
+        token = None
+        while True:
+            remaining = page_size if limit is None else min(page_size, limit - len(items))
+            page = await self.get(path, limit=remaining, **{"continue": token}, **params)
+            items.extend(page.get("items") or [])
+            token = (page.get("metadata") or {}).get("continue")
+            if not token or (limit is not None and len(items) >= limit):
+                return items[:limit] if limit is not None else items
+
+    async def watch(
+        self, path: str, resource_version: Optional[str] = None, timeout_seconds: Optional[int] = None, **params
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Stream the changes of a collection as they happen.
+
+        Args:
+            path: Collection path, e.g. "/api/v1/namespaces/default/pods"
+            resource_version: Only report changes after this version (e.g. from a list)
+            timeout_seconds: Seconds after which the server ends the watch
+            params: Query parameters, e.g. labelSelector
+
+        Yields:
+            Events with "type" (ADDED, MODIFIED, DELETED, BOOKMARK or ERROR) and "object"
+        """
+        params.update(watch="true", resourceVersion=resource_version, timeoutSeconds=timeout_seconds)
+        # Only the connection has a deadline; the stream stays open as long as the server sends
+        timeout = aiohttp.ClientTimeout(total=None, sock_connect=self.timeout)
+        async with self._request("GET", path, params, timeout) as response:
+            await self._raise_for_status(response)
+            async for line in _lines(response):
+                if line.strip():
+                    yield json.loads(line)
+
+    async def stream_log(
+        self,
+        namespace: str,
+        pod: str,
+        container: Optional[str] = None,
+        follow: bool = False,
+        since_seconds: Optional[int] = None,
+        tail_lines: Optional[int] = None,
+    ) -> AsyncIterator[str]:
+        """Stream the log of a pod line by line.
+
+        Args:
+            namespace: Namespace of the pod
+            pod: Name of the pod
+            container: Container of the pod (required for pods with several)
+            follow: Keep streaming new lines until the pod stops or the caller stops iterating
+            since_seconds: Only lines from the last N seconds
+            tail_lines: Only the last N lines
+
+        Yields:
+            Log lines without the trailing newline
+        """
+        params = {"container": container, "follow": follow, "sinceSeconds": since_seconds, "tailLines": tail_lines}
+        timeout = aiohttp.ClientTimeout(total=None if follow else self.timeout, sock_connect=self.timeout)
+        path = f"/api/v1/namespaces/{namespace}/pods/{pod}/log"
+        async with self._request("GET", path, params, timeout, accept="text/plain") as response:
+            await self._raise_for_status(response)
+            async for line in _lines(response):
+                yield line.decode(errors="replace")
+
+    async def read_log(self, namespace: str, pod: str, **options) -> str:
+        """Return the log of a pod; takes the options of stream_log except follow."""
+        return "\n".join([line async for line in self.stream_log(namespace, pod, **options)])
+
+
+def _query_value(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return str(value)
+
+
+async def _lines(response: "aiohttp.ClientResponse") -> AsyncIterator[bytes]:
+    # aiohttp's own line iterator rejects lines over 64 KiB, which watch events of large objects exceed
+    buffer = b""
+    async for chunk in response.content.iter_any():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+    if buffer:
+        yield buffer
@@ -0,0 +1,146 @@
+"""
+Trend tools answering questions from the local stats store.
+"""
+
+import time
+from typing import Any, Dict
+
+from kubewhisper.k8s.stats_store import get_default_store
+from kubewhisper.registry.function_registry import FunctionRegistry
+
+_METRIC_PARAMETER = {
+    "type": "string",
+    "description": "Recorded metric name, e.g. 'pod_status.Failed' or 'web log_counts.ERROR'.",
+}
+
+
+@FunctionRegistry.register(
+    description="Get the recorded history of a sampled cluster metric over the last N minutes.",
+    response_template=(
+        "Over the last {minutes} minutes {metric} ranged from {minimum:g} to {maximum:g}, latest value {latest:g}."
+    ),
+    parameters={
+        "type": "object",
+        "properties": {
+            "metric": _METRIC_PARAMETER,
+            "minutes": {
+                "type": "integer",
+                "description": "Length of the time window in minutes (default: 60).",
+                "default": 60,
+            },
+        },
+        "required": ["metric"],
+    },
+)
+async def get_metric_history(metric: str, minutes: int = 60) -> Dict[str, Any]:
+    """
+    Get the recorded values of a metric within a time window.
+
+    Args:
+        metric: Full or partial metric name
+        minutes: Length of the time window in minutes
+
+    Returns:
+        Dict containing the data points and their summary
+    """
+    store = get_default_store()
+    series = store.resolve_series(metric)
+    points = store.query_range(series, time.time() - int(minutes) * 60)
+    if not points:
+        raise ValueError(f"No samples for {series} in the last {minutes} minutes")
+
+    values = [value for _, value in points]
+    return {
+        "metric": series,
+        "minutes": minutes,
+        "points": points,
+        "minimum": min(values),
+        "maximum": max(values),
+        "average": sum(values) / len(values),
+        "latest": values[-1],
+    }
+
+
+@FunctionRegistry.register(
+    description="Get the value a sampled cluster metric had a given number of minutes ago.",
+    response_template="{metric} was {value:g} about {minutes_ago} minutes ago.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "metric": _METRIC_PARAMETER,
+            "minutes_ago": {
+                "type": "integer",
+                "description": "How many minutes back to look.",
+            },
+        },
+        "required": ["metric", "minutes_ago"],
+    },
+)
+async def get_metric_value_at(metric: str, minutes_ago: int) -> Dict[str, Any]:
+    """
+    Get the most recent recorded value of a metric at a point in the past.
+
+    Args:
+        metric: Full or partial metric name
+        minutes_ago: How many minutes back to look
+
+    Returns:
+        Dict containing the value and the time it was sampled
+    """
+    store = get_default_store()
+    series = store.resolve_series(metric)
+    point = store.value_at(series, time.time() - int(minutes_ago) * 60)
+    if point is None:
+        raise ValueError(f"No samples for {series} from {minutes_ago} minutes ago")
+
+    timestamp, value = point
+    return {"metric": series, "minutes_ago": minutes_ago, "value": value, "timestamp": timestamp}
+
+
+@FunctionRegistry.register(
+    description="Tell whether a sampled cluster metric is rising, falling or steady over the last N minutes.",
+    response_template="{metric} is {direction}: it changed by {delta:+g} over the last {minutes} minutes.",
+    parameters={
+        "type": "object",
+        "properties": {
+            "metric": _METRIC_PARAMETER,
+            "minutes": {
+                "type": "integer",
+                "description": "Length of the time window in minutes (default: 60).",
+                "default": 60,
+            },
+        },
+        "required": ["metric"],
+    },
+)
+async def get_metric_trend(metric: str, minutes: int = 60) -> Dict[str, Any]:
+    """
+    Compute the change and trend direction of a metric within a time window.
+
+    Args:
+        metric: Full or partial metric name
+        minutes: Length of the time window in minutes
+
+    Returns:
+        Dict containing the first and last value, the delta and the direction
+    """
+    store = get_default_store()
+    series = store.resolve_series(metric)
+    points = store.query_range(series, time.time() - int(minutes) * 60)
+    if len(points) < 2:
+        raise ValueError(f"Not enough samples for {series} in the last {minutes} minutes")
+
+    (first_ts, first), (last_ts, last) = points[0], points[-1]
+    delta = last - first
+    direction = "rising" if delta > 0 else "falling" if delta < 0 else "steady"
+    per_hour = delta * 3600 / (last_ts - first_ts) if last_ts > first_ts else 0.0
+
+    return {
+        "metric": series,
+        "minutes": minutes,
+        "first": first,
+        "last": last,
+        "delta": delta,
+        "per_hour": per_hour,
+        "direction": direction,
+    }
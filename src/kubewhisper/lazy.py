@@ -0,0 +1,46 @@
+"""
+Deferred imports for heavy optional subsystems.
+"""
+
+import importlib
+import threading
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Stands in for a module that is imported when one of its attributes is first used.
+
+    Modules that are only needed by some modes (audio devices, the Kubernetes
+    client, HTTP) are bound at module level through this proxy, so importing the
+    package stays cheap and each mode only pays for what it touches.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self._module = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> types.ModuleType:
+        with self._lock:
+            if self._module is None:
+                self._module = importlib.import_module(self.__name__)
+        return self._module
+
+    def __getattr__(self, attr: str):
+        # Only called for attributes the proxy itself does not have
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_import(name: str) -> LazyModule:
+    """Return a proxy that imports the named module on first attribute access.
+
+    Args:
+        name: Absolute module name, e.g. "kubernetes" or "pynput.keyboard"
+
+    Returns:
+        The proxy module
+    """
+    return LazyModule(name)
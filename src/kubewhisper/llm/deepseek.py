@@ -2,25 +2,167 @@
 DeepSeek LLM integration.
 """
 
+import asyncio
+import logging
 import os
 import json
-from typing import Any, Dict, List
-from langchain_openai.chat_models.base import BaseChatOpenAI
+import time
+from typing import Any, Awaitable, Dict, List, Optional
+
+from kubewhisper.lazy import lazy_import
 from kubewhisper.registry.function_registry import FunctionRegistry
+from kubewhisper import tracing
+
+# Loaded when the first DeepSeekLLM is created, so the CLI can read the defaults cheaply
+openai = lazy_import("openai")
+langchain_openai = lazy_import("langchain_openai.chat_models.base")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_API_BASE = "https://api.deepseek.com"
+
+# Seconds a question may take, including retries, before the turn gives up
+DEFAULT_TIMEOUT = 30.0
+
+# Hedge delay until enough answers were timed to know the latency percentile
+DEFAULT_HEDGE_DELAY = 2.0
+HEDGE_MIN_SAMPLES = 20
 
 
 class DeepSeekLLM:
-    """Class to interact with the DeepSeek LLM."""
+    """Class to interact with the DeepSeek LLM.
+
+    Requests share one HTTP client whose connections are kept alive between
+    the turns of a conversation; warmup() opens the first one ahead of the
+    first question. Each question has a deadline. With hedging, a question
+    not answered within the recent p95 latency is sent a second time and the
+    first answer wins, which cuts the tail left by slow provider responses.
+    """
+
+    def __init__(
+        self,
+        api_base: Optional[str] = None,
+        timeout: float = DEFAULT_TIMEOUT,
+        connect_timeout: float = 5.0,
+        max_retries: int = 1,
+        keepalive_expiry: float = 120.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_delay: float = DEFAULT_HEDGE_DELAY,
+    ):
+        """Initialize the DeepSeek LLM with necessary configurations.
 
-    def __init__(self):
-        """Initialize the DeepSeek LLM with necessary configurations."""
-        self.llm = BaseChatOpenAI(
+        Args:
+            api_base: OpenAI-compatible endpoint (default: DEEPSEEK_API_BASE or the DeepSeek API)
+            timeout: Deadline of a question in seconds
+            connect_timeout: Seconds to open a connection
+            max_retries: Retries of a failed request within the deadline
+            keepalive_expiry: Seconds an idle connection is kept open for the next question
+            hedge: Send a second request when the first one is slower than usual
+            hedge_quantile: Latency percentile after which the second request is sent
+            hedge_delay: Delay of the second request until enough latencies are known
+        """
+        self.api_base = api_base or os.environ.get("DEEPSEEK_API_BASE", DEFAULT_API_BASE)
+        self.api_key = os.environ["DEEPSEEK_API_KEY"]
+        self.timeout = timeout
+        self.hedge = hedge
+        self.hedge_quantile = hedge_quantile
+        self.initial_hedge_delay = hedge_delay
+
+        # One client for all requests, so the connection of the last turn serves the next one;
+        # the limits are built with the Limits class of the HTTP library the SDK uses
+        limits = type(openai.DEFAULT_CONNECTION_LIMITS)(
+            max_connections=16, max_keepalive_connections=4, keepalive_expiry=keepalive_expiry
+        )
+        self.http_client = openai.DefaultAsyncHttpxClient(
+            limits=limits, timeout=openai.Timeout(timeout, connect=connect_timeout)
+        )
+        self.llm = langchain_openai.BaseChatOpenAI(
             model="deepseek-chat",
-            openai_api_key=os.environ["DEEPSEEK_API_KEY"],
-            openai_api_base="https://api.deepseek.com",
+            openai_api_key=self.api_key,
+            openai_api_base=self.api_base,
             max_tokens=1024,
+            http_async_client=self.http_client,
+            timeout=timeout,
+            max_retries=max_retries,
         )
 
+        # Latencies of answered requests; requests cancelled by a faster hedge are not included
+        self.latency = tracing.Histogram(window=256)
+        self.stats = {"questions": 0, "timeouts": 0, "hedged": 0, "hedge_wins": 0}
+
+    async def warmup(self) -> bool:
+        """Open a connection to the API before the first question needs it.
+
+        A model list request pays for DNS, TCP and TLS setup; the connection
+        then stays in the shared client's pool.
+
+        Returns:
+            True if the API accepted the request
+        """
+        try:
+            with tracing.span("llm.warmup") as span:
+                response = await self.http_client.get(
+                    f"{self.api_base.rstrip('/')}/models", headers={"Authorization": f"Bearer {self.api_key}"}
+                )
+            if response.status_code >= 400:
+                # e.g. 401 for a wrong API key; questions would be rejected the same way
+                logger.warning(f"The LLM API rejected the warmup request with status {response.status_code}")
+                return False
+            logger.info(f"Connected to the LLM API in {span.duration * 1000:.0f} ms")
+            return True
+        except Exception as e:
+            logger.warning(f"Could not connect to the LLM API ahead of time: {str(e)}")
+            return False
+
+    async def close(self) -> None:
+        """Close the HTTP client and its connections."""
+        await self.http_client.aclose()
+
+    def hedge_delay(self) -> float:
+        """Seconds after which a question is sent a second time."""
+        if len(self.latency.recent) < HEDGE_MIN_SAMPLES:
+            return self.initial_hedge_delay
+        return self.latency.quantile(self.hedge_quantile)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counts of questions, timeouts and hedges, with the request latency percentiles."""
+        return {
+            **self.stats,
+            "hedge_delay": round(self.hedge_delay(), 4) if self.hedge else None,
+            "latency": self.latency.as_dict(),
+        }
+
+    async def _request(self, prompt: str, hedge: bool = False) -> Any:
+        with tracing.span("llm.request", hedge=hedge):
+            start = time.perf_counter()
+            response = await self.llm.ainvoke(prompt)
+            self.latency.observe(time.perf_counter() - start)
+        return response
+
+    async def _hedged_request(self, prompt: str) -> Any:
+        first = asyncio.ensure_future(self._request(prompt))
+        tasks = {first}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay())
+            if done:
+                return first.result()
+
+            self.stats["hedged"] += 1
+            tasks.add(asyncio.ensure_future(self._request(prompt, hedge=True)))
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                # A failed request leaves the answer to the other one
+                answered = [task for task in done if task.exception() is None]
+                if answered:
+                    if answered[0] is not first:
+                        self.stats["hedge_wins"] += 1
+                    return answered[0].result()
+            return next(iter(done)).result()
+        finally:
+            for task in tasks:
+                task.cancel()
+
     def get_tools(self) -> List[Dict[str, Any]]:
         """Retrieve registered functions and generate the tools list."""
         tools_json = FunctionRegistry.generate_json_schema()
@@ -68,39 +210,41 @@ Question: {question}"""
         return prompt
 
     def validate_response(self, response_json: Dict[str, Any], tools: List[Dict[str, Any]]) -> bool:
-        """Validate the LLM's JSON response against the tools schema."""
+        """Validate the LLM's JSON response against the tools schema.
+
+        The parameters are checked by the function's compiled validator and replaced by
+        their coerced values, with the defaults of omitted parameters filled in.
+        """
         if "name" not in response_json:
             raise ValueError("Missing 'name' field in response.")
 
-        tool = next((t for t in tools if t["name"] == response_json["name"]), None)
-        if not tool:
+        func = FunctionRegistry.get(response_json["name"])
+        if func is None or not any(t["name"] == response_json["name"] for t in tools):
             raise ValueError(f"Invalid function name: {response_json['name']}")
 
-        params = response_json.get("parameters", {})
-        properties = tool["parameters"]["properties"]
-        required = tool["parameters"].get("required", [])
-
-        for param in required:
-            if param not in params:
-                raise ValueError(f"Missing required parameter: {param}")
-            property_schema = properties.get(param, {})
-            if "enum" in property_schema:
-                if params[param] not in property_schema["enum"]:
-                    raise ValueError(f"Invalid value for {param}: {params[param]}")
-
+        response_json["parameters"] = func.validator(response_json.get("parameters") or {})
         return True
 
-    async def execute_function_call(self, parsed_response: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a function based on the parsed LLM response."""
+    async def execute_function_call(
+        self, parsed_response: Dict[str, Any], prefetched: Optional[Awaitable] = None
+    ) -> Dict[str, Any]:
+        """Execute a function based on the parsed LLM response.
+
+        Args:
+            parsed_response: Function call returned by the LLM
+            prefetched: Result of the same call started speculatively, used instead of calling again
+        """
         from kubewhisper.registry.function_executor import FunctionExecutor
 
         func_name = parsed_response.get("name")
-        func = next((f for f in FunctionRegistry.functions if f.__name__ == func_name), None)
+        func = FunctionRegistry.get(func_name)
 
         if not func:
             return {"error": f"Function {func_name} not found"}
 
         try:
+            if prefetched is not None:
+                return await FunctionExecutor.execute_prefetched(func, prefetched)
             result = await FunctionExecutor.execute_function(func, **parsed_response.get("parameters", {}))
             return result
         except Exception as e:
@@ -115,8 +259,11 @@ Question: {question}"""
             params_json = json.dumps(kwargs, indent=2)
             prompt += f"\n\nParameters for the function call:\n{params_json}"
 
+        self.stats["questions"] += 1
         try:
-            response = await self.llm.ainvoke(prompt)
+            with tracing.span("llm.ask", prompt_chars=len(prompt)):
+                request = self._hedged_request(prompt) if self.hedge else self._request(prompt)
+                response = await asyncio.wait_for(request, self.timeout)
             content = response.content.strip()
 
             if content.startswith("{"):
@@ -129,5 +276,9 @@ Question: {question}"""
             else:
                 return {"response": content}
 
+        except asyncio.TimeoutError:
+            self.stats["timeouts"] += 1
+            logger.warning(f"The LLM did not answer within {self.timeout:g} seconds")
+            return {"error": f"The LLM did not answer within {self.timeout:g} seconds"}
         except Exception as e:
             return {"error": f"Unexpected error: {str(e)}"}
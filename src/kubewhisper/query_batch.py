@@ -0,0 +1,150 @@
+"""
+Concurrent answering of many text queries, e.g. from runbooks and health-check scripts.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, TextIO
+
+logger = logging.getLogger(__name__)
+
+
+def read_queries(stream: TextIO) -> List[Dict[str, Any]]:
+    """Read queries given as plain lines or as JSONL objects.
+
+    A line starting with "{" is parsed as an object with a "query" (or "text")
+    and an optional "id" that is copied to the result. Other lines are queries
+    themselves. Blank lines and lines starting with "#" are skipped.
+
+    Args:
+        stream: Text stream to read
+
+    Returns:
+        Dicts with "index" (line number), "query" and, if given, "id"
+
+    Raises:
+        ValueError: If a JSONL line is invalid or has no query
+    """
+    queries = []
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        if not line.startswith("{"):
+            queries.append({"index": number, "query": line})
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON: {e}") from e
+        text = item.get("query", item.get("text"))
+        if not isinstance(text, str) or not text.strip():
+            raise ValueError(f"Line {number}: missing 'query'")
+        query = {"index": number, "query": text.strip()}
+        if "id" in item:
+            query["id"] = item["id"]
+        queries.append(query)
+    return queries
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    position = min(len(sorted_values) - 1, int(round(fraction * (len(sorted_values) - 1))))
+    return round(sorted_values[position], 4)
+
+
+class QueryBatch:
+    """Answers queries concurrently and writes one JSONL record per query as it completes.
+
+    All queries run on the calling event loop, so they share the assistant's
+    LLM and Kubernetes clients. At most `concurrency` queries are in flight at
+    once. Records are written in completion order and carry the query's input
+    line as "index"; a summary record with latency percentiles and throughput
+    follows the last one.
+    """
+
+    def __init__(self, process_query: Callable[[str], Awaitable[Any]], concurrency: int = 4):
+        """Initialize the batch.
+
+        Args:
+            process_query: Coroutine function answering one query, e.g. Assistant.process_query
+            concurrency: Maximum number of queries answered at once
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.process_query = process_query
+        self.concurrency = concurrency
+
+    async def answer(self, query: Dict[str, Any]) -> Dict[str, Any]:
+        """Answer one query.
+
+        Returns:
+            The JSONL record for the query
+        """
+        record: Dict[str, Any] = {"type": "query", **query}
+        start = time.perf_counter()
+        try:
+            response = await self.process_query(query["query"])
+            record["response"] = response
+            # Tool failures come back as a response with an error instead of an exception
+            if isinstance(response, dict) and "error" in response:
+                record["error"] = str(response["error"])
+        except Exception as e:
+            logger.error(f"Error answering query on line {query['index']}: {e}")
+            record["error"] = str(e)
+        record["latency"] = round(time.perf_counter() - start, 4)
+        return record
+
+    async def run(self, queries: List[Dict[str, Any]], output: TextIO) -> Dict[str, Any]:
+        """Answer queries and write their records, then a summary record.
+
+        Args:
+            queries: Queries as returned by read_queries
+            output: Stream the JSONL records are written to
+
+        Returns:
+            The summary record
+        """
+        logger.info(f"Answering {len(queries)} queries with concurrency {self.concurrency}")
+        slots = asyncio.Semaphore(self.concurrency)
+
+        async def answer_in_slot(query: Dict[str, Any]) -> Dict[str, Any]:
+            async with slots:
+                return await self.answer(query)
+
+        latencies = []
+        failed = 0
+        start = time.perf_counter()
+        for next_record in asyncio.as_completed([answer_in_slot(query) for query in queries]):
+            record = await next_record
+            latencies.append(record["latency"])
+            failed += "error" in record
+            output.write(json.dumps(record, default=str) + "\n")
+            output.flush()
+        wall_seconds = time.perf_counter() - start
+
+        latencies.sort()
+        summary = {
+            "type": "summary",
+            "queries": len(queries),
+            "failed": failed,
+            "concurrency": self.concurrency,
+            "wall_seconds": round(wall_seconds, 3),
+            "throughput": round(len(queries) / wall_seconds, 3) if wall_seconds > 0 else None,
+            "latency": {
+                "mean": round(sum(latencies) / len(latencies), 4) if latencies else None,
+                "p50": _percentile(latencies, 0.5),
+                "p95": _percentile(latencies, 0.95),
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+        output.write(json.dumps(summary) + "\n")
+        output.flush()
+        logger.info(
+            f"Answered {len(queries)} queries in {wall_seconds:.1f}s "
+            f"({summary['throughput']} queries per second, {failed} failed)"
+        )
+        return summary
@@ -0,0 +1,166 @@
+"""
+Compaction of tool results to a size budget, so answers stay short however large the cluster is.
+"""
+
+import collections
+import json
+import logging
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from kubewhisper import tracing
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a token in English text and JSON, used to turn a token budget into characters
+CHARS_PER_TOKEN = 4
+
+DEFAULT_BUDGET_TOKENS = 300
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens a text costs an LLM."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _size(value: Any) -> int:
+    return len(json.dumps(value, default=str))
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ResultCompactor:
+    """Shrinks tool results that exceed a size budget.
+
+    Results within the budget are returned as they are. Larger ones are
+    summarized by type:
+        - lists of records keep the first few, the count, how often repeated
+          field values occur (e.g. event types) and the totals of numeric fields
+        - lists of numbers become a rollup: count, min, max, mean and sum
+        - lists of strings become their most common values with counts
+        - long strings and nested mappings with many keys are cut
+    The top-level keys of a result are kept, so response templates still find
+    their fields. Summaries get coarser until the result fits the budget.
+    """
+
+    def __init__(self, budget_tokens: int = DEFAULT_BUDGET_TOKENS, max_items: int = 10, max_string: int = 200):
+        """Initialize the compactor.
+
+        Args:
+            budget_tokens: Size a result may have, in estimated tokens of its JSON form
+            max_items: List items or mapping keys kept at first
+            max_string: Characters of a string kept at first
+        """
+        self.budget_tokens = budget_tokens
+        self.budget_chars = budget_tokens * CHARS_PER_TOKEN
+        self.max_items = max_items
+        self.max_string = max_string
+
+    def compact(self, result: Any) -> Any:
+        """Return the result, summarized if it exceeds the budget.
+
+        Args:
+            result: Result of a tool, usually a dict
+
+        Returns:
+            The result itself when it fits, otherwise a smaller summary of it
+        """
+        size = _size(result)
+        if size <= self.budget_chars:
+            return result
+        with tracing.span("tool.compact", chars=size):
+            items, length = self.max_items, self.max_string
+            while True:
+                compacted = self._compact(result, items, length, depth=0)
+                compacted_size = _size(compacted)
+                if compacted_size <= self.budget_chars or items == 1:
+                    break
+                items, length = max(1, items // 2), max(40, length // 2)
+        logger.info(f"Compacted tool result from {size} to {compacted_size} characters")
+        return compacted
+
+    def compact_text(self, text: str) -> str:
+        """Cut a text that exceeds the budget, noting how much was left out."""
+        if len(text) <= self.budget_chars:
+            return text
+        return f"{text[: self.budget_chars].rstrip()} ... ({len(text) - self.budget_chars} more characters)"
+
+    def _compact(self, value: Any, items: int, length: int, depth: int) -> Any:
+        if isinstance(value, str):
+            return value if len(value) <= length else f"{value[:length]}... ({len(value) - length} more characters)"
+        if isinstance(value, dict):
+            keys = list(value)
+            kept = keys if depth == 0 or len(keys) <= items else keys[:items]
+            compacted = {key: self._compact(value[key], items, length, depth + 1) for key in kept}
+            if len(kept) < len(keys):
+                compacted["more_keys"] = len(keys) - len(kept)
+            return compacted
+        if isinstance(value, (list, tuple)):
+            return self._compact_list(list(value), items, length, depth)
+        return value
+
+    def _compact_list(self, values: List[Any], items: int, length: int, depth: int) -> Any:
+        if len(values) <= items:
+            return [self._compact(value, items, length, depth + 1) for value in values]
+        if all(_is_number(value) for value in values):
+            total = sum(values)
+            return {
+                "count": len(values),
+                "min": min(values),
+                "max": max(values),
+                "mean": round(total / len(values), 3),
+                "sum": total,
+            }
+        if all(isinstance(value, str) for value in values):
+            counts = collections.Counter(values)
+            summary = {"count": len(values), "distinct": len(counts)}
+            if len(counts) < len(values):
+                summary["most_common"] = dict(counts.most_common(items))
+            else:
+                summary["first"] = [self._compact(value, items, length, depth + 1) for value in values[:items]]
+            return summary
+        summary: Dict[str, Any] = {
+            "count": len(values),
+            "first": [self._compact(value, items, length, depth + 1) for value in values[:items]],
+        }
+        if all(isinstance(value, dict) for value in values):
+            groups, totals = self._rollup_records(values, items)
+            if groups:
+                summary["groups"] = groups
+            if totals:
+                summary["totals"] = totals
+        return summary
+
+    @staticmethod
+    def _rollup_records(records: List[Dict[str, Any]], items: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        # Fields with a few repeated values are counted by value, numeric fields summed
+        fields: Dict[str, List[Any]] = collections.defaultdict(list)
+        for record in records:
+            for key, value in record.items():
+                fields[key].append(value)
+        groups: Dict[str, Dict[str, int]] = {}
+        totals: Dict[str, Any] = {}
+        for key, values in fields.items():
+            if all(_is_number(value) for value in values):
+                totals[key] = sum(values)
+            elif all(value is None or isinstance(value, (str, bool)) for value in values):
+                counts = collections.Counter(value if isinstance(value, str) else json.dumps(value) for value in values)
+                if len(counts) <= items and len(counts) < len(values):
+                    groups[key] = dict(counts.most_common())
+        return groups, totals
+
+
+_default_compactor: Optional[ResultCompactor] = ResultCompactor()
+
+
+def get_default_compactor() -> Optional[ResultCompactor]:
+    """Return the process-wide compactor, or None when full results are wanted."""
+    return _default_compactor
+
+
+def set_default_compactor(compactor: Optional[ResultCompactor]) -> None:
+    """Replace the process-wide compactor; None turns compaction off."""
+    global _default_compactor
+    _default_compactor = compactor
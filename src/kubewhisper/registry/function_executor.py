@@ -1,7 +1,11 @@
 import logging
-from typing import Any, Dict, Callable
+from typing import Any, Awaitable, Dict, Callable
 import inspect
 
+from kubewhisper import tracing
+from kubewhisper.registry.compaction import get_default_compactor
+from kubewhisper.registry.validation import ValidationError
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
@@ -9,6 +13,25 @@ logger = logging.getLogger(__name__)
 class FunctionExecutor:
     """Executes registered functions and handles their responses."""
 
+    @staticmethod
+    async def call_function(func: Callable, **kwargs) -> Any:
+        """
+        Run a function in a trace span and return its raw result.
+
+        Args:
+            func: The function to run
+            kwargs: Parameters to pass to the function
+
+        Returns:
+            The function's result
+        """
+        # Async functions and lazily imported tools return an awaitable
+        with tracing.span(f"tool.{func.__name__}"):
+            result = func(**kwargs)
+            if inspect.isawaitable(result):
+                result = await result
+            return result
+
     @staticmethod
     async def execute_function(func: Callable, **kwargs) -> Dict[str, Any]:
         """
@@ -21,24 +44,63 @@ class FunctionExecutor:
         Returns:
             Dict containing the execution results and formatted response
         """
+        logger.info(f"Executing function: {func.__name__} with params: {kwargs}")
+
+        # Malformed calls are rejected before they cost a cluster round trip
+        validator = getattr(func, "validator", None)
+        if validator is not None:
+            try:
+                kwargs = validator(kwargs)
+            except ValidationError as e:
+                error_msg = f"Invalid parameters for {func.__name__}: {e}"
+                logger.error(error_msg)
+                return {"success": False, "error": error_msg}
+
+        return await FunctionExecutor._respond(func, FunctionExecutor.call_function(func, **kwargs))
+
+    @staticmethod
+    async def execute_prefetched(func: Callable, prefetched: Awaitable) -> Dict[str, Any]:
+        """
+        Format the response of a call that was started ahead of time, e.g. by speculation.
+
+        Args:
+            func: The function that was called
+            prefetched: Task or coroutine producing the function's result
+
+        Returns:
+            Dict containing the execution results and formatted response
+        """
+        logger.info(f"Using prefetched result of function: {func.__name__}")
+        return await FunctionExecutor._respond(func, prefetched)
+
+    @staticmethod
+    async def _respond(func: Callable, pending: Awaitable) -> Dict[str, Any]:
         try:
-            logger.info(f"Executing function: {func.__name__} with params: {kwargs}")
+            result = await pending
 
-            # Check if function is async
-            if inspect.iscoroutinefunction(func):
-                result = await func(**kwargs)
-            else:
-                result = func(**kwargs)
+            # Results growing with the cluster are summarized; the full result stays in the response
+            compactor = get_default_compactor()
+            shown = compactor.compact(result) if compactor is not None else result
 
             # Get response template from function metadata
             template = func.metadata.get("response_template", "")
 
             # Format the response if template exists
-            formatted_response = template.format(**result) if template else str(result)
+            formatted_response = template.format(**result) if template else str(shown)
+            if compactor is not None:
+                if shown is not result and len(formatted_response) > compactor.budget_chars:
+                    try:
+                        formatted_response = template.format(**shown)
+                    except (KeyError, IndexError, TypeError, AttributeError, ValueError):
+                        pass
+                formatted_response = compactor.compact_text(formatted_response)
 
             logger.info(f"Function {func.__name__} executed successfully")
 
-            return {"success": True, "result": result, "formatted_response": formatted_response}
+            response = {"success": True, "result": shown, "formatted_response": formatted_response}
+            if shown is not result:
+                response["full_result"] = result
+            return response
 
         except Exception as e:
             error_msg = f"Error executing {func.__name__}: {str(e)}"
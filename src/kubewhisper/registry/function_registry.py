@@ -1,5 +1,50 @@
+import asyncio
+import importlib
+import inspect
 import json
-from typing import Callable, get_type_hints, Literal, Optional, Dict, Any
+from typing import Callable, Optional, Dict, Any
+
+from kubewhisper import tracing
+from kubewhisper.registry.validation import compile_validator, infer_parameters
+
+
+class LazyTool:
+    """A registered tool whose module is only imported when the tool first runs.
+
+    Name, metadata and validator come from the tool module's manifest, so the
+    prompt can be built and calls validated without importing any tool code.
+    Calling the tool imports its module on a worker thread, then delegates to
+    the real function.
+    """
+
+    def __init__(self, name: str, module: str, metadata: Dict[str, Any]):
+        """Initialize the tool from its manifest entry.
+
+        Args:
+            name: Name of the tool function
+            module: Module defining and registering the function
+            metadata: Metadata as FunctionRegistry.register attaches it, including "schema"
+        """
+        self.__name__ = name
+        self.module = module
+        self.metadata = metadata
+        self.validator = compile_validator(metadata["schema"])
+        self.target: Optional[Callable] = None
+
+    def load(self) -> Callable:
+        """Import the tool's module and return the real function."""
+        if self.target is None:
+            with tracing.span("tool.load", module=self.module):
+                self.target = getattr(importlib.import_module(self.module), self.__name__)
+        return self.target
+
+    async def __call__(self, **kwargs) -> Any:
+        # The import runs off the event loop, which keeps serving other calls meanwhile
+        target = self.target or await asyncio.to_thread(self.load)
+        result = target(**kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
 
 
 class FunctionRegistry:
@@ -11,51 +56,82 @@ class FunctionRegistry:
         description: str,
         response_template: str,
         parameters: Optional[Dict[str, Any]] = None,
+        side_effects: bool = False,
     ):
-        """Decorator to register a function with the registry."""
+        """Decorator to register a function with the registry.
+
+        The parameters schema (inferred from the type hints when not given) is
+        compiled once into func.validator, which checks and coerces the
+        parameters of every call before the function runs.
+
+        Functions with side effects (e.g. switching the cluster) only run when the LLM asks for them;
+        the others may be called speculatively before it has answered.
+        """
 
         def decorator(func: Callable):
+            schema = parameters if parameters is not None else infer_parameters(func)
             # Attach metadata to the function
             func.metadata = {
                 "description": description,
                 "response_template": response_template,
                 "parameters": parameters,
+                "schema": schema,
+                "side_effects": side_effects,
             }
-            cls.functions.append(func)
+            func.validator = compile_validator(schema)
+            # Importing a tool's module replaces the entry its manifest registered
+            existing = cls.get(func.__name__)
+            if isinstance(existing, LazyTool):
+                existing.target = func
+                cls.functions[cls.functions.index(existing)] = func
+            else:
+                cls.functions.append(func)
             return func
 
         return decorator
 
+    @classmethod
+    def register_lazy(cls, module: str, entry: Dict[str, Any]) -> Optional[LazyTool]:
+        """Register a tool from its manifest entry without importing its module.
+
+        Args:
+            module: Module defining the tool
+            entry: Manifest entry with name, description, response_template, parameters and side_effects
+
+        Returns:
+            The registered LazyTool, or None if a tool with that name is already registered
+        """
+        if cls.get(entry["name"]) is not None:
+            return None
+        tool = LazyTool(
+            entry["name"],
+            module,
+            {
+                "description": entry["description"],
+                "response_template": entry["response_template"],
+                "parameters": entry["parameters"],
+                "schema": entry["parameters"],
+                "side_effects": entry.get("side_effects", False),
+            },
+        )
+        cls.functions.append(tool)
+        return tool
+
+    @classmethod
+    def get(cls, name: str) -> Optional[Callable]:
+        """Return the registered function with a name, or None."""
+        return next((func for func in cls.functions if func.__name__ == name), None)
+
     @classmethod
     def generate_json_schema(cls) -> str:
         """Generates a JSON schema string from all registered functions."""
         functions_schema = []
         for func in cls.functions:
-            func_name = func.__name__
-            func_description = func.metadata.get("description", "")
-            parameters = func.metadata.get("parameters")
-
-            if parameters is None:
-                # Infer parameters from type hints
-                type_hints = get_type_hints(func)
-                parameters = {"type": "object", "properties": {}, "required": []}
-                for param, param_type in type_hints.items():
-                    if param == "return":
-                        continue
-                    param_schema = {}
-                    if getattr(param_type, "__origin__", None) is Literal:
-                        param_schema["type"] = "string"
-                        param_schema["enum"] = list(param_type.__args__)
-                    else:
-                        param_schema["type"] = param_type.__name__
-                    parameters["properties"][param] = param_schema
-                    parameters["required"].append(param)
-
             function_schema = {
                 "type": "function",
-                "name": func_name,
-                "description": func_description,
-                "parameters": parameters,
+                "name": func.__name__,
+                "description": func.metadata.get("description", ""),
+                "parameters": func.metadata["schema"],
             }
             functions_schema.append(function_schema)
 
@@ -0,0 +1,126 @@
+"""
+Tool plugins: modules found through entry points and registered from static manifests.
+"""
+
+import argparse
+import importlib
+import importlib.metadata
+import importlib.resources
+import json
+import logging
+import pathlib
+import sys
+from typing import Any, Dict, List, Optional
+
+from kubewhisper.registry.function_registry import FunctionRegistry
+
+logger = logging.getLogger(__name__)
+
+# Entry point group listing tool modules, e.g. kubernetes = "kubewhisper.k8s.k8s_tools"
+ENTRY_POINT_GROUP = "kubewhisper.tools"
+
+# Also registered when the package runs from a checkout without being installed
+BUILTIN_TOOL_MODULES = ("kubewhisper.k8s.k8s_tools", "kubewhisper.k8s.trend_tools")
+
+
+def discover_tool_modules() -> List[str]:
+    """Return the built-in tool modules followed by those of installed entry points."""
+    modules = list(BUILTIN_TOOL_MODULES)
+    for entry_point in importlib.metadata.entry_points(group=ENTRY_POINT_GROUP):
+        if entry_point.module not in modules:
+            modules.append(entry_point.module)
+    return modules
+
+
+def manifest_path(module: str) -> Any:
+    """Return the manifest of a tool module: a JSON file named after it in its package.
+
+    Only the package is imported to locate it, e.g. kubewhisper.k8s for
+    kubewhisper/k8s/k8s_tools.json.
+    """
+    package, _, name = module.rpartition(".")
+    return importlib.resources.files(package).joinpath(f"{name}.json")
+
+
+def load_manifest(module: str) -> Optional[List[Dict[str, Any]]]:
+    """Return the tool entries of a module's manifest, or None if it has none."""
+    try:
+        return json.loads(manifest_path(module).read_text())["tools"]
+    except FileNotFoundError:
+        return None
+
+
+def register_plugins() -> int:
+    """Register the tools of every discovered module from their manifests.
+
+    Modules without a manifest are imported so their decorators register them.
+    Calling this again only registers tools that are missing.
+
+    Returns:
+        Number of tools registered without importing their module
+    """
+    registered = 0
+    for module in discover_tool_modules():
+        try:
+            tools = load_manifest(module)
+            if tools is None:
+                logger.warning(f"Tool module {module} has no manifest; importing it")
+                importlib.import_module(module)
+                continue
+            registered += sum(FunctionRegistry.register_lazy(module, entry) is not None for entry in tools)
+        except Exception as e:
+            logger.error(f"Could not register the tools of {module}: {str(e)}")
+    logger.debug(f"Registered {registered} tools from manifests")
+    return registered
+
+
+def generate_manifest(module: str) -> Dict[str, Any]:
+    """Import a tool module and describe the functions it registers.
+
+    Args:
+        module: Tool module, e.g. "kubewhisper.k8s.k8s_tools"
+
+    Returns:
+        Manifest with the module and, per tool, its name, description, response
+        template, parameters schema and whether it has side effects
+    """
+    namespace = vars(importlib.import_module(module))
+    tools = []
+    for func in namespace.values():
+        # Functions the module defines and registers, in definition order
+        if callable(func) and getattr(func, "__module__", None) == module and hasattr(func, "metadata"):
+            tools.append(
+                {
+                    "name": func.__name__,
+                    "description": func.metadata["description"],
+                    "response_template": func.metadata["response_template"],
+                    "parameters": func.metadata["schema"],
+                    "side_effects": func.metadata["side_effects"],
+                }
+            )
+    return {"module": module, "tools": tools}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Regenerate the manifests of the tool modules")
+    parser.add_argument("--check", action="store_true", help="Only report manifests that are out of date")
+    parser.add_argument("modules", nargs="*", help="Tool modules (default: all discovered)")
+    args = parser.parse_args(argv)
+
+    stale = []
+    for module in args.modules or discover_tool_modules():
+        text = json.dumps(generate_manifest(module), indent=2) + "\n"
+        path = pathlib.Path(str(manifest_path(module)))
+        if path.exists() and path.read_text() == text:
+            continue
+        stale.append(module)
+        if args.check:
+            print(f"{module}: manifest {path} is out of date")
+        else:
+            path.write_text(text)
+            print(f"{module}: wrote {path}")
+    return 1 if args.check and stale else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,303 @@
+"""
+Speculative tool prefetch: likely tools start while the LLM is still choosing one.
+"""
+
+import asyncio
+import collections
+import inspect
+import json
+import logging
+import math
+import re
+import time
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from kubewhisper import tracing
+from kubewhisper.registry.function_executor import FunctionExecutor
+from kubewhisper.registry.function_registry import FunctionRegistry
+
+logger = logging.getLogger(__name__)
+
+# Words that say nothing about which tool is meant
+STOPWORDS = frozenset(
+    "a about all am an and any are at be been by can could currently did do does for from get give had has have "
+    "how i if in into is it its just let like many me much my now of on or our please right show so some tell "
+    "than that the their them then there these they this those to us was we were what when where which who why "
+    "will with would you your".split()
+)
+
+
+def tokenize(text: str) -> frozenset:
+    """Lowercase content words of a text, with plural "s" stripped ("nodes" matches "node")."""
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("_", " "))
+    return frozenset(word[:-1] if len(word) > 3 and word.endswith("s") else word for word in words) - STOPWORDS
+
+
+def call_key(func: Callable, parameters: Dict[str, Any]) -> str:
+    """Identify a call with its defaults filled in, so {} and {"count": 4} match for count=4."""
+    validator = getattr(func, "validator", None)
+    try:
+        # Lazily imported tools have no signature yet, but their validator knows the defaults
+        if validator is not None:
+            parameters = validator(parameters)
+        else:
+            bound = inspect.signature(func).bind(**parameters)
+            bound.apply_defaults()
+            parameters = bound.arguments
+    except (TypeError, ValueError):
+        pass
+    return f"{func.__name__}:{json.dumps(parameters, sort_keys=True, default=str)}"
+
+
+class ToolScorer:
+    """Predicts the tool call a query will lead to, without asking the LLM.
+
+    A lexical score matches the query's words against each tool's name and
+    description, weighted by how few tools share a word, so "nodes" points at
+    get_number_of_nodes while "cluster" hardly counts. A history score looks
+    up earlier queries with similar words and the calls the LLM chose for
+    them, which also supplies parameters the lexical score cannot guess.
+    """
+
+    def __init__(self, functions: Optional[Sequence[Callable]] = None, history_size: int = 256):
+        """Initialize the scorer.
+
+        Args:
+            functions: Candidate tools (default: every registered function)
+            history_size: Number of recent queries remembered
+        """
+        self.functions = {func.__name__: func for func in (functions or FunctionRegistry.functions)}
+        self.vocabulary = {
+            name: tokenize(f"{name} {func.metadata.get('description', '')}") for name, func in self.functions.items()
+        }
+        counts = collections.Counter(word for words in self.vocabulary.values() for word in words)
+        self.unknown_weight = math.log(len(self.functions) + 1)
+        self.weights = {word: math.log((len(self.functions) + 1) / count) for word, count in counts.items()}
+        self.history: Deque[Tuple[frozenset, Optional[str], Dict[str, Any]]] = collections.deque(maxlen=history_size)
+
+    def _lexical(self, words: frozenset) -> Dict[str, float]:
+        # Words no tool mentions count fully against every tool ("healthy" is not a tool's word)
+        total = sum(self.weights.get(word, self.unknown_weight) for word in words)
+        if not total:
+            return {}
+        return {
+            name: sum(self.weights[word] for word in words & vocabulary) / total
+            for name, vocabulary in self.vocabulary.items()
+        }
+
+    def _recalled(self, words: frozenset) -> Dict[str, Tuple[float, Dict[str, Any]]]:
+        # Each similar earlier query votes for its call by its word overlap
+        votes: Dict[Optional[str], float] = collections.defaultdict(float)
+        parameters: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        best = 0.0
+        for past_words, name, past_parameters in self.history:
+            similarity = len(words & past_words) / len(words | past_words) if words | past_words else 0.0
+            if not similarity:
+                continue
+            votes[name] += similarity
+            best = max(best, similarity)
+            if name is not None and similarity >= parameters.get(name, (0.0, {}))[0]:
+                parameters[name] = (similarity, past_parameters)
+        total = sum(votes.values())
+        return {
+            name: (votes[name] / total * best, parameters[name][1]) for name in parameters if name in self.functions
+        }
+
+    def predict(self, query: str) -> List[Tuple[str, Dict[str, Any], float]]:
+        """Rank the calls a query may lead to.
+
+        Args:
+            query: Transcript or text of the query
+
+        Returns:
+            (function name, parameters, score between 0 and 1) tuples, best first
+        """
+        words = tokenize(query)
+        if not words:
+            return []
+        predictions = {name: (score, {}) for name, score in self._lexical(words).items() if score > 0}
+        for name, (score, parameters) in self._recalled(words).items():
+            if score >= predictions.get(name, (0.0, {}))[0]:
+                predictions[name] = (score, parameters)
+        ranked = [(name, parameters, round(score, 4)) for name, (score, parameters) in predictions.items()]
+        return sorted(ranked, key=lambda prediction: prediction[2], reverse=True)
+
+    def learn(self, query: str, name: Optional[str], parameters: Optional[Dict[str, Any]] = None) -> None:
+        """Remember the call the LLM chose for a query (None when it answered without a tool)."""
+        words = tokenize(query)
+        if words:
+            self.history.append((words, name, dict(parameters or {})))
+
+
+class PrefetchedCall:
+    """A tool call started ahead of the LLM's answer."""
+
+    def __init__(self, func: Callable, parameters: Dict[str, Any]):
+        self.func = func
+        self.parameters = parameters
+        self.started = time.perf_counter()
+        self.seconds: Optional[float] = None
+        self.task = asyncio.create_task(self._run())
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds the call took, or has taken so far."""
+        return self.seconds if self.seconds is not None else time.perf_counter() - self.started
+
+    async def _run(self) -> Any:
+        try:
+            with tracing.span("speculate", tool=self.func.__name__):
+                return await FunctionExecutor.call_function(self.func, **self.parameters)
+        finally:
+            self.seconds = time.perf_counter() - self.started
+
+
+class Speculation:
+    """Tool calls started for one query ahead of the LLM's answer."""
+
+    def __init__(self, prefetcher: "ToolPrefetcher", query: str):
+        self.prefetcher = prefetcher
+        self.query = query
+        self.calls: Dict[str, PrefetchedCall] = {}
+        self.hit = False
+
+    def claim(self, name: str, parameters: Dict[str, Any]) -> Optional[asyncio.Task]:
+        """Take the prefetched call matching the LLM's choice, if one was started.
+
+        Args:
+            name: Function the LLM called
+            parameters: Parameters of the call
+
+        Returns:
+            The task running the call, or None on a miss
+        """
+        func = self.prefetcher.scorer.functions.get(name)
+        call = self.calls.pop(call_key(func, parameters), None) if func is not None else None
+        if call is None:
+            return None
+        self.hit = True
+        # The time the call has already run is cut from the answer
+        self.prefetcher._record_hit(call.elapsed)
+        return call.task
+
+    def discard(self) -> None:
+        """Cancel the calls that were not claimed and account for the work they wasted."""
+        for call in self.calls.values():
+            if call.task.done():
+                if not call.task.cancelled():
+                    call.task.exception()  # Retrieved so a failed prefetch is not reported as unhandled
+                self.prefetcher._record_waste(call.elapsed, cancelled=False)
+            else:
+                call.task.cancel()
+                self.prefetcher._record_waste(call.elapsed, cancelled=True)
+        if self.calls and not self.hit:
+            self.prefetcher.stats["misses"] += 1
+        self.calls.clear()
+
+
+class ToolPrefetcher:
+    """Starts the most likely tool calls of a query while the LLM decides.
+
+    Only functions registered without side effects are prefetched, with the
+    parameters the scorer predicts. When the LLM asks for a prefetched call,
+    its task is handed to FunctionExecutor instead of calling the tool again;
+    the other calls are cancelled. The stats count hits, misses and the tool
+    time spent on calls nobody used, to tune max_calls and threshold.
+    """
+
+    def __init__(
+        self,
+        scorer: Optional[ToolScorer] = None,
+        max_calls: int = 1,
+        threshold: float = 0.5,
+    ):
+        """Initialize the prefetcher.
+
+        Args:
+            scorer: Predicts the calls (default: a ToolScorer over the registered functions)
+            max_calls: Calls started per query at most
+            threshold: Score a prediction needs to be started
+        """
+        self.scorer = scorer or ToolScorer()
+        self.max_calls = max_calls
+        self.threshold = threshold
+        self.stats = collections.Counter(
+            {"queries": 0, "speculated": 0, "hits": 0, "misses": 0, "calls": 0, "wasted_calls": 0, "cancelled": 0}
+        )
+        self.saved_seconds = 0.0
+        self.wasted_seconds = 0.0
+        self._pending: Optional[Speculation] = None
+
+    def speculate(self, query: str, final: bool = True) -> Speculation:
+        """Start the likely calls of a query. Must be called on the event loop.
+
+        A partial transcript can be speculated on first (final=False); calls it
+        started that the final transcript still predicts are kept, the rest are
+        cancelled.
+
+        Args:
+            query: Transcript or text of the query
+            final: Whether this is the complete query
+
+        Returns:
+            The speculation; claim the LLM's call from it, then discard it
+        """
+        speculation = Speculation(self, query)
+        pending, self._pending = self._pending, None
+        candidates = [
+            (name, parameters)
+            for name, parameters, score in self.scorer.predict(query)
+            if score >= self.threshold and self._speculative(name, parameters)
+        ][: self.max_calls]
+        for name, parameters in candidates:
+            func = self.scorer.functions[name]
+            key = call_key(func, parameters)
+            if pending is not None and key in pending.calls:
+                speculation.calls[key] = pending.calls.pop(key)
+            else:
+                speculation.calls[key] = PrefetchedCall(func, parameters)
+                self.stats["calls"] += 1
+        if pending is not None:
+            pending.discard()
+
+        if final:
+            self.stats["queries"] += 1
+            if speculation.calls:
+                self.stats["speculated"] += 1
+            logger.debug(f"Speculating on {list(speculation.calls)} for: {query}")
+        else:
+            self._pending = speculation
+        return speculation
+
+    def learn(self, query: str, response: Any) -> None:
+        """Feed the LLM's response to a query back into the scorer's history."""
+        if isinstance(response, dict) and response.get("type") == "function":
+            self.scorer.learn(query, response.get("name"), response.get("parameters"))
+        elif isinstance(response, dict) and "error" not in response:
+            self.scorer.learn(query, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Counters with hit rate (hits per speculated query) and seconds saved and wasted."""
+        stats = dict(self.stats)
+        stats["hit_rate"] = round(stats["hits"] / stats["speculated"], 3) if stats["speculated"] else None
+        stats["saved_seconds"] = round(self.saved_seconds, 3)
+        stats["wasted_seconds"] = round(self.wasted_seconds, 3)
+        return stats
+
+    def _speculative(self, name: str, parameters: Dict[str, Any]) -> bool:
+        func = self.scorer.functions.get(name)
+        if func is None or func.metadata.get("side_effects", False):
+            return False
+        schema = func.metadata.get("schema") or func.metadata.get("parameters") or {}
+        required = schema.get("required", [])
+        return all(parameter in parameters for parameter in required)
+
+    def _record_hit(self, saved: float) -> None:
+        self.stats["hits"] += 1
+        self.saved_seconds += saved
+
+    def _record_waste(self, seconds: float, cancelled: bool) -> None:
+        self.stats["wasted_calls"] += 1
+        self.stats["cancelled"] += cancelled
+        self.wasted_seconds += seconds
+        tracing.get_metrics().observe("speculate.wasted", seconds)
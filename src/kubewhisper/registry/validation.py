@@ -0,0 +1,193 @@
+"""
+Parameter schemas of registered functions, compiled into validators that coerce LLM arguments.
+"""
+
+import inspect
+import re
+import typing
+from typing import Any, Callable, Dict, List, Literal, Tuple, Union
+
+# JSON Schema types of the Python annotations a tool may use
+JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+
+_INTEGER = re.compile(r"^[+-]?\d+$")
+
+Validator = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class ValidationError(ValueError):
+    """A function call's parameters do not match the function's schema."""
+
+
+def annotation_schema(annotation: Any) -> Dict[str, Any]:
+    """Map a Python type annotation to a JSON Schema, e.g. int to {"type": "integer"}.
+
+    Literal becomes an enum and Optional[X] the schema of X; unknown annotations
+    are left untyped.
+    """
+    origin = typing.get_origin(annotation)
+    if origin is Literal:
+        values = list(typing.get_args(annotation))
+        json_type = JSON_TYPES.get(type(values[0]), "string") if values else "string"
+        return {"type": json_type, "enum": values}
+    if origin is Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        return annotation_schema(args[0]) if len(args) == 1 else {}
+    json_type = JSON_TYPES.get(origin or annotation)
+    return {"type": json_type} if json_type else {}
+
+
+def infer_parameters(func: Callable) -> Dict[str, Any]:
+    """Build the parameters schema of a function from its signature and type hints.
+
+    Parameters with a default are optional and carry the default.
+    """
+    try:
+        hints = typing.get_type_hints(func)
+    except Exception:
+        hints = {}
+    properties: Dict[str, Any] = {}
+    required: List[str] = []
+    for name, parameter in inspect.signature(func).parameters.items():
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        schema = annotation_schema(hints.get(name, parameter.annotation))
+        if parameter.default is parameter.empty:
+            required.append(name)
+        else:
+            schema["default"] = parameter.default
+        properties[name] = schema
+    return {"type": "object", "properties": properties, "required": required}
+
+
+def _coerce_integer(value: Any) -> int:
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str) and _INTEGER.match(value.strip()):
+        return int(value.strip())
+    raise TypeError
+
+
+def _coerce_number(value: Any) -> float:
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    raise TypeError
+
+
+def _coerce_boolean(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise TypeError
+
+
+def _coerce_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    # Names such as a namespace "2024" are sometimes returned as numbers
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError
+
+
+def _expect(kind: type) -> Callable[[Any], Any]:
+    def coerce(value: Any) -> Any:
+        if not isinstance(value, kind):
+            raise TypeError
+        return value
+
+    return coerce
+
+
+_COERCERS: Dict[str, Callable[[Any], Any]] = {
+    "integer": _coerce_integer,
+    "number": _coerce_number,
+    "boolean": _coerce_boolean,
+    "string": _coerce_string,
+    "array": _expect(list),
+    "object": _expect(dict),
+}
+
+
+def _compile_property(name: str, schema: Dict[str, Any]) -> Callable[[Any], Any]:
+    json_type = schema.get("type")
+    coerce = _COERCERS.get(json_type) if isinstance(json_type, str) else None
+    enum = schema.get("enum")
+    # Enum lookups by value; unhashable members fall back to a list scan
+    allowed = frozenset(enum) if enum and all(isinstance(value, typing.Hashable) for value in enum) else enum
+
+    # Optional parameters defaulting to None accept an explicit null
+    nullable = "default" in schema and schema["default"] is None
+
+    def check(value: Any) -> Any:
+        if value is None and nullable:
+            return value
+        if coerce is not None:
+            try:
+                value = coerce(value)
+            except (TypeError, ValueError):
+                raise ValidationError(f"Invalid type for {name}: expected {json_type}, got {value!r}") from None
+        if allowed is not None and value not in allowed:
+            raise ValidationError(f"Invalid value for {name}: {value!r} (expected one of {enum})")
+        return value
+
+    return check
+
+
+def compile_validator(schema: Dict[str, Any]) -> Validator:
+    """Compile a parameters schema into a function that validates and coerces call arguments.
+
+    The validator rejects unknown and missing required parameters, converts
+    values to the declared types where that is lossless (e.g. "5" to 5 for an
+    integer), checks enums and fills in the defaults of omitted parameters.
+
+    Args:
+        schema: JSON Schema of type object with "properties" and "required"
+
+    Returns:
+        Validator taking the call's parameters and returning the coerced parameters;
+        it raises ValidationError for invalid calls
+    """
+    properties = schema.get("properties") or {}
+    checks: Tuple[Tuple[str, Callable[[Any], Any]], ...] = tuple(
+        (name, _compile_property(name, property_schema)) for name, property_schema in properties.items()
+    )
+    required = tuple(schema.get("required") or ())
+    defaults = {
+        name: property_schema["default"]
+        for name, property_schema in properties.items()
+        if "default" in property_schema and name not in required
+    }
+    known = frozenset(properties)
+    additional = schema.get("additionalProperties", False) is not False
+
+    def validate(parameters: Dict[str, Any]) -> Dict[str, Any]:
+        if not isinstance(parameters, dict):
+            raise ValidationError(f"Parameters must be an object, got {parameters!r}")
+        for name in required:
+            if name not in parameters:
+                raise ValidationError(f"Missing required parameter: {name}")
+        if not additional:
+            unknown = parameters.keys() - known
+            if unknown:
+                raise ValidationError(f"Unknown parameter: {', '.join(sorted(unknown))}")
+        coerced = dict(defaults)
+        coerced.update(parameters)
+        for name, check in checks:
+            if name in parameters:
+                coerced[name] = check(parameters[name])
+        return coerced
+
+    return validate
@@ -0,0 +1,140 @@
+"""
+Long-lived asyncio event loop shared by the threads of a session.
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRuntime:
+    """Runs one event loop on a dedicated thread for the lifetime of a session.
+
+    Capture, transcription and keyboard threads submit coroutines to the loop
+    instead of creating a loop per query, so clients bound to the loop (the LLM
+    client, HTTP sessions) keep their connections across queries.
+    """
+
+    def __init__(self, name: str = "kubewhisper-runtime"):
+        """Initialize the runtime without starting it.
+
+        Args:
+            name: Name of the loop thread
+        """
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closers: List[Callable[[], Awaitable[None]]] = []
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The running event loop; starts the runtime if needed."""
+        if self._loop is None:
+            self.start()
+        return self._loop
+
+    @property
+    def is_running(self) -> bool:
+        """Whether the loop thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the loop thread and wait until the loop is running."""
+        if self.is_running:
+            return
+
+        loop = asyncio.new_event_loop()
+        ready = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(loop)
+            loop.call_soon(ready.set)
+            loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name=self.name, daemon=True)
+        self._thread.start()
+        ready.wait()
+        self._loop = loop
+        logger.debug(f"Started event loop thread {self.name}")
+
+    def submit(self, coro: Coroutine) -> concurrent.futures.Future:
+        """Schedule a coroutine on the loop from any thread.
+
+        Args:
+            coro: Coroutine to run
+
+        Returns:
+            Future for the coroutine's result
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the loop and wait for its result.
+
+        Must not be called from the loop thread itself.
+
+        Args:
+            coro: Coroutine to run
+            timeout: Seconds to wait before giving up
+
+        Returns:
+            The coroutine's result
+        """
+        if self._thread is threading.current_thread():
+            raise RuntimeError("AsyncRuntime.run() cannot be called from the loop thread")
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
+
+    def add_closer(self, closer: Callable[[], Awaitable[None]]) -> None:
+        """Register a coroutine function that releases loop-bound resources on stop."""
+        self._closers.append(closer)
+
+    async def _shutdown(self) -> None:
+        """Run the closers and cancel the remaining tasks."""
+        for closer in reversed(self._closers):
+            try:
+                await closer()
+            except Exception as e:
+                logger.warning(f"Error while closing runtime resources: {e}")
+
+        tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await asyncio.get_running_loop().shutdown_asyncgens()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Release resources, stop the loop and join its thread.
+
+        Args:
+            timeout: Seconds to wait for the closers
+        """
+        if not self.is_running:
+            return
+
+        try:
+            self.run(self._shutdown(), timeout)
+        except Exception as e:
+            logger.warning(f"Runtime shutdown did not complete: {e}")
+
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+        self._thread = None
+        logger.debug(f"Stopped event loop thread {self.name}")
+
+    def __enter__(self) -> "AsyncRuntime":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,114 @@
+"""
+Import and startup timing for the command-line interface.
+"""
+
+import sys
+import time
+from typing import Dict, List, Optional, TextIO, Tuple
+
+
+class _TimedLoader:
+    """Wraps a module loader and reports how long executing the module took."""
+
+    def __init__(self, loader, profiler: "ImportProfiler"):
+        self._loader = loader
+        self._profiler = profiler
+
+    def create_module(self, spec):
+        return self._loader.create_module(spec)
+
+    def exec_module(self, module):
+        self._profiler._enter()
+        try:
+            self._loader.exec_module(module)
+        finally:
+            self._profiler._leave(module.__name__)
+
+    def __getattr__(self, name: str):
+        # get_resource_reader, get_data, is_package, ... are answered by the real loader
+        return getattr(self._loader, name)
+
+
+class ImportProfiler:
+    """Records the import time of every module loaded while it is installed, plus named phases.
+
+    Installed as the first entry of sys.meta_path, it lets the other finders
+    locate each module and times the execution of the module body. Self time
+    excludes the modules imported while the body ran.
+    """
+
+    def __init__(self):
+        self.modules: Dict[str, Tuple[float, float]] = {}
+        self.phases: List[Tuple[str, float]] = []
+        self.preloaded_modules = 0
+        self.cpu_before_install = 0.0
+        self._children: List[float] = []
+        self._starts: List[float] = []
+        self._last_mark = 0.0
+
+    def install(self) -> "ImportProfiler":
+        """Start recording imports."""
+        self.preloaded_modules = len(sys.modules)
+        # CPU time of the interpreter start and of the imports that happened before this point
+        self.cpu_before_install = time.process_time()
+        self._last_mark = time.perf_counter()
+        sys.meta_path.insert(0, self)
+        return self
+
+    def uninstall(self) -> None:
+        """Stop recording imports."""
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is None:
+                continue
+            if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+                spec.loader = _TimedLoader(spec.loader, self)
+            return spec
+        return None
+
+    def _enter(self) -> None:
+        self._starts.append(time.perf_counter())
+        self._children.append(0.0)
+
+    def _leave(self, name: str) -> None:
+        elapsed = time.perf_counter() - self._starts.pop()
+        children = self._children.pop()
+        if self._children:
+            self._children[-1] += elapsed
+        self.modules[name] = (elapsed, elapsed - children)
+
+    def mark(self, phase: str) -> None:
+        """Record the wall time since the previous mark under a phase name."""
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last_mark))
+        self._last_mark = now
+
+    def report(self, output: Optional[TextIO] = None, top: int = 25) -> None:
+        """Write the phase timings and the slowest imports.
+
+        Args:
+            output: Stream to write to (default: stderr)
+            top: Number of modules listed
+        """
+        output = output or sys.stderr
+        output.write("\nStartup profile\n")
+        output.write(
+            f"  {'before profiling (CPU)':<36}{self.cpu_before_install * 1000:9.1f} ms"
+            f"  ({self.preloaded_modules} modules already loaded)\n"
+        )
+        for phase, seconds in self.phases:
+            output.write(f"  {phase:<36}{seconds * 1000:9.1f} ms\n")
+
+        total_self = sum(self_time for _, self_time in self.modules.values())
+        output.write(f"\n  {len(self.modules)} modules imported, {total_self * 1000:.1f} ms in module bodies\n")
+        output.write(f"  {'cumulative ms':>13} {'self ms':>9}  module\n")
+        slowest = sorted(self.modules.items(), key=lambda item: item[1][0], reverse=True)[:top]
+        for name, (cumulative, self_time) in slowest:
+            output.write(f"  {cumulative * 1000:13.1f} {self_time * 1000:9.1f}  {name}\n")
+        output.flush()
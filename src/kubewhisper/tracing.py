@@ -0,0 +1,360 @@
+"""
+Per-query tracing of pipeline stages and latency histograms for export.
+"""
+
+import collections
+import contextlib
+import contextvars
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the exported histogram buckets
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current_trace: contextvars.ContextVar[Optional["Trace"]] = contextvars.ContextVar("trace", default=None)
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+
+
+class Histogram:
+    """Latency distribution of one stage.
+
+    Counts per bucket cover every observation since startup and are exported in
+    Prometheus format; percentiles are computed from the most recent samples.
+    """
+
+    def __init__(self, window: int = 1024):
+        """Initialize the histogram.
+
+        Args:
+            window: Number of recent samples kept for percentiles
+        """
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent: Deque[float] = collections.deque(maxlen=window)
+
+    def observe(self, seconds: float) -> None:
+        """Record one duration."""
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+        self.recent.append(seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, fraction: float) -> Optional[float]:
+        """Return a percentile of the recent samples, e.g. 0.95 for p95."""
+        if not self.recent:
+            return None
+        ordered = sorted(self.recent)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+    def as_dict(self) -> Dict[str, Optional[float]]:
+        """Summary with count, mean, p50, p95, p99 and max in seconds."""
+
+        def rounded(value: Optional[float]) -> Optional[float]:
+            return None if value is None else round(value, 4)
+
+        return {
+            "count": self.count,
+            "mean": rounded(self.sum / self.count) if self.count else None,
+            "p50": rounded(self.quantile(0.5)),
+            "p95": rounded(self.quantile(0.95)),
+            "p99": rounded(self.quantile(0.99)),
+            "max": rounded(self.max) if self.count else None,
+        }
+
+
+class Metrics:
+    """Latency histograms of all pipeline stages, keyed by span name. Thread-safe."""
+
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, stage: str, seconds: float) -> None:
+        """Record the duration of one stage."""
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Percentile summary of every stage."""
+        with self._lock:
+            return {stage: histogram.as_dict() for stage, histogram in sorted(self._histograms.items())}
+
+    def to_json(self) -> str:
+        """The snapshot as JSON."""
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """All histograms in the Prometheus text exposition format."""
+        name = "kubewhisper_stage_duration_seconds"
+        lines = [
+            f"# HELP {name} Duration of kubewhisper pipeline stages.",
+            f"# TYPE {name} histogram",
+        ]
+        with self._lock:
+            for stage, histogram in sorted(self._histograms.items()):
+                label = stage.replace("\\", "\\\\").replace('"', '\\"')
+                cumulative = 0
+                for bound, count in zip(BUCKETS, histogram.buckets):
+                    cumulative += count
+                    lines.append(f'{name}_bucket{{stage="{label}",le="{bound:g}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{stage="{label}",le="+Inf"}} {histogram.count}')
+                lines.append(f'{name}_sum{{stage="{label}"}} {histogram.sum:.6f}')
+                lines.append(f'{name}_count{{stage="{label}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def reset(self) -> None:
+        """Forget all observations."""
+        with self._lock:
+            self._histograms.clear()
+
+
+_metrics = Metrics()
+
+
+def get_metrics() -> Metrics:
+    """Return the process-wide metrics."""
+    return _metrics
+
+
+class Span:
+    """One timed stage, optionally nested in another span of the same trace."""
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, attrs: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs or {}
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+
+    @property
+    def duration(self) -> float:
+        """Seconds the span took, or has taken so far."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    @property
+    def depth(self) -> int:
+        """Number of enclosing spans."""
+        depth, parent = 0, self.parent
+        while parent is not None:
+            depth, parent = depth + 1, parent.parent
+        return depth
+
+
+class Trace:
+    """The spans of one query, from capture to the end of the spoken answer.
+
+    A trace is carried in a context variable, so spans opened by asyncio tasks,
+    asyncio.to_thread calls and the transcription and playback threads (which
+    copy the submitting context) are attached to the query they belong to.
+    """
+
+    def __init__(self, name: str, **attrs):
+        """Initialize the trace.
+
+        Args:
+            name: Kind of query, e.g. "voice" or "text"
+            attrs: Attributes shown with the trace
+        """
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.attrs = attrs
+        self.start = time.perf_counter()
+        self.end: Optional[float] = None
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    @property
+    def duration(self) -> float:
+        """Seconds from the first span (or trace creation) to finish."""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def add(self, span: Span) -> None:
+        """Attach a finished span; spans that started before the trace extend it backwards."""
+        with self._lock:
+            self.spans.append(span)
+            self.start = min(self.start, span.start)
+
+    def finish(self) -> None:
+        """End the trace, record its total duration and notify the trace listeners. Idempotent."""
+        with self._lock:
+            if self.end is not None:
+                return
+            self.end = time.perf_counter()
+        _metrics.observe(f"total.{self.name}", self.duration)
+        for listener in list(_listeners):
+            try:
+                listener(self)
+            except Exception as e:
+                logger.error(f"Error in trace listener: {e}")
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The trace with span offsets and durations in seconds."""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.start)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "attrs": self.attrs,
+            "duration": round(self.duration, 4),
+            "spans": [
+                {
+                    "name": span.name,
+                    "offset": round(span.start - self.start, 4),
+                    "duration": round(span.duration, 4),
+                    "depth": span.depth,
+                    **({"attrs": span.attrs} if span.attrs else {}),
+                }
+                for span in spans
+            ],
+        }
+
+    def waterfall(self, width: int = 40) -> str:
+        """Render the spans as a text waterfall, one line per span in start order."""
+        trace = self.as_dict()
+        total = trace["duration"] or 1e-9
+        attrs = " ".join(f"{key}={value}" for key, value in self.attrs.items())
+        lines = [f"trace {self.trace_id} {self.name} {trace['duration'] * 1000:.0f} ms {attrs}".rstrip()]
+        for span in trace["spans"]:
+            first = min(width - 1, int(span["offset"] / total * width))
+            length = max(1, round(span["duration"] / total * width))
+            bar = " " * first + "█" * min(length, width - first)
+            label = "  " * span["depth"] + span["name"]
+            offset_ms, duration_ms = span["offset"] * 1000, span["duration"] * 1000
+            lines.append(f"  {label:<28} |{bar:<{width}}| {offset_ms:8.0f} +{duration_ms:.0f} ms")
+        return "\n".join(lines)
+
+
+_listeners: List[Callable[[Trace], None]] = []
+
+
+def add_trace_listener(listener: Callable[[Trace], None]) -> None:
+    """Call a function with every trace when it finishes, e.g. to print its waterfall."""
+    _listeners.append(listener)
+
+
+def remove_trace_listener(listener: Callable[[Trace], None]) -> None:
+    """Stop calling a trace listener."""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def start_trace(name: str, **attrs) -> Trace:
+    """Create a trace; activate it to attach the spans of the current context."""
+    return Trace(name, **attrs)
+
+
+def current_trace() -> Optional[Trace]:
+    """The trace of the current context, if any."""
+    return _current_trace.get()
+
+
+@contextlib.contextmanager
+def activate(trace: Optional[Trace]) -> Iterator[Optional[Trace]]:
+    """Make a trace current in this context. Leaving the block does not finish the trace."""
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    finally:
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+
+@contextlib.contextmanager
+def span(name: str, **attrs) -> Iterator[Span]:
+    """Time a stage, record it in the stage's histogram and attach it to the current trace.
+
+    Args:
+        name: Stage name, e.g. "llm.ask"
+        attrs: Attributes shown with the span; more can be set on the yielded span
+    """
+    current = Span(name, _current_span.get(), attrs)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.attrs["error"] = type(e).__name__
+        raise
+    finally:
+        _current_span.reset(token)
+        current.end = time.perf_counter()
+        _metrics.observe(name, current.duration)
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add(current)
+
+
+def record_span(name: str, seconds: float, end: Optional[float] = None, **attrs) -> Span:
+    """Record a stage that was timed elsewhere, e.g. audio capture measured by its length.
+
+    Args:
+        name: Stage name
+        seconds: Duration of the stage
+        end: perf_counter() value at which the stage ended (default: now)
+        attrs: Attributes shown with the span
+    """
+    recorded = Span(name, _current_span.get(), attrs)
+    recorded.end = time.perf_counter() if end is None else end
+    recorded.start = recorded.end - seconds
+    _metrics.observe(name, seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(recorded)
+    return recorded
+
+
+def start_metrics_server(port: int, host: str = "127.0.0.1"):
+    """Serve the metrics over HTTP on a background thread.
+
+    GET /metrics returns the Prometheus text format and GET /metrics.json the
+    percentile snapshot.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        host: Interface to bind
+
+    Returns:
+        The running server; call shutdown() to stop it
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path == "/metrics":
+                body, content_type = _metrics.to_prometheus(), "text/plain; version=0.0.4"
+            elif self.path == "/metrics.json":
+                body, content_type = _metrics.to_json(), "application/json"
+            else:
+                self.send_error(404)
+                return
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            logger.debug(f"Metrics request: {format % args}")
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
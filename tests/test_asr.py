@@ -0,0 +1,64 @@
+import unittest
+
+import numpy as np
+
+from kubewhisper.audio.asr import ASRBackend, FasterWhisperBackend, MLXWhisperBackend, create_backend
+
+
+class EchoBackend(ASRBackend):
+    """Backend stand-in that transcribes audio as its duration."""
+
+    name = "echo"
+    default_model = "echo-model"
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loads = 0
+        self.calls = []
+
+    def _load(self):
+        self.loads += 1
+
+    def _transcribe(self, audio, word_timestamps, initial_prompt):
+        self.calls.append((len(audio), word_timestamps, initial_prompt))
+        text = f" {len(audio) / self.sample_rate:.1f} seconds"
+        words = [{"start": 0.0, "end": len(audio) / self.sample_rate, "word": text}] if word_timestamps else []
+        return {"text": text, "segments": [{"start": 0.0, "end": 1.0, "text": text, "words": words}]}
+
+
+class TestASRBackend(unittest.TestCase):
+    def test_warmup_loads_once(self):
+        backend = EchoBackend()
+        backend.warmup()
+        backend.transcribe(np.zeros(16000, dtype=np.float32))
+        self.assertEqual(backend.loads, 1)
+        self.assertEqual(backend.model, "echo-model")
+        self.assertIsNotNone(backend.load_seconds)
+        # Warmup is not counted in the real-time statistics
+        self.assertEqual(backend.stats.calls, 1)
+
+    def test_real_time_factor(self):
+        backend = EchoBackend()
+        result = backend.transcribe(np.zeros(32000, dtype=np.float32), word_timestamps=True, initial_prompt="pods")
+        self.assertEqual(result["text"], " 2.0 seconds")
+        self.assertEqual(result["segments"][0]["words"][0]["end"], 2.0)
+        self.assertEqual(backend.calls[-1], (32000, True, "pods"))
+
+        stats = backend.stats.as_dict()
+        self.assertEqual(stats["calls"], 1)
+        self.assertEqual(stats["audio_seconds"], 2.0)
+        self.assertLess(stats["rtf"], 1.0)
+        self.assertEqual(stats["rtf"], stats["worst_rtf"])
+
+    def test_create_backend(self):
+        backend = create_backend("faster-whisper", threads=4, beam_size=5, compute_type="int8")
+        self.assertIsInstance(backend, FasterWhisperBackend)
+        self.assertEqual((backend.model, backend.threads, backend.beam_size), ("small", 4, 5))
+        self.assertIsInstance(create_backend("mlx", model="tiny"), MLXWhisperBackend)
+        self.assertIn(create_backend("auto").name, ("mlx", "faster-whisper"))
+        with self.assertRaises(ValueError):
+            create_backend("whisper.cpp")
+
+
+if __name__ == "__main__":
+    unittest.main()
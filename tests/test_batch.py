@@ -0,0 +1,87 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubewhisper.audio.asr import ASRBackend
+from kubewhisper.audio.batch import BatchTranscriber, find_audio_files
+
+
+class LengthBackend(ASRBackend):
+    """Backend stand-in that transcribes audio as its duration in tenths of a second."""
+
+    name = "length"
+
+    def _load(self):
+        pass
+
+    def _transcribe(self, audio, word_timestamps, initial_prompt):
+        return {"text": f" {round(len(audio) / self.sample_rate * 10)} tenths", "segments": []}
+
+
+def speech_like(duration, sample_rate):
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    return 0.2 * sum(np.sin(2 * np.pi * 140.0 * k * t) / k for k in range(2, 20))
+
+
+class TestBatchTranscriber(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        os.makedirs(os.path.join(self.tmpdir.name, "nested"))
+
+        self.files = []
+        for i, (name, rate) in enumerate([("a.wav", 16000), ("nested/b.wav", 44100), ("c.wav", 48000)]):
+            audio = np.concatenate([np.zeros(rate), speech_like(1.0 + i, rate), np.zeros(rate)])
+            path = os.path.join(self.tmpdir.name, name)
+            wavfile.write(path, rate, (audio * 32767).astype(np.int16))
+            self.files.append(path)
+        wavfile.write(os.path.join(self.tmpdir.name, "silent.wav"), 16000, np.zeros(16000, dtype=np.int16))
+        open(os.path.join(self.tmpdir.name, "notes.txt"), "w").close()
+
+    def test_find_audio_files(self):
+        found = find_audio_files(["extra.flac"], self.tmpdir.name)
+        self.assertEqual(found[0], "extra.flac")
+        self.assertEqual(
+            [os.path.relpath(p, self.tmpdir.name) for p in found[1:]], ["a.wav", "c.wav", "nested/b.wav", "silent.wav"]
+        )
+
+    def test_jsonl_output_in_order_with_timings(self):
+        queries = []
+        batch = BatchTranscriber(
+            LengthBackend(), workers=3, process_query=lambda text: queries.append(text) or {"response": "ok"}
+        )
+        output = io.StringIO()
+        paths = self.files + [os.path.join(self.tmpdir.name, "silent.wav"), "missing.wav"]
+        summary = batch.run(paths, output)
+
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(records[-1], summary)
+        files = records[:-1]
+        self.assertEqual([r["file"] for r in files], paths)
+
+        for i, record in enumerate(files[:3]):
+            self.assertEqual(record["audio_seconds"], 3.0 + i)
+            # Leading and trailing silence is trimmed before transcription
+            self.assertGreater(record["trimmed_seconds"], 1.0)
+            self.assertLess(int(record["text"].split()[0]), (3.0 + i) * 10)
+            self.assertEqual(set(record["timings"]), {"decode", "preprocess", "transcribe", "query"})
+            self.assertEqual(record["response"], {"response": "ok"})
+
+        self.assertEqual(files[3]["error"], "Audio input level too low")
+        self.assertIn("error", files[4])
+        self.assertEqual(len(queries), 3)
+
+        self.assertEqual(summary["files"], 5)
+        self.assertEqual(summary["failed"], 2)
+        self.assertEqual(summary["audio_seconds"], 3.0 + 4.0 + 5.0 + 1.0)
+        self.assertGreater(summary["throughput"], 0)
+        self.assertEqual(summary["asr"]["calls"], 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+
+from kubewhisper.bench.runner import BenchRunner, _environment, compare_to_baseline
+from kubewhisper.bench.stubs import StubLLMServer
+from kubewhisper.runtime import AsyncRuntime
+
+
+def _report(p50: float, stage_p50: float):
+    summary = {"p50": p50, "p95": p50}
+    return {"scenarios": {"nodes": {"latency": summary, "stages": {"llm.ask": {"p50": stage_p50, "p95": stage_p50}}}}}
+
+
+def _config():
+    return {
+        "llm": {
+            "latency_ms": 5,
+            "token_ms": 0,
+            "rules": [
+                {
+                    "match": "nodes",
+                    "response": {"type": "function", "name": "get_number_of_nodes", "parameters": {}},
+                }
+            ],
+        },
+        "tts": {"latency_ms": 0, "char_ms": 0},
+        "kubernetes": {"latency_ms": 0, "nodes": 7},
+        "scenarios": [
+            {"name": "nodes", "text": "How many nodes are in the cluster?"},
+            {"name": "chat", "text": "What is a Kubernetes operator?", "runs": 1},
+        ],
+    }
+
+
+class TestBench(unittest.TestCase):
+    def test_llm_stub_answers_scripted_function_call(self):
+        from kubewhisper.k8s import k8s_tools  # noqa: F401  registers the tools the response is validated against
+        from kubewhisper.llm.deepseek import DeepSeekLLM
+
+        stub = StubLLMServer(
+            rules=[
+                {"match": "nodes", "response": {"type": "function", "name": "get_number_of_nodes", "parameters": {}}}
+            ],
+            latency_ms=0,
+            token_ms=0,
+        )
+        runtime = AsyncRuntime(name="test-bench")
+        runtime.start()
+        self.addCleanup(runtime.stop)
+        runtime.run(stub.start())
+        self.addCleanup(runtime.run, stub.stop())
+
+        with _environment(DEEPSEEK_API_KEY="test"):
+            llm = DeepSeekLLM(api_base=stub.url)
+            call = runtime.run(llm.ask_question("How many nodes are there?"))
+            chat = runtime.run(llm.ask_question("What is an operator?"))
+
+        self.assertEqual(call["name"], "get_number_of_nodes")
+        self.assertEqual(chat, {"response": stub.default})
+        self.assertEqual(stub.questions, ["How many nodes are there?", "What is an operator?"])
+        self.assertEqual(stub.requests, 2)
+
+    def test_compare_to_baseline(self):
+        baseline = _report(0.500, 0.300)
+        self.assertEqual(compare_to_baseline(_report(0.550, 0.302), baseline), [])
+        self.assertEqual(compare_to_baseline(_report(0.510, 0.004), _report(0.500, 0.001)), [])
+
+        regressions = compare_to_baseline(_report(0.700, 0.300), baseline)
+        self.assertEqual(len(regressions), 2)
+        self.assertTrue(regressions[0].startswith("nodes latency p50: 500.0 ms -> 700.0 ms"))
+
+    def test_runner_reports_per_scenario_latencies(self):
+        report = BenchRunner(_config(), runs=2, warmup=0).run()
+
+        self.assertEqual(report["runs"], 3)
+        nodes = report["scenarios"]["nodes"]
+        self.assertEqual((nodes["runs"], nodes["failed"]), (2, 0))
+        self.assertIn("llm.ask", nodes["stages"])
+        self.assertIn("tool.get_number_of_nodes", nodes["stages"])
+        self.assertGreaterEqual(nodes["latency"]["p50"], 0.005)
+        self.assertNotIn("tool.get_number_of_nodes", report["scenarios"]["chat"]["stages"])
+        # Three questions, plus the model list request that opened the connection at startup
+        self.assertEqual(report["requests"]["llm"], 4)
+        self.assertEqual((report["llm"]["questions"], report["llm"]["timeouts"]), (3, 0))
+        self.assertGreater(report["requests"]["kubernetes"], 0)
+        self.assertNotIn("speculation", report)
+
+    def test_runner_reports_speculation(self):
+        report = BenchRunner(_config(), runs=2, warmup=0, speculate=True).run()
+
+        self.assertEqual(report["scenarios"]["nodes"]["failed"], 0)
+        # The node count was fetched while the LLM chose the tool, and used
+        self.assertEqual(report["speculation"]["hits"], 2)
+        self.assertEqual(report["speculation"]["wasted_calls"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import asyncio
+import unittest
+
+from kubewhisper.registry import compaction
+from kubewhisper.registry.compaction import ResultCompactor, estimate_tokens
+from kubewhisper.registry.function_executor import FunctionExecutor
+
+
+def _clusters(count):
+    clusters = [
+        {"name": f"cluster-{i}", "server": f"https://10.0.{i // 256}.{i % 256}:6443", "is_active": i == 7}
+        for i in range(count)
+    ]
+    return {"clusters": clusters, "total_clusters": count, "active_cluster": clusters[7]}
+
+
+def _tool(template, result):
+    async def get_available_clusters():
+        return result
+
+    get_available_clusters.metadata = {"response_template": template}
+    return get_available_clusters
+
+
+class TestResultCompactor(unittest.TestCase):
+    def test_results_within_budget_are_unchanged(self):
+        result = {"node_count": 3, "names": ["a", "b"]}
+        self.assertIs(ResultCompactor().compact(result), result)
+
+    def test_large_lists_become_bounded_summaries(self):
+        compactor = ResultCompactor(budget_tokens=200)
+        for count in (300, 3000):
+            with self.subTest(count=count):
+                compacted = compactor.compact(_clusters(count))
+                self.assertLessEqual(estimate_tokens(str(compacted)), 200)
+                self.assertEqual(compacted["total_clusters"], count)
+                self.assertEqual(compacted["active_cluster"]["name"], "cluster-7")
+                clusters = compacted["clusters"]
+                self.assertEqual(clusters["count"], count)
+                self.assertEqual(clusters["groups"], {"is_active": {"false": count - 1, "true": 1}})
+                self.assertEqual(clusters["first"][0]["name"], "cluster-0")
+
+    def test_summarizers_per_type(self):
+        compacted = ResultCompactor(budget_tokens=150, max_items=3, max_string=50).compact(
+            {
+                "restarts": list(range(100)),
+                "reasons": ["BackOff"] * 60 + ["Pulled"] * 30 + ["Killing"] * 9 + ["OOMKilled"],
+                "log": "x" * 1000,
+                "pods": [{"phase": "Running", "restarts": 2}] * 50,
+            }
+        )
+        self.assertEqual(compacted["restarts"], {"count": 100, "min": 0, "max": 99, "mean": 49.5, "sum": 4950})
+        self.assertEqual(
+            compacted["reasons"],
+            {"count": 100, "distinct": 4, "most_common": {"BackOff": 60, "Pulled": 30, "Killing": 9}},
+        )
+        self.assertTrue(compacted["log"].endswith("more characters)"))
+        self.assertEqual(compacted["pods"]["groups"], {"phase": {"Running": 50}})
+        self.assertEqual(compacted["pods"]["totals"], {"restarts": 100})
+
+
+class TestExecutorCompaction(unittest.TestCase):
+    def setUp(self):
+        saved = compaction.get_default_compactor()
+        self.addCleanup(compaction.set_default_compactor, saved)
+        compaction.set_default_compactor(ResultCompactor(budget_tokens=200))
+
+    def test_untemplated_result_is_summarized_and_full_result_kept(self):
+        result = _clusters(300)
+        response = asyncio.run(FunctionExecutor.execute_function(_tool("", result)))
+        self.assertLessEqual(len(response["formatted_response"]), 800 + len(" ... (99999 more characters)"))
+        self.assertEqual(response["result"]["clusters"]["count"], 300)
+        self.assertIs(response["full_result"], result)
+
+        compaction.set_default_compactor(None)
+        response = asyncio.run(FunctionExecutor.execute_function(_tool("", result)))
+        self.assertEqual(response["formatted_response"], str(result))
+        self.assertNotIn("full_result", response)
+
+    def test_template_is_formatted_with_the_full_result(self):
+        template = "Found {total_clusters} clusters. Active cluster is '{active_cluster[name]}'."
+        response = asyncio.run(FunctionExecutor.execute_function(_tool(template, _clusters(300))))
+        self.assertEqual(response["formatted_response"], "Found 300 clusters. Active cluster is 'cluster-7'.")
+
+        response = asyncio.run(FunctionExecutor.execute_function(_tool("Clusters: {clusters}", _clusters(300))))
+        self.assertTrue(response["formatted_response"].startswith("Clusters: {'count': 300"))
+        self.assertLessEqual(len(response["formatted_response"]), 800 + len(" ... (99999 more characters)"))
+
+
+if __name__ == "__main__":
+    unittest.main()
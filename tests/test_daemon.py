@@ -0,0 +1,148 @@
+import asyncio
+import base64
+import io
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubewhisper import cli
+from kubewhisper.audio.asr import ASRBackend
+from kubewhisper.audio.batch import BatchTranscriber
+from kubewhisper.daemon import DaemonClient, DaemonError, DaemonServer, connect_daemon
+from kubewhisper.k8s import stats_store
+from kubewhisper.runtime import AsyncRuntime
+
+
+class EchoAssistant:
+    """Assistant stand-in that answers after a delay, on its own runtime."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.runtime = AsyncRuntime()
+        self.runtime.start()
+
+    async def process_query(self, query):
+        await asyncio.sleep(self.delay)
+        return {"response": f"echo: {query}"}
+
+
+class FixedBackend(ASRBackend):
+    name = "fixed"
+
+    def _load(self):
+        pass
+
+    def _transcribe(self, audio, word_timestamps, initial_prompt):
+        return {"text": " how many pods are running", "segments": []}
+
+
+class TestDaemon(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.socket_path = os.path.join(self.tmpdir.name, "daemon.sock")
+        self.assistant = EchoAssistant(delay=0.2)
+        self.addCleanup(self.assistant.runtime.stop)
+        self.server = DaemonServer(
+            self.assistant, self.socket_path, transcriber=BatchTranscriber(FixedBackend(), stages=())
+        )
+        self.server.start()
+        self.addCleanup(self.server.stop)
+
+    def test_query_round_trip(self):
+        client = connect_daemon(self.socket_path)
+        self.assertIsInstance(client, DaemonClient)
+        self.assertEqual(client.query("how many nodes"), {"response": "echo: how many nodes"})
+        self.assertEqual(client.ping()["requests"], 2)
+
+    def test_sessions_are_served_concurrently(self):
+        results = []
+
+        def ask(i):
+            results.append(DaemonClient(self.socket_path).query(f"query {i}"))
+
+        threads = [threading.Thread(target=ask, args=(i,)) for i in range(5)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(results), 5)
+        self.assertLess(time.perf_counter() - start, 0.2 * 5 * 0.6)
+
+    def test_audio_request_is_transcribed_and_answered(self):
+        t = np.arange(16000) / 16000
+        buffer = io.BytesIO()
+        wavfile.write(buffer, 16000, (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16))
+        path = os.path.join(self.tmpdir.name, "query.wav")
+        with open(path, "wb") as f:
+            f.write(buffer.getvalue())
+
+        response = DaemonClient(self.socket_path).transcribe(path)
+        self.assertEqual(response["text"], "how many pods are running")
+        self.assertEqual(response["response"], {"response": "echo: how many pods are running"})
+
+        with self.assertRaises(DaemonError):
+            DaemonClient(self.socket_path).request({"op": "audio", "audio": base64.b64encode(b"junk").decode()})
+
+    def test_errors_and_shutdown(self):
+        client = DaemonClient(self.socket_path)
+        with self.assertRaises(DaemonError):
+            client.request({"op": "query", "text": " "})
+        with self.assertRaises(DaemonError):
+            client.request({"op": "unknown"})
+
+        client.shutdown()
+        self.assertTrue(self.server.wait(1.0))
+        self.server.stop()
+        self.assertIsNone(connect_daemon(self.socket_path))
+
+
+class LocalAssistantStarted(Exception):
+    pass
+
+
+class TestTextQueryRouting(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.addCleanup(stats_store.set_default_store, stats_store._default_store)
+        self.via_daemon = self.enterContext(mock.patch.object(cli, "run_text_via_daemon", return_value=0))
+        self.enterContext(mock.patch("kubewhisper.assistant.Assistant", side_effect=LocalAssistantStarted))
+
+    def run_query(self, *options):
+        try:
+            return cli.main(["--text", "how many pods failed", *options])
+        except LocalAssistantStarted:
+            return None
+
+    def test_plain_query_goes_to_the_daemon(self):
+        self.assertEqual(self.run_query(), 0)
+        self.via_daemon.assert_called_once()
+
+    def test_stats_db_keeps_the_query_local(self):
+        # The trend tools would otherwise read the daemon's store instead of this one
+        db_path = os.path.join(self.tmpdir.name, "other.db")
+        self.assertIsNone(self.run_query("--stats-db", db_path))
+        self.via_daemon.assert_not_called()
+        self.assertEqual(stats_store.get_default_store().path, db_path)
+        stats_store.get_default_store().close()
+
+
+class TestConnectDaemon(unittest.TestCase):
+    def test_missing_or_stale_socket(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "daemon.sock")
+            self.assertIsNone(connect_daemon(path))
+            open(path, "w").close()
+            self.assertIsNone(connect_daemon(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+from scipy import signal
+
+from kubewhisper.audio.dsp import (
+    LowPassStage,
+    NoiseGateStage,
+    SilenceTrimStage,
+    StreamingResampler,
+    build_preprocessing_chain,
+    design_lowpass,
+)
+
+
+class TestStreamingResampler(unittest.TestCase):
+    def resample_in_blocks(self, resampler, audio, rng):
+        output, start = [], 0
+        while start < len(audio):
+            size = int(rng.integers(1, resampler.orig_sr // 5))
+            output.append(resampler.process(audio[start : start + size]).copy())
+            start += size
+        output.append(resampler.flush())
+        return np.concatenate(output)
+
+    def test_matches_resample_poly(self):
+        rng = np.random.default_rng(0)
+        for orig_sr in (48000, 44100, 22050, 8000):
+            with self.subTest(orig_sr=orig_sr):
+                audio = rng.standard_normal(orig_sr + 321)
+                resampler = StreamingResampler(orig_sr, 16000)
+                output = self.resample_in_blocks(resampler, audio, rng)
+
+                expected = signal.resample_poly(audio, resampler.up, resampler.down)
+                self.assertEqual(output.dtype, np.float32)
+                self.assertEqual(len(output), len(expected))
+                np.testing.assert_allclose(output, expected, atol=1e-5)
+
+    def test_equal_rates_pass_through(self):
+        audio = np.random.default_rng(1).standard_normal(1000)
+        output = self.resample_in_blocks(StreamingResampler(16000, 16000), audio, np.random.default_rng(2))
+        np.testing.assert_allclose(output, audio, atol=1e-6)
+
+    def test_flush_resets_state(self):
+        resampler = StreamingResampler(48000, 16000)
+        first = np.concatenate([resampler.process(np.ones(4800)).copy(), resampler.flush()])
+        second = np.concatenate([resampler.process(np.ones(4800)).copy(), resampler.flush()])
+        np.testing.assert_array_equal(first, second)
+
+
+def run_blocks(processor, audio, block_size):
+    output = [processor.process(audio[start : start + block_size]).copy() for start in range(0, len(audio), block_size)]
+    output.append(processor.flush())
+    return np.concatenate(output)
+
+
+class TestProcessingChain(unittest.TestCase):
+    def speech_like(self, duration, sample_rate=16000):
+        t = np.arange(int(duration * sample_rate)) / sample_rate
+        return 0.2 * sum(np.sin(2 * np.pi * 140.0 * k * t) / k for k in range(2, 20)).astype(np.float32)
+
+    def test_lowpass_matches_whole_signal_filter(self):
+        audio = np.random.default_rng(3).standard_normal(16000).astype(np.float32)
+        output = run_blocks(LowPassStage(16000), audio, 1600)
+        expected = signal.sosfilt(design_lowpass(4, 2000.0, 16000).copy(), audio)
+        np.testing.assert_allclose(output, expected, atol=1e-4)
+        self.assertIs(design_lowpass(4, 2000.0, 16000), design_lowpass(4, 2000.0, 16000))
+
+    def test_noise_gate_follows_noise_floor(self):
+        rng = np.random.default_rng(4)
+        noise = 0.01 * rng.standard_normal(16000).astype(np.float32)
+        gate = NoiseGateStage()
+        run_blocks(gate, noise.copy(), 1600)
+        self.assertAlmostEqual(gate.noise_floor, np.mean(np.abs(noise)), delta=0.003)
+
+        # A louder tone passes the gate mostly intact
+        tone = 0.5 * np.sin(2 * np.pi * 440 * np.arange(1600) / 16000).astype(np.float32)
+        self.assertGreater(np.mean(gate.process(tone.copy()) != 0), 0.9)
+
+    def test_trim_keeps_speech_and_pads(self):
+        silence = 0.001 * np.random.default_rng(5).standard_normal(16000).astype(np.float32)
+        speech = self.speech_like(1.0)
+        audio = np.concatenate([silence, speech, silence])
+
+        trim = SilenceTrimStage(16000, lead_pad=0.2, trail_pad=0.2)
+        output = run_blocks(trim, audio, 1600)
+        self.assertEqual(len(output) + trim.removed_samples, len(audio))
+        # Pads plus the detector hangover
+        self.assertLessEqual(len(output), 1.7 * 16000)
+        self.assertGreater(len(output), 1.0 * 16000)
+
+    def test_trim_passes_audio_without_speech(self):
+        silence = 0.001 * np.random.default_rng(6).standard_normal(8000).astype(np.float32)
+        trim = SilenceTrimStage(16000)
+        np.testing.assert_array_equal(run_blocks(trim, silence, 1600), silence)
+        self.assertEqual(trim.removed_samples, 0)
+
+    def test_chain_reports_removed_samples(self):
+        silence = np.zeros(48000, dtype=np.float32)
+        speech = self.speech_like(1.0, sample_rate=48000)
+        audio = np.concatenate([silence, speech, silence])
+
+        chain = build_preprocessing_chain(48000, 16000)
+        output = run_blocks(chain, audio, 4800)
+        self.assertEqual(output.dtype, np.float32)
+        self.assertEqual(len(output) + chain.removed_samples, len(audio) // 3)
+        self.assertGreater(chain.removed_samples, 16000)
+
+        chain.reset()
+        self.assertEqual(chain.removed_samples, 0)
+
+    def test_unknown_stage(self):
+        with self.assertRaises(ValueError):
+            build_preprocessing_chain(16000, 16000, ["dc_removal", "reverb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
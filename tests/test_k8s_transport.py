@@ -0,0 +1,142 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+from aiohttp import web
+from kubernetes import client
+
+from kubewhisper.bench.runner import _environment
+from kubewhisper.bench.stubs import StubKubernetesServer
+from kubewhisper.k8s import k8s_tools
+from kubewhisper.k8s.transport import KubeApiError, KubeTransport
+
+
+class FakeApiServer:
+    """API server with paged lists, a watch stream, slow logs and a token check."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.authorization = set()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.add_routes(
+            [
+                web.get("/api/v1/pods", self.pods),
+                web.get("/api/v1/namespaces/default/pods/{name}/log", self.log),
+                web.get("/api/v1/namespaces/default/pods/missing", self.missing),
+            ]
+        )
+        return app
+
+    async def pods(self, request):
+        self.authorization.add(request.headers.get("Authorization"))
+        if request.query.get("watch") == "true":
+            response = web.StreamResponse()
+            await response.prepare(request)
+            for i, annotation in enumerate(["short", "x" * 100_000]):
+                event = {
+                    "type": "ADDED",
+                    "object": {"metadata": {"name": f"pod-{i}", "annotations": {"a": annotation}}},
+                }
+                await response.write(json.dumps(event).encode() + b"\n")
+            return response
+        start = int(request.query.get("continue") or 0)
+        limit = int(request.query["limit"])
+        items = [{"metadata": {"name": f"pod-{i}"}} for i in range(start, min(start + limit, 7))]
+        token = str(start + limit) if start + limit < 7 else ""
+        return web.json_response({"kind": "PodList", "metadata": {"continue": token}, "items": items})
+
+    async def log(self, request):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.02)
+        self.in_flight -= 1
+        name = request.match_info["name"]
+        return web.Response(text=f"{name} started\n{name} ERROR timeout\n")
+
+    async def missing(self, request):
+        return web.json_response({"kind": "Status", "message": 'pods "missing" not found'}, status=404)
+
+
+class TestKubeTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = FakeApiServer()
+        runner = web.AppRunner(self.server.app())
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        self.addAsyncCleanup(runner.cleanup)
+
+        configuration = client.Configuration(host=f"http://127.0.0.1:{runner.addresses[0][1]}")
+        configuration.api_key = {"authorization": "secret"}
+        configuration.api_key_prefix = {"authorization": "Bearer"}
+        self.transport = KubeTransport(configuration, limit_per_host=3)
+        self.addAsyncCleanup(self.transport.close)
+
+    async def test_list_follows_pages_and_honours_limit(self):
+        pods = await self.transport.list("/api/v1/pods", page_size=3)
+        self.assertEqual([pod["metadata"]["name"] for pod in pods], [f"pod-{i}" for i in range(7)])
+        self.assertEqual(len(await self.transport.list("/api/v1/pods", limit=4, page_size=3)), 4)
+        self.assertEqual(self.server.authorization, {"Bearer secret"})
+
+    async def test_watch_streams_events_of_any_size(self):
+        events = [event async for event in self.transport.watch("/api/v1/pods", timeout_seconds=5)]
+        self.assertEqual([event["object"]["metadata"]["name"] for event in events], ["pod-0", "pod-1"])
+        self.assertEqual(len(events[1]["object"]["metadata"]["annotations"]["a"]), 100_000)
+
+    async def test_log_fan_out_stays_within_the_per_host_limit(self):
+        logs = await asyncio.gather(*(self.transport.read_log("default", f"web-{i}") for i in range(12)))
+        self.assertEqual(logs[5], "web-5 started\nweb-5 ERROR timeout")
+        self.assertEqual(self.server.max_in_flight, 3)
+        lines = [line async for line in self.transport.stream_log("default", "web-0", tail_lines=2)]
+        self.assertEqual(lines, ["web-0 started", "web-0 ERROR timeout"])
+
+    async def test_error_status_raises_with_server_message(self):
+        with self.assertRaises(KubeApiError) as raised:
+            await self.transport.get("/api/v1/namespaces/default/pods/missing")
+        self.assertEqual(raised.exception.status, 404)
+        self.assertIn('pods "missing" not found', str(raised.exception))
+
+
+class TestToolsOverTransport(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.server = StubKubernetesServer(latency_ms=0, nodes=2, pods=10, namespaces=2)
+        await self.server.start()
+        self.addAsyncCleanup(self.server.stop)
+        tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmpdir.cleanup)
+        kubeconfig = os.path.join(tmpdir.name, "kubeconfig")
+        with open(kubeconfig, "w") as f:
+            json.dump(self.server.kubeconfig(), f)
+        environment = _environment(KUBECONFIG=kubeconfig)
+        environment.__enter__()
+        self.addCleanup(environment.__exit__, None, None, None)
+        k8s_tools.reset_api_client()
+        self.addCleanup(k8s_tools.reset_api_client)
+        self.addAsyncCleanup(k8s_tools.close_transport)
+
+    async def test_tools_read_the_cluster(self):
+        status = await k8s_tools.get_cluster_status()
+        self.assertEqual(status["status_summary"], "2 nodes (2 ready), 10 pods (9 running)")
+        self.assertEqual((await k8s_tools.get_version_info())["node_versions"], ["v1.30.0", "v1.30.0"])
+        self.assertEqual((await k8s_tools.get_last_events(3))["count"], 3)
+
+        analysis = await k8s_tools.analyze_deployment_logs("web", namespace="namespace-1")
+        self.assertEqual(analysis["log_counts"], {"CRITICAL": 0, "ERROR": 5, "WARNING": 5})
+
+    async def test_transport_is_replaced_after_a_context_switch(self):
+        transport = k8s_tools.get_transport()
+        self.assertIs(k8s_tools.get_transport(), transport)
+        await k8s_tools.get_number_of_nodes()
+        k8s_tools.reset_api_client()
+        self.assertIsNot(k8s_tools.get_transport(), transport)
+        await asyncio.sleep(0.05)
+        self.assertIsNone(transport._session)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+from kubewhisper.bench.stubs import StubLLMServer
+from kubewhisper.llm.deepseek import HEDGE_MIN_SAMPLES, DeepSeekLLM
+
+
+class TestLLMLatency(unittest.IsolatedAsyncioTestCase):
+    async def start(self, **stub_options) -> StubLLMServer:
+        stub = StubLLMServer(**{"latency_ms": 0, "token_ms": 0, **stub_options})
+        await stub.start()
+        self.addAsyncCleanup(stub.stop)
+        return stub
+
+    def create_llm(self, stub: StubLLMServer, **options) -> DeepSeekLLM:
+        with mock.patch.dict(os.environ, {"DEEPSEEK_API_KEY": "test"}):
+            llm = DeepSeekLLM(api_base=stub.url, **options)
+        self.addAsyncCleanup(llm.close)
+        return llm
+
+    async def test_warmup_connection_is_kept_alive_for_the_questions(self):
+        stub = await self.start()
+        llm = self.create_llm(stub)
+        self.assertTrue(await llm.warmup())
+        self.assertEqual((stub.requests, stub.completions), (1, 0))
+
+        for question in ("What is a pod?", "What is a node?", "What is a namespace?"):
+            self.assertEqual(await llm.ask_question(question), {"response": stub.default})
+        self.assertEqual(stub.completions, 3)
+        self.assertEqual(len(stub.peers), 1)
+
+    async def test_warmup_fails_when_the_api_rejects_it(self):
+        stub = await self.start()
+        llm = self.create_llm(stub)
+        llm.api_base = f"{stub.url}/missing"
+        with self.assertLogs("kubewhisper.llm.deepseek", "WARNING") as logs:
+            self.assertFalse(await llm.warmup())
+        self.assertIn("status 404", logs.output[0])
+
+    async def test_question_fails_at_its_deadline(self):
+        stub = await self.start(latency_ms=800)
+        llm = self.create_llm(stub, timeout=0.2)
+        start = time.perf_counter()
+        response = await llm.ask_question("What is a pod?")
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(response, {"error": "The LLM did not answer within 0.2 seconds"})
+        self.assertEqual(llm.snapshot()["timeouts"], 1)
+
+    async def test_slow_answer_is_hedged_and_first_answer_wins(self):
+        # The second completion is slow, the third (the hedge) is not
+        stub = await self.start(tail_every=2, tail_ms=1000)
+        llm = self.create_llm(stub, hedge=True, hedge_delay=0.05)
+        self.assertEqual(await llm.ask_question("What is a pod?"), {"response": stub.default})
+
+        start = time.perf_counter()
+        self.assertEqual(await llm.ask_question("What is a node?"), {"response": stub.default})
+        self.assertLess(time.perf_counter() - start, 0.6)
+        self.assertEqual(stub.completions, 3)
+        stats = llm.snapshot()
+        self.assertEqual((stats["questions"], stats["hedged"], stats["hedge_wins"]), (2, 1, 1))
+        self.assertEqual(stats["latency"]["count"], 2)
+
+    async def test_hedge_delay_follows_the_latency_percentile(self):
+        stub = await self.start()
+        llm = self.create_llm(stub, hedge=True, hedge_delay=1.5)
+        for i in range(HEDGE_MIN_SAMPLES - 1):
+            llm.latency.observe(0.1 * (i + 1))
+        self.assertEqual(llm.hedge_delay(), 1.5)
+        llm.latency.observe(0.1 * HEDGE_MIN_SAMPLES)
+        self.assertAlmostEqual(llm.hedge_delay(), 1.9)
+
+
+if __name__ == "__main__":
+    unittest.main()
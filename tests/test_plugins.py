@@ -0,0 +1,83 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from kubewhisper.registry import plugins
+from kubewhisper.registry.function_executor import FunctionExecutor
+from kubewhisper.registry.function_registry import FunctionRegistry, LazyTool
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+PLUGIN_SOURCE = """
+from kubewhisper.registry.function_registry import FunctionRegistry
+
+
+@FunctionRegistry.register(description="Count the widgets.", response_template="{count} widgets")
+async def count_widgets(size: int = 2):
+    return {"count": size * 3}
+"""
+
+
+class TestPlugins(unittest.TestCase):
+    def setUp(self):
+        saved = FunctionRegistry.functions
+        FunctionRegistry.functions = []
+        self.addCleanup(setattr, FunctionRegistry, "functions", saved)
+
+    def test_manifests_match_the_registered_tools(self):
+        for module in plugins.BUILTIN_TOOL_MODULES:
+            with self.subTest(module=module):
+                manifest = json.loads(plugins.manifest_path(module).read_text())
+                self.assertEqual(manifest, plugins.generate_manifest(module))
+
+    def test_prompt_is_built_without_importing_tool_code(self):
+        code = (
+            "import sys\n"
+            "from kubewhisper.registry.function_registry import FunctionRegistry\n"
+            "from kubewhisper.registry.plugins import register_plugins\n"
+            "register_plugins()\n"
+            "lazy = FunctionRegistry.generate_json_schema()\n"
+            "print([m for m in ('kubewhisper.k8s.k8s_tools', 'kubewhisper.k8s.trend_tools', 'yaml') "
+            "if m in sys.modules])\n"
+            "import kubewhisper.k8s.k8s_tools, kubewhisper.k8s.trend_tools\n"
+            "print(lazy == FunctionRegistry.generate_json_schema(), len(FunctionRegistry.functions))\n"
+        )
+        env = dict(os.environ, PYTHONPATH=SRC)
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.split("\n")[:2], ["[]", "True 14"])
+
+    def test_tool_module_is_imported_when_the_tool_first_runs(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            package = os.path.join(tmpdir, "widget_plugin")
+            os.mkdir(package)
+            open(os.path.join(package, "__init__.py"), "w").close()
+            with open(os.path.join(package, "tools.py"), "w") as f:
+                f.write(PLUGIN_SOURCE)
+            sys.path.insert(0, tmpdir)
+            self.addCleanup(sys.path.remove, tmpdir)
+            self.addCleanup(sys.modules.pop, "widget_plugin.tools", None)
+            self.addCleanup(sys.modules.pop, "widget_plugin", None)
+
+            manifest = plugins.generate_manifest("widget_plugin.tools")
+            sys.modules.pop("widget_plugin.tools")
+            FunctionRegistry.functions = []
+            tool = FunctionRegistry.register_lazy("widget_plugin.tools", manifest["tools"][0])
+
+            self.assertIsInstance(FunctionRegistry.get("count_widgets"), LazyTool)
+            self.assertNotIn("widget_plugin.tools", sys.modules)
+            result = asyncio.run(FunctionExecutor.execute_function(tool, size="5"))
+            self.assertEqual(result["formatted_response"], "15 widgets")
+            self.assertIn("widget_plugin.tools", sys.modules)
+
+            # The module's own registration took the manifest entry's place
+            self.assertEqual(len(FunctionRegistry.functions), 1)
+            self.assertIs(FunctionRegistry.get("count_widgets"), tool.target)
+            self.assertIsNone(FunctionRegistry.register_lazy("widget_plugin.tools", manifest["tools"][0]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import asyncio
+import io
+import json
+import time
+import unittest
+
+from kubewhisper.query_batch import QueryBatch, read_queries
+
+
+class TestReadQueries(unittest.TestCase):
+    def test_lines_and_jsonl(self):
+        stream = io.StringIO(
+            "# health checks\n"
+            "how many nodes\n"
+            "\n"
+            '{"id": "pods", "query": "how many pods are running"}\n'
+            '{"text": "what is the current cluster"}\n'
+        )
+        self.assertEqual(
+            read_queries(stream),
+            [
+                {"index": 2, "query": "how many nodes"},
+                {"index": 4, "query": "how many pods are running", "id": "pods"},
+                {"index": 5, "query": "what is the current cluster"},
+            ],
+        )
+
+    def test_invalid_jsonl(self):
+        with self.assertRaisesRegex(ValueError, "Line 2"):
+            read_queries(io.StringIO('ok\n{"id": 1}\n'))
+
+
+class TestQueryBatch(unittest.TestCase):
+    def test_runs_concurrently_and_streams_in_completion_order(self):
+        in_flight = []
+        peak = []
+
+        async def process_query(query):
+            in_flight.append(query)
+            peak.append(len(in_flight))
+            await asyncio.sleep(0.3 if query == "slow" else 0.05)
+            in_flight.remove(query)
+            if query == "broken":
+                raise RuntimeError("LLM unavailable")
+            if query == "tool error":
+                return {"error": "Function not found"}
+            return {"response": query.upper()}
+
+        queries = [{"index": i, "query": q} for i, q in enumerate(["slow", "a", "b", "broken", "tool error", "c"])]
+        output = io.StringIO()
+        start = time.perf_counter()
+        summary = asyncio.run(QueryBatch(process_query, concurrency=3).run(queries, output))
+        elapsed = time.perf_counter() - start
+
+        self.assertLessEqual(max(peak), 3)
+        self.assertLess(elapsed, 0.3 + 0.05 * 6)
+        records = [json.loads(line) for line in output.getvalue().splitlines()]
+        self.assertEqual(records[-1], summary)
+        self.assertEqual(records[-2]["query"], "slow")
+        self.assertEqual(sorted(record["index"] for record in records[:-1]), list(range(6)))
+        by_query = {record["query"]: record for record in records[:-1]}
+        self.assertEqual(by_query["a"]["response"], {"response": "A"})
+        self.assertEqual(by_query["broken"]["error"], "LLM unavailable")
+        self.assertEqual(by_query["tool error"]["error"], "Function not found")
+        self.assertGreaterEqual(by_query["slow"]["latency"], 0.3)
+
+        self.assertEqual(summary["queries"], 6)
+        self.assertEqual(summary["failed"], 2)
+        self.assertEqual(summary["latency"]["max"], by_query["slow"]["latency"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from kubewhisper.audio.ring_buffer import AudioRingBuffer
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+    def test_view_without_wrap_shares_memory(self):
+        ring = AudioRingBuffer(10)
+        ring.write(np.arange(6, dtype=np.float32))
+        view = ring.view(2, 5)
+        np.testing.assert_array_equal(view, [2, 3, 4])
+        self.assertTrue(np.shares_memory(view, ring._data))
+
+    def test_wraps_and_keeps_latest_samples(self):
+        ring = AudioRingBuffer(10)
+        for start in range(0, 25, 5):
+            ring.write(np.arange(start, start + 5, dtype=np.float32))
+
+        self.assertEqual(ring.write_position, 25)
+        self.assertEqual(ring.oldest_position, 15)
+        np.testing.assert_array_equal(ring.view(ring.oldest_position), np.arange(15, 25))
+        np.testing.assert_array_equal(ring.read(18, 22), [18, 19, 20, 21])
+        with self.assertRaises(ValueError):
+            ring.view(14, 20)
+
+    def test_oversized_write_keeps_tail(self):
+        ring = AudioRingBuffer(4)
+        ring.write(np.arange(10, dtype=np.float32))
+        self.assertEqual(ring.write_position, 10)
+        np.testing.assert_array_equal(ring.view(6), [6, 7, 8, 9])
+
+    def test_reset(self):
+        ring = AudioRingBuffer(4)
+        ring.write(np.ones(3, dtype=np.float32))
+        ring.reset()
+        self.assertEqual(len(ring.view(0)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import asyncio
+import threading
+import unittest
+
+from kubewhisper.k8s import k8s_tools
+from kubewhisper.runtime import AsyncRuntime
+
+
+class TestAsyncRuntime(unittest.TestCase):
+    def setUp(self):
+        self.runtime = AsyncRuntime()
+        self.runtime.start()
+        self.addCleanup(self.runtime.stop)
+
+    def test_threads_share_one_loop(self):
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        loops = []
+        threads = [threading.Thread(target=lambda: loops.append(self.runtime.run(current_loop()))) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(loops), 4)
+        self.assertTrue(all(loop is self.runtime.loop for loop in loops))
+
+    def test_http_session_is_reused_across_queries(self):
+        async def session():
+            return k8s_tools.get_http_session()
+
+        first = self.runtime.run(session())
+        self.assertIs(self.runtime.run(session()), first)
+
+        self.runtime.add_closer(k8s_tools.close_http_session)
+        self.runtime.stop()
+        self.assertTrue(first.closed)
+        self.assertFalse(self.runtime.is_running)
+
+    def test_errors_propagate_to_caller(self):
+        async def fail():
+            raise ValueError("bad query")
+
+        with self.assertRaises(ValueError):
+            self.runtime.run(fail())
+
+    def test_stop_cancels_pending_tasks(self):
+        started = threading.Event()
+
+        async def forever():
+            started.set()
+            await asyncio.sleep(3600)
+
+        future = self.runtime.submit(forever())
+        started.wait(5)
+        self.runtime.stop()
+        self.assertTrue(future.cancelled())
+
+
+if __name__ == "__main__":
+    unittest.main()
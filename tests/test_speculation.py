@@ -0,0 +1,134 @@
+import asyncio
+import unittest
+
+from kubewhisper.registry.function_executor import FunctionExecutor
+from kubewhisper.registry.speculation import ToolPrefetcher, ToolScorer, call_key
+
+
+def _tool(name, description, template, parameters=None, side_effects=False, delay=0.0):
+    calls = []
+
+    async def func(**kwargs):
+        calls.append(kwargs)
+        await asyncio.sleep(delay)
+        return {"value": len(calls), **kwargs}
+
+    func.__name__ = name
+    func.metadata = {
+        "description": description,
+        "response_template": template,
+        "parameters": parameters,
+        "side_effects": side_effects,
+    }
+    func.calls = calls
+    return func
+
+
+class TestSpeculation(unittest.TestCase):
+    def setUp(self):
+        self.nodes = _tool("get_number_of_nodes", "Get the number of nodes in the Kubernetes cluster.", "{value} nodes")
+        self.pods = _tool(
+            "get_number_of_pods", "Get the number of pods in the Kubernetes cluster.", "{value} pods", delay=10
+        )
+        self.status = _tool("get_cluster_status", "Get detailed status information about the cluster.", "status")
+        self.logs = _tool(
+            "analyze_deployment_logs",
+            "Analyze logs from all pods in a deployment.",
+            "{deployment_name}",
+            parameters={"type": "object", "required": ["deployment_name"]},
+        )
+        self.switch = _tool(
+            "switch_cluster",
+            "Switch to a different Kubernetes cluster.",
+            "switched",
+            parameters={"required": ["cluster_name"]},
+            side_effects=True,
+        )
+        self.functions = [self.nodes, self.pods, self.status, self.logs, self.switch]
+
+    def test_scorer_ranks_by_distinctive_words_and_history(self):
+        scorer = ToolScorer(self.functions)
+        name, parameters, score = scorer.predict("How many nodes are in the cluster?")[0]
+        self.assertEqual((name, parameters), ("get_number_of_nodes", {}))
+        self.assertGreater(score, 0.8)
+        self.assertLess(scorer.predict("Is my cluster healthy?")[0][2], 0.5)
+        self.assertEqual(scorer.predict("hello"), [])
+
+        scorer.learn("Is my cluster healthy?", "get_cluster_status")
+        scorer.learn("Are the web logs clean?", "analyze_deployment_logs", {"deployment_name": "web"})
+        self.assertEqual(scorer.predict("is the cluster healthy")[0][0], "get_cluster_status")
+        self.assertEqual(
+            scorer.predict("are the web logs clean")[0][:2], ("analyze_deployment_logs", {"deployment_name": "web"})
+        )
+
+    def test_call_key_fills_in_defaults(self):
+        def get_last_events(count: int = 4):
+            pass
+
+        self.assertEqual(call_key(get_last_events, {}), call_key(get_last_events, {"count": 4}))
+        self.assertNotEqual(call_key(get_last_events, {}), call_key(get_last_events, {"count": 5}))
+
+    def test_hit_hands_prefetched_result_to_executor(self):
+        prefetcher = ToolPrefetcher(ToolScorer(self.functions))
+
+        async def run():
+            speculation = prefetcher.speculate("how many nodes do we have")
+            await asyncio.sleep(0.01)
+            task = speculation.claim("get_number_of_nodes", {})
+            speculation.discard()
+            return await FunctionExecutor.execute_prefetched(self.nodes, task)
+
+        result = asyncio.run(run())
+        self.assertEqual(result["formatted_response"], "1 nodes")
+        self.assertEqual(len(self.nodes.calls), 1)
+        stats = prefetcher.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"], stats["wasted_calls"], stats["hit_rate"]), (1, 0, 0, 1.0))
+
+    def test_miss_cancels_and_counts_wasted_work(self):
+        prefetcher = ToolPrefetcher(ToolScorer(self.functions))
+
+        async def run():
+            speculation = prefetcher.speculate("how many pods are there")
+            task = next(iter(speculation.calls.values())).task
+            await asyncio.sleep(0.01)
+            self.assertIsNone(speculation.claim("get_cluster_status", {}))
+            speculation.discard()
+            await asyncio.sleep(0)
+            return task
+
+        task = asyncio.run(run())
+        self.assertTrue(task.cancelled())
+        stats = prefetcher.snapshot()
+        self.assertEqual((stats["hits"], stats["misses"], stats["wasted_calls"], stats["cancelled"]), (0, 1, 1, 1))
+        self.assertGreater(stats["wasted_seconds"], 0)
+
+    def test_only_calls_without_side_effects_and_known_parameters_are_prefetched(self):
+        scorer = ToolScorer(self.functions)
+        scorer.learn("switch to staging", "switch_cluster", {"cluster_name": "staging"})
+        prefetcher = ToolPrefetcher(scorer)
+
+        async def run():
+            first = prefetcher.speculate("switch to staging")
+            second = prefetcher.speculate("analyze the deployment logs")
+            return first.calls, second.calls
+
+        self.assertEqual(asyncio.run(run()), ({}, {}))
+        self.assertEqual(prefetcher.snapshot()["calls"], 0)
+
+    def test_partial_transcript_starts_the_call_early(self):
+        prefetcher = ToolPrefetcher(ToolScorer(self.functions))
+
+        async def run():
+            prefetcher.speculate("how many nodes", final=False)
+            await asyncio.sleep(0.01)
+            speculation = prefetcher.speculate("how many nodes are running")
+            return await speculation.claim("get_number_of_nodes", {})
+
+        self.assertEqual(asyncio.run(run()), {"value": 1})
+        self.assertEqual(len(self.nodes.calls), 1)
+        stats = prefetcher.snapshot()
+        self.assertEqual((stats["queries"], stats["calls"], stats["hits"]), (1, 1, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from kubewhisper.lazy import lazy_import
+from kubewhisper.startup_profile import ImportProfiler
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+class TestLazyImport(unittest.TestCase):
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop("colorsys", None)
+        colorsys = lazy_import("colorsys")
+        self.assertNotIn("colorsys", sys.modules)
+        self.assertEqual(colorsys.rgb_to_hsv(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertIn("colorsys", sys.modules)
+
+    def test_cli_import_does_not_load_heavy_subsystems(self):
+        heavy = ["numpy", "scipy", "sounddevice", "pynput", "elevenlabs", "kubernetes", "aiohttp", "langchain_openai"]
+        code = f"import sys, kubewhisper.cli; print([m for m in {heavy!r} if m in sys.modules])"
+        env = dict(os.environ, PYTHONPATH=SRC)
+        output = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, check=True)
+        self.assertEqual(output.stdout.strip(), "[]")
+
+
+class TestImportProfiler(unittest.TestCase):
+    def test_records_module_and_phase_times(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, "profiled_outer.py"), "w") as f:
+                f.write("import time\nimport profiled_inner\ntime.sleep(0.02)\n")
+            with open(os.path.join(tmpdir, "profiled_inner.py"), "w") as f:
+                f.write("import time\ntime.sleep(0.05)\n")
+            sys.path.insert(0, tmpdir)
+            profiler = ImportProfiler().install()
+            try:
+                import profiled_outer  # noqa: F401
+            finally:
+                profiler.uninstall()
+                sys.path.remove(tmpdir)
+                sys.modules.pop("profiled_outer", None)
+                sys.modules.pop("profiled_inner", None)
+        profiler.mark("imports")
+
+        outer_total, outer_self = profiler.modules["profiled_outer"]
+        inner_total, _ = profiler.modules["profiled_inner"]
+        self.assertGreaterEqual(inner_total, 0.05)
+        self.assertGreaterEqual(outer_total, 0.07)
+        self.assertLess(outer_self, 0.05)
+        self.assertNotIn(profiler, sys.meta_path)
+
+        output = io.StringIO()
+        profiler.report(output)
+        self.assertIn("profiled_inner", output.getvalue())
+        self.assertIn("imports", output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
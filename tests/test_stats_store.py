@@ -0,0 +1,79 @@
+import asyncio
+import time
+import unittest
+
+from kubewhisper.k8s import stats_store, trend_tools
+from kubewhisper.k8s.stats_store import StatsStore, flatten_result, parse_sample_target, set_default_store
+
+
+class TestStatsStore(unittest.TestCase):
+    def setUp(self):
+        self.store = StatsStore(":memory:", raw_retention=3600, rollup_interval=300, rollup_retention=86400)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_flatten_result(self):
+        result = {"node_status": {"True": 3}, "pod_status": {"Failed": 2}, "status_summary": "text", "events": [1, 2]}
+        self.assertEqual(
+            flatten_result(result), {"node_status.True": 3.0, "pod_status.Failed": 2.0, "events.count": 2.0}
+        )
+
+    def test_parse_sample_target(self):
+        self.assertEqual(parse_sample_target("get_cluster_status"), ("get_cluster_status", {}))
+        self.assertEqual(
+            parse_sample_target("analyze_deployment_logs:deployment_name=web,namespace=prod"),
+            ("analyze_deployment_logs", {"deployment_name": "web", "namespace": "prod"}),
+        )
+        with self.assertRaises(ValueError):
+            parse_sample_target("analyze_deployment_logs:web")
+
+    def test_query_range_and_value_at(self):
+        for minute in range(10):
+            self.store.record("get_cluster_status", {"pod_status.Failed": minute}, timestamp=1000 + minute * 60)
+
+        points = self.store.query_range("get_cluster_status.pod_status.Failed", 1000 + 120, 1000 + 300)
+        self.assertEqual([value for _, value in points], [2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(self.store.value_at("get_cluster_status.pod_status.Failed", 1000 + 150), (1120, 2.0))
+        self.assertIsNone(self.store.value_at("get_cluster_status.pod_status.Failed", 999))
+
+    def test_resolve_series(self):
+        self.store.record("get_cluster_status", {"pod_status.Failed": 1, "pod_status.Running": 5})
+        self.store.record("analyze_deployment_logs.web.default", {"log_counts.ERROR": 4})
+
+        self.assertEqual(self.store.resolve_series("pod_status.Failed"), "get_cluster_status.pod_status.Failed")
+        self.assertEqual(self.store.resolve_series("web error"), "analyze_deployment_logs.web.default.log_counts.ERROR")
+        with self.assertRaises(ValueError):
+            self.store.resolve_series("pod_status")
+        with self.assertRaises(ValueError):
+            self.store.resolve_series("memory")
+
+    def test_compact_rolls_up_and_expires(self):
+        for second in range(0, 600, 60):
+            self.store.record("source", {"value": second}, timestamp=second)
+        self.store.record("source", {"value": 42}, timestamp=10000)
+
+        stats = self.store.compact(now=5000)
+        self.assertEqual(stats["rolled_up"], 10)
+
+        points = self.store.query_range("source.value", 0, 20000)
+        self.assertEqual(points, [(0, 120.0), (300, 420.0), (10000, 42.0)])
+
+        self.store.compact(now=90000)
+        self.assertEqual(self.store.query_range("source.value", 0, 20000), [(9900, 42.0)])
+
+    def test_trend_tool_reads_store(self):
+        # Read the global directly, get_default_store() would open the database in the home directory
+        self.addCleanup(set_default_store, stats_store._default_store)
+        set_default_store(self.store)
+        now = time.time()
+        self.store.record("get_cluster_status", {"pod_status.Failed": 1}, timestamp=now - 1800)
+        self.store.record("get_cluster_status", {"pod_status.Failed": 4}, timestamp=now - 60)
+
+        result = asyncio.run(trend_tools.get_metric_trend("pod_status.Failed", minutes=60))
+        self.assertEqual(result["direction"], "rising")
+        self.assertEqual(result["delta"], 3.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,139 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubewhisper.audio import whisper_transcriber
+from kubewhisper.audio.asr import ASRBackend
+from kubewhisper.audio.streaming import HypothesisBuffer, StreamingSession
+from kubewhisper.audio.wav_io import iter_blocks, read_audio_file
+from kubewhisper.audio.whisper_transcriber import WhisperTranscriber
+from kubewhisper.lazy import lazy_import
+
+SAMPLE_RATE = 16000
+WORD_SECONDS = 0.5
+SCRIPT = ["show", "me", "all", "failing", "pods", "in", "the", "default", "namespace", "please"]
+
+
+def tone_frequency(index: int) -> float:
+    return 200.0 + 100.0 * index
+
+
+class ToneTranscriber:
+    """Stand-in model: every 0.5 s tone encodes one word of the script; partial words come out garbled."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, audio, prompt):
+        self.calls.append(len(audio) / SAMPLE_RATE)
+        size = int(SAMPLE_RATE * WORD_SECONDS)
+        words = []
+        for start in range(0, len(audio), size):
+            segment = audio[start : start + size]
+            begin, end = start / SAMPLE_RATE, (start + len(segment)) / SAMPLE_RATE
+            if len(segment) < size:
+                words.append((begin, end, " uh"))
+                break
+            peak = np.argmax(np.abs(np.fft.rfft(segment))) * SAMPLE_RATE / len(segment)
+            index = int(round((peak - 200.0) / 100.0))
+            words.append((begin, end, f" {SCRIPT[index]}"))
+        return words
+
+
+class ToneBackend(ASRBackend):
+    """Speech recognition backend around the tone model."""
+
+    name = "tone"
+
+    def __init__(self):
+        super().__init__(sample_rate=SAMPLE_RATE)
+        self.transcriber = ToneTranscriber()
+
+    def _load(self):
+        pass
+
+    def _transcribe(self, audio, word_timestamps, initial_prompt):
+        words = [{"start": start, "end": end, "word": word} for start, end, word in self.transcriber(audio, None)]
+        text = "".join(word["word"] for word in words)
+        return {
+            "text": text,
+            "segments": [{"start": 0.0, "end": len(audio) / SAMPLE_RATE, "text": text, "words": words}],
+        }
+
+
+class TestStreamingSession(unittest.TestCase):
+    def setUp(self):
+        size = int(SAMPLE_RATE * WORD_SECONDS)
+        t = np.arange(size) / SAMPLE_RATE
+        audio = np.concatenate([0.5 * np.sin(2 * np.pi * tone_frequency(i) * t) for i in range(len(SCRIPT))])
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.wav_path = os.path.join(self.tmpdir.name, "utterance.wav")
+        wavfile.write(self.wav_path, SAMPLE_RATE, (audio * 32767).astype(np.int16))
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_read_audio_file(self):
+        audio, sample_rate = read_audio_file(self.wav_path)
+        self.assertEqual(sample_rate, SAMPLE_RATE)
+        self.assertEqual(audio.shape, (int(SAMPLE_RATE * WORD_SECONDS) * len(SCRIPT), 1))
+        self.assertEqual(audio.dtype, np.float32)
+        self.assertLessEqual(np.max(np.abs(audio)), 1.0)
+
+    def test_wav_streaming_commits_stable_prefix(self):
+        transcriber = ToneTranscriber()
+        partials = []
+        session = StreamingSession(
+            transcriber, sample_rate=SAMPLE_RATE, trim_seconds=2.0, on_partial=lambda c, t: partials.append(c)
+        )
+
+        audio, sample_rate = read_audio_file(self.wav_path)
+        for i, block in enumerate(iter_blocks(audio, sample_rate)):
+            session.insert_audio(block[:, 0])
+            if i % 7 == 6:
+                session.process_iter()
+
+        # Committed text only ever grows and never contains garbled partial words
+        for earlier, later in zip(partials, partials[1:]):
+            self.assertTrue(later.startswith(earlier))
+        self.assertNotIn("uh", partials[-1].split())
+
+        self.assertEqual(session.finish(), " ".join(SCRIPT))
+        self.assertLess(transcriber.calls[-1], 3.0)
+
+    def test_transcribe_file_without_audio_device(self):
+        # Any use of the audio device fails, as on a host without PortAudio. The noise gate would
+        # take the steady tones for noise, so only the filters run.
+        self.enterContext(mock.patch.dict(sys.modules, {"sounddevice": None}))
+        self.enterContext(mock.patch.object(whisper_transcriber, "sd", lazy_import("sounddevice")))
+
+        for streaming in (False, True):
+            with self.subTest(streaming=streaming):
+                backend = ToneBackend()
+                transcriber = WhisperTranscriber(
+                    asr_backend=backend,
+                    streaming=streaming,
+                    stream_interval=0.1,
+                    preprocessing=("dc_removal", "lowpass"),
+                )
+                self.assertEqual(transcriber.transcribe_file(self.wav_path).strip(), " ".join(SCRIPT))
+                self.assertIsNone(transcriber._device_sample_rate)
+
+    def test_hypothesis_buffer_drops_repeated_tail(self):
+        buffer = HypothesisBuffer()
+        buffer.insert([(0.0, 0.5, " show"), (0.5, 1.0, " me")], offset=0.0)
+        buffer.flush()
+        buffer.insert([(0.0, 0.5, " show"), (0.5, 1.0, " me"), (1.0, 1.5, " all")], offset=0.0)
+        self.assertEqual([w[2] for w in buffer.flush()], [" show", " me"])
+
+        buffer.insert([(0.95, 1.0, " me"), (1.0, 1.5, " all")], offset=0.0)
+        self.assertEqual([w[2] for w in buffer.flush()], [" all"])
+
+
+if __name__ == "__main__":
+    unittest.main()
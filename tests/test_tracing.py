@@ -0,0 +1,108 @@
+import asyncio
+import json
+import threading
+import time
+import unittest
+import urllib.request
+
+from kubewhisper import tracing
+from kubewhisper.audio.transcription_worker import TranscriptionWorker
+
+
+class TestTracing(unittest.TestCase):
+    def setUp(self):
+        tracing.get_metrics().reset()
+        self.finished = []
+        tracing.add_trace_listener(self.finished.append)
+        self.addCleanup(tracing.remove_trace_listener, self.finished.append)
+
+    def test_spans_nest_and_feed_histograms(self):
+        trace = tracing.start_trace("text", query="how many nodes")
+        with tracing.activate(trace):
+            tracing.record_span("audio.capture", 0.5)
+            with tracing.span("llm.ask"):
+                with tracing.span("tool.get_number_of_nodes", cached=False):
+                    time.sleep(0.01)
+        with tracing.span("llm.ask"):
+            pass
+        trace.finish()
+        trace.finish()
+
+        self.assertEqual(self.finished, [trace])
+        spans = trace.as_dict()["spans"]
+        self.assertEqual([span["name"] for span in spans], ["audio.capture", "llm.ask", "tool.get_number_of_nodes"])
+        self.assertEqual([span["depth"] for span in spans], [0, 0, 1])
+        self.assertEqual(spans[0]["offset"], 0.0)
+        self.assertGreaterEqual(trace.duration, 0.51)
+
+        waterfall = trace.waterfall()
+        self.assertIn(trace.trace_id, waterfall)
+        self.assertIn("  tool.get_number_of_nodes", waterfall)
+
+        metrics = tracing.get_metrics().snapshot()
+        self.assertEqual(metrics["llm.ask"]["count"], 2)
+        self.assertEqual(metrics["total.text"]["count"], 1)
+        self.assertGreaterEqual(metrics["tool.get_number_of_nodes"]["p99"], 0.01)
+
+    def test_failed_span_is_marked(self):
+        trace = tracing.start_trace("text")
+        with tracing.activate(trace), self.assertRaises(ValueError):
+            with tracing.span("tool.broken"):
+                raise ValueError("boom")
+        self.assertEqual(trace.spans[0].attrs, {"error": "ValueError"})
+
+    def test_prometheus_buckets_are_cumulative(self):
+        metrics = tracing.get_metrics()
+        for seconds in (0.003, 0.2, 0.2, 50.0):
+            metrics.observe("asr.transcribe", seconds)
+        text = metrics.to_prometheus()
+        self.assertIn('kubewhisper_stage_duration_seconds_bucket{stage="asr.transcribe",le="0.005"} 1', text)
+        self.assertIn('kubewhisper_stage_duration_seconds_bucket{stage="asr.transcribe",le="0.25"} 3', text)
+        self.assertIn('kubewhisper_stage_duration_seconds_bucket{stage="asr.transcribe",le="30"} 3', text)
+        self.assertIn('kubewhisper_stage_duration_seconds_bucket{stage="asr.transcribe",le="+Inf"} 4', text)
+        self.assertIn('kubewhisper_stage_duration_seconds_count{stage="asr.transcribe"} 4', text)
+
+    def test_trace_follows_tasks_threads_and_transcription_jobs(self):
+        delivered = []
+
+        def deliver(text):
+            with tracing.span("deliver"):
+                delivered.append((text, tracing.current_trace()))
+
+        def job():
+            with tracing.span("asr.transcribe"):
+                return "how many pods"
+
+        async def answer():
+            await asyncio.to_thread(lambda: tracing.record_span("tts.synthesize", 0.0))
+            with tracing.span("llm.ask"):
+                await asyncio.sleep(0)
+
+        worker = TranscriptionWorker(deliver)
+        worker.start()
+        trace = tracing.start_trace("voice")
+        with tracing.activate(trace):
+            worker.submit(job)
+            asyncio.run(answer())
+        worker.submit(job)
+        worker.stop(wait=True)
+
+        self.assertEqual(delivered, [("how many pods", trace), ("how many pods", None)])
+        names = sorted(span.name for span in trace.spans)
+        self.assertEqual(names, ["asr.transcribe", "deliver", "llm.ask", "tts.synthesize"])
+        self.assertIsNone(tracing.current_trace())
+
+    def test_metrics_server(self):
+        tracing.get_metrics().observe("llm.ask", 0.1)
+        server = tracing.start_metrics_server(0)
+        self.addCleanup(server.shutdown)
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(f"{base}/metrics") as response:
+            self.assertIn('stage="llm.ask"', response.read().decode())
+        with urllib.request.urlopen(f"{base}/metrics.json") as response:
+            self.assertEqual(json.load(response)["llm.ask"]["count"], 1)
+        self.assertNotIn("metrics-http", [t.name for t in threading.enumerate() if not t.daemon])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+import threading
+import time
+import unittest
+
+from kubewhisper.audio.transcription_worker import TranscriptionWorker
+
+
+def job(text, delay=0.0, started=None, release=None):
+    def run():
+        if started is not None:
+            started.set()
+        if release is not None:
+            release.wait(5)
+        time.sleep(delay)
+        return text
+
+    return run
+
+
+class TestTranscriptionWorker(unittest.TestCase):
+    def setUp(self):
+        self.delivered = []
+
+    def make_worker(self, **kwargs):
+        worker = TranscriptionWorker(self.delivered.append, **kwargs)
+        worker.start()
+        self.addCleanup(worker.stop, False)
+        return worker
+
+    def test_results_delivered_in_submission_order(self):
+        worker = self.make_worker(workers=3)
+        for i, delay in enumerate([0.3, 0.1, 0.0, 0.2]):
+            worker.submit(job(f"utterance {i}", delay))
+        worker.stop()
+        self.assertEqual(self.delivered, [f"utterance {i}" for i in range(4)])
+        self.assertEqual(worker.pending, 0)
+
+    def test_submit_does_not_wait_for_transcription(self):
+        release = threading.Event()
+        worker = self.make_worker()
+        start = time.monotonic()
+        for i in range(3):
+            self.assertTrue(worker.submit(job(f"utterance {i}", release=release)))
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(worker.pending, 3)
+
+        release.set()
+        worker.stop()
+        self.assertEqual(len(self.delivered), 3)
+
+    def test_failed_and_empty_jobs_are_skipped(self):
+        def fail():
+            raise RuntimeError("model crashed")
+
+        worker = self.make_worker()
+        worker.submit(fail)
+        worker.submit(job(None))
+        worker.submit(job("get pods"))
+        worker.stop()
+        self.assertEqual(self.delivered, ["get pods"])
+
+    def test_drop_policies(self):
+        for overflow, expected in [("drop_oldest", ["first", "third"]), ("drop_newest", ["first", "second"])]:
+            with self.subTest(overflow=overflow):
+                self.delivered.clear()
+                started, release = threading.Event(), threading.Event()
+                worker = self.make_worker(max_pending=1, overflow=overflow)
+                worker.submit(job("first", started=started, release=release))
+                started.wait(5)
+                worker.submit(job("second"))
+                worker.submit(job("third"))
+                release.set()
+                worker.stop()
+                self.assertEqual(self.delivered, expected)
+                self.assertEqual(worker.dropped, 1)
+
+    def test_block_policy_applies_backpressure(self):
+        started, release = threading.Event(), threading.Event()
+        worker = self.make_worker(max_pending=1)
+        worker.submit(job("first", started=started, release=release))
+        started.wait(5)
+        worker.submit(job("second"))
+
+        submitted = threading.Event()
+        threading.Thread(target=lambda: (worker.submit(job("third")), submitted.set()), daemon=True).start()
+        self.assertFalse(submitted.wait(0.2))
+
+        release.set()
+        self.assertTrue(submitted.wait(5))
+        worker.stop()
+        self.assertEqual(self.delivered, ["first", "second", "third"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import os
+import tempfile
+import time
+import unittest
+
+from kubewhisper.audio.tts_cache import CachedSpeechBackend, TemplateSegmenter, TTSCache, cache_key
+from kubewhisper.audio.tts_pipeline import SpeechBackend
+
+TEMPLATES = [
+    "The cluster has {node_count} nodes.",
+    "Current cluster is '{cluster_name}'.",
+    "Found {total_clusters} clusters. Active cluster is '{active_cluster[name]}'.",
+    "Retrieved version information for the API server and nodes.",
+    "{metric} was {value:g} about {minutes_ago} minutes ago.",
+]
+
+
+class CountingBackend(SpeechBackend):
+    """Backend stand-in that records which texts were synthesized remotely."""
+
+    def __init__(self):
+        self.requests = []
+
+    def synthesize(self, text):
+        self.requests.append(text)
+        return f"<{text}>".encode()
+
+    def play(self, audio, interrupted=None):
+        pass
+
+
+class TestTTSCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_keys_depend_on_voice_and_model(self):
+        key = cache_key("The cluster has 3 nodes.", "voice", "model")
+        self.assertEqual(key, cache_key("The cluster has 3 nodes.", "voice", "model"))
+        self.assertNotEqual(key, cache_key("The cluster has 3 nodes.", "other", "model"))
+        self.assertNotEqual(key, cache_key("The cluster has 3 nodes.", "voice", "other"))
+
+    def test_round_trip_survives_reopen(self):
+        cache = TTSCache(self.tmpdir.name)
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", b"audio")
+        self.assertEqual(cache.get("a"), b"audio")
+
+        reopened = TTSCache(self.tmpdir.name)
+        self.assertEqual(reopened.get("a"), b"audio")
+        self.assertEqual(reopened.size, 5)
+        self.assertFalse(any(name.endswith(".tmp") for name in os.listdir(self.tmpdir.name)))
+
+    def test_evicts_least_recently_used(self):
+        cache = TTSCache(self.tmpdir.name, max_bytes=30)
+        for key in ("a", "b", "c"):
+            cache.put(key, b"x" * 10)
+            time.sleep(0.01)
+        cache.get("a")
+        cache.put("d", b"x" * 10)
+
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("d", cache)
+        self.assertEqual(cache.size, 30)
+        self.assertEqual(len(os.listdir(self.tmpdir.name)), 3)
+
+
+class TestTemplateSegmenter(unittest.TestCase):
+    def setUp(self):
+        self.segmenter = TemplateSegmenter(TEMPLATES)
+
+    def test_fragments(self):
+        self.assertEqual(
+            self.segmenter.fragments,
+            [
+                "The cluster has",
+                "nodes.",
+                "Current cluster is",
+                "Found",
+                "clusters.",
+                "Active cluster is",
+                "Retrieved version information for the API server and nodes.",
+                "was",
+                "about",
+                "minutes ago.",
+            ],
+        )
+
+    def test_segments(self):
+        self.assertEqual(self.segmenter.segments("The cluster has 3 nodes."), ["The cluster has", "3", "nodes."])
+        self.assertEqual(self.segmenter.segments("Current cluster is 'prod'."), ["Current cluster is", "prod"])
+        self.assertEqual(self.segmenter.segments("Nothing to see here."), ["Nothing to see here."])
+
+
+class TestCachedSpeechBackend(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.remote = CountingBackend()
+        self.backend = CachedSpeechBackend(
+            self.remote, TTSCache(self.tmpdir.name), voice_id="voice", model_id="model", templates=TEMPLATES
+        )
+
+    def test_prewarm_then_answers_only_synthesize_values(self):
+        self.assertEqual(self.backend.prewarm(), len(self.backend.segmenter.fragments))
+        self.assertEqual(self.backend.prewarm(), 0)
+
+        self.remote.requests.clear()
+        audio = self.backend.synthesize("The cluster has 3 nodes.")
+        self.assertEqual(audio, b"<The cluster has><3><nodes.>")
+        self.assertEqual(self.remote.requests, ["3"])
+
+        self.backend.synthesize("The cluster has 3 nodes.")
+        self.backend.synthesize("Retrieved version information for the API server and nodes.")
+        self.assertEqual(self.remote.requests, ["3"])
+
+    def test_other_sentences_are_cached_whole(self):
+        self.backend.synthesize("The deployment looks healthy.")
+        self.backend.synthesize("The deployment looks healthy.")
+        self.assertEqual(self.remote.requests, ["The deployment looks healthy."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from kubewhisper.audio.tts_pipeline import SentenceSplitter, SpeechBackend, TTSPipeline, split_sentences
+
+
+class SlowBackend(SpeechBackend):
+    """Backend stand-in with fixed synthesis and playback times that records what it did."""
+
+    def __init__(self, synthesis_seconds=0.05, playback_seconds=0.05, fail_on=None):
+        self.synthesis_seconds = synthesis_seconds
+        self.playback_seconds = playback_seconds
+        self.fail_on = fail_on
+        self.synthesized = []
+        self.played = []
+        self.cut_off = []
+        self.lock = threading.Lock()
+
+    def synthesize(self, text):
+        if text == self.fail_on:
+            raise RuntimeError("synthesis failed")
+        time.sleep(self.synthesis_seconds)
+        with self.lock:
+            self.synthesized.append(text)
+        return text.encode()
+
+    def play(self, audio, interrupted=None):
+        with self.lock:
+            self.played.append(audio.decode())
+        if interrupted is not None and interrupted.wait(self.playback_seconds):
+            with self.lock:
+                self.cut_off.append(audio.decode())
+        elif interrupted is None:
+            time.sleep(self.playback_seconds)
+
+
+class TestSentenceSplitter(unittest.TestCase):
+    def test_splits_sentences(self):
+        text = "The cluster has 3 nodes. All pods are running! Anything else? Version 1.29 is installed."
+        self.assertEqual(
+            split_sentences(text),
+            ["The cluster has 3 nodes.", "All pods are running!", "Anything else?", "Version 1.29 is installed."],
+        )
+
+    def test_joins_short_sentences(self):
+        self.assertEqual(split_sentences("Ok. The deployment is ready."), ["Ok. The deployment is ready."])
+
+    def test_splits_long_sentences_at_clauses(self):
+        text = "Pods web-1, web-2 and web-3 are pending, the scheduler reports insufficient memory on every node"
+        pieces = split_sentences(text, max_chars=50)
+        self.assertEqual(
+            pieces,
+            ["Pods web-1, web-2 and web-3 are pending,", "the scheduler reports insufficient memory on every", "node"],
+        )
+        self.assertTrue(all(len(piece) <= 50 for piece in pieces))
+
+    def test_incremental_feed(self):
+        splitter = SentenceSplitter()
+        pieces = []
+        for chunk in ["The clus", "ter has 3 no", "des. All pods", " are running."]:
+            pieces.extend(splitter.feed(chunk))
+        self.assertEqual(pieces, ["The cluster has 3 nodes."])
+        self.assertEqual(splitter.flush(), ["All pods are running."])
+
+
+class TestTTSPipeline(unittest.TestCase):
+    def make_pipeline(self, backend, **kwargs):
+        pipeline = TTSPipeline(backend, **kwargs)
+        self.addCleanup(pipeline.close)
+        return pipeline
+
+    def speak(self, pipeline, text):
+        async def speak_and_wait():
+            return await pipeline.speak(text)
+
+        return asyncio.run(speak_and_wait())
+
+    def test_overlaps_synthesis_with_playback(self):
+        backend = SlowBackend(synthesis_seconds=0.1, playback_seconds=0.1)
+        pipeline = self.make_pipeline(backend)
+        sentences = [f"This is sentence number {i}." for i in range(5)]
+
+        start = time.perf_counter()
+        self.assertTrue(self.speak(pipeline, " ".join(sentences)))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(backend.played, sentences)
+        # Sequential synthesis and playback would take 1.0s
+        self.assertLess(elapsed, 0.85)
+        self.assertLess(pipeline.stats["first_audio_seconds"], 0.2)
+        self.assertEqual(pipeline.stats["sentences"], 5)
+
+    def test_prefetch_is_bounded(self):
+        backend = SlowBackend(synthesis_seconds=0.0, playback_seconds=0.1)
+        pipeline = self.make_pipeline(backend, prefetch=1)
+
+        async def speak_and_watch():
+            handle = pipeline.speak(" ".join(f"Sentence number {i}." for i in range(6)))
+            await asyncio.sleep(0.15)
+            ahead = len(backend.synthesized) - len(backend.played)
+            await handle
+            return ahead
+
+        # At most one synthesized sentence waits while another plays
+        self.assertLessEqual(asyncio.run(speak_and_watch()), 1)
+
+    def test_consumes_async_text_chunks(self):
+        backend = SlowBackend(synthesis_seconds=0.0, playback_seconds=0.0)
+        pipeline = self.make_pipeline(backend)
+
+        async def chunks():
+            for chunk in ["The cluster ", "has 3 nodes. Curr", "ent cluster is 'prod'."]:
+                await asyncio.sleep(0.01)
+                yield chunk
+
+        self.speak(pipeline, chunks())
+        self.assertEqual(backend.played, ["The cluster has 3 nodes.", "Current cluster is 'prod'."])
+
+    def test_speak_does_not_block_the_loop(self):
+        backend = SlowBackend(synthesis_seconds=0.0, playback_seconds=0.2)
+        pipeline = self.make_pipeline(backend)
+
+        async def speak_and_tick():
+            start = time.perf_counter()
+            handle = pipeline.speak("The cluster has 3 nodes. All pods are running.")
+            returned = time.perf_counter() - start
+            ticks = 0
+            while not handle.done:
+                await asyncio.sleep(0.01)
+                ticks += 1
+            return returned, ticks, await handle
+
+        returned, ticks, completed = asyncio.run(speak_and_tick())
+        self.assertLess(returned, 0.05)
+        self.assertGreater(ticks, 20)
+        self.assertTrue(completed)
+
+    def test_interrupt_cuts_off_playback(self):
+        backend = SlowBackend(synthesis_seconds=0.0, playback_seconds=2.0)
+        pipeline = self.make_pipeline(backend)
+
+        async def interrupt_from_thread():
+            handle = pipeline.speak("A very long first sentence. And a second one.")
+            await asyncio.sleep(0.1)
+            self.assertEqual(handle.status, "playing")
+            start = time.perf_counter()
+            # Barge-in arrives from a capture thread
+            threading.Thread(target=pipeline.interrupt).start()
+            completed = await handle
+            return handle, completed, time.perf_counter() - start
+
+        handle, completed, elapsed = asyncio.run(interrupt_from_thread())
+        self.assertFalse(completed)
+        self.assertEqual(handle.status, "interrupted")
+        self.assertLess(elapsed, 0.5)
+        self.assertEqual(backend.cut_off, ["A very long first sentence."])
+        self.assertFalse(pipeline.is_speaking)
+
+    def test_new_text_interrupts_current(self):
+        backend = SlowBackend(synthesis_seconds=0.02, playback_seconds=0.1)
+        pipeline = self.make_pipeline(backend)
+
+        async def interrupt():
+            first = pipeline.speak(" ".join(f"Old answer part {i}." for i in range(10)))
+            await asyncio.sleep(0.15)
+            second = pipeline.speak("The new answer.")
+            return await first, await second
+
+        first, second = asyncio.run(interrupt())
+        self.assertFalse(first)
+        self.assertTrue(second)
+        self.assertEqual(backend.played[-1], "The new answer.")
+        self.assertLess(len(backend.played), 5)
+
+    def test_synthesis_errors_propagate(self):
+        backend = SlowBackend(synthesis_seconds=0.0, playback_seconds=0.0, fail_on="Second sentence here.")
+        pipeline = self.make_pipeline(backend)
+        with self.assertRaises(RuntimeError):
+            self.speak(pipeline, "First sentence here. Second sentence here. Third sentence here.")
+        self.assertEqual(backend.played, ["First sentence here."])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubewhisper.audio import whisper_transcriber
+from kubewhisper.audio.asr import ASRBackend
+from kubewhisper.audio.vad import UtteranceSegmenter, VoiceActivityDetector
+from kubewhisper.audio.wav_io import iter_blocks, read_audio_file
+from kubewhisper.audio.whisper_transcriber import WhisperTranscriber
+from kubewhisper.lazy import lazy_import
+
+
+def speech_like(duration: float, sample_rate: int, f0: float = 140.0) -> np.ndarray:
+    """Harmonic complex with a syllable-rate envelope, standing in for voiced speech."""
+    t = np.arange(int(duration * sample_rate)) / sample_rate
+    harmonics = sum(np.sin(2 * np.pi * f0 * k * t) / k for k in range(2, 20))
+    envelope = 0.6 + 0.4 * np.sin(2 * np.pi * 4 * t)
+    return 0.2 * envelope * harmonics
+
+
+class CountingBackend(ASRBackend):
+    """Backend that numbers the utterances and records their durations."""
+
+    name = "counting"
+
+    def __init__(self):
+        super().__init__()
+        self.durations = []
+
+    def _load(self):
+        pass
+
+    def _transcribe(self, audio, word_timestamps, initial_prompt):
+        self.durations.append(len(audio) / self.sample_rate)
+        return {"text": f" utterance {len(self.durations)}", "segments": []}
+
+
+class TestVoiceActivityDetection(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def write_wav(self, audio: np.ndarray, sample_rate: int) -> str:
+        path = os.path.join(self.tmpdir.name, "recording.wav")
+        wavfile.write(path, sample_rate, (np.clip(audio, -1, 1) * 32767).astype(np.int16))
+        return path
+
+    def segment_file(self, path: str):
+        audio, sample_rate = read_audio_file(path)
+        segmenter = UtteranceSegmenter(VoiceActivityDetector(sample_rate=sample_rate), end_silence=0.6)
+        segments = [segmenter.process(block[:, 0]) for block in iter_blocks(audio, sample_rate)]
+        segments.append(segmenter.flush())
+        return [segment for segment in segments if segment is not None]
+
+    def test_segments_utterances_from_wav(self):
+        sample_rate = 44100
+        rng = np.random.default_rng(0)
+
+        def noise(duration):
+            return 0.003 * rng.standard_normal(int(duration * sample_rate))
+
+        audio = np.concatenate(
+            [
+                noise(1.0),
+                speech_like(1.2, sample_rate) + noise(1.2),
+                noise(1.5),
+                speech_like(0.8, sample_rate, f0=180.0) + noise(0.8),
+                noise(1.0),
+            ]
+        )
+        segments = self.segment_file(self.write_wav(audio, sample_rate))
+
+        self.assertEqual(len(segments), 2)
+        # Speech plus pre-roll and the trailing silence that ended it
+        (first_start, first_end), (second_start, second_end) = segments
+        self.assertAlmostEqual(first_start / sample_rate, 1.0 - 0.3, delta=0.15)
+        self.assertAlmostEqual((first_end - first_start) / sample_rate, 1.2 + 0.3 + 0.6, delta=0.4)
+        self.assertAlmostEqual(second_start / sample_rate, 3.7 - 0.3, delta=0.15)
+        self.assertAlmostEqual((second_end - second_start) / sample_rate, 0.8 + 0.3 + 0.6, delta=0.4)
+
+    def test_adapts_to_rising_noise_floor(self):
+        sample_rate = 16000
+        rng = np.random.default_rng(1)
+        quiet = 0.002 * rng.standard_normal(2 * sample_rate)
+        loud = 0.02 * rng.standard_normal(4 * sample_rate)
+        speech = speech_like(1.0, sample_rate) + 0.02 * rng.standard_normal(sample_rate)
+
+        segments = self.segment_file(self.write_wav(np.concatenate([quiet, loud, speech, loud]), sample_rate))
+        self.assertEqual(len(segments), 1)
+
+    def test_transcribe_file_per_utterance_without_audio_device(self):
+        # Any use of the audio device fails, as on a host without PortAudio
+        self.enterContext(mock.patch.dict(sys.modules, {"sounddevice": None}))
+        self.enterContext(mock.patch.object(whisper_transcriber, "sd", lazy_import("sounddevice")))
+
+        sample_rate = 44100
+        rng = np.random.default_rng(2)
+
+        def noise(duration):
+            return 0.003 * rng.standard_normal(int(duration * sample_rate))
+
+        audio = np.concatenate(
+            [
+                noise(1.0),
+                speech_like(1.2, sample_rate) + noise(1.2),
+                noise(1.5),
+                speech_like(0.8, sample_rate, f0=180.0) + noise(0.8),
+                noise(1.0),
+            ]
+        )
+        transcriber = WhisperTranscriber(asr_backend=CountingBackend(), capture_mode="vad", end_silence=0.6)
+        text = transcriber.transcribe_file(self.write_wav(audio, sample_rate))
+
+        # One transcription per utterance, each with its pre-roll and the trailing silence that ended it
+        self.assertEqual(text, "utterance 1 utterance 2")
+        first, second = transcriber.asr.durations
+        self.assertAlmostEqual(first, 1.2 + 0.3 + 0.6, delta=0.4)
+        self.assertAlmostEqual(second, 0.8 + 0.3 + 0.6, delta=0.4)
+        self.assertIsNone(transcriber._device_sample_rate)
+
+    def test_silence_is_not_speech(self):
+        vad = VoiceActivityDetector(sample_rate=16000)
+        for _ in range(20):
+            self.assertFalse(vad.process(np.zeros(1600, dtype=np.float32)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,113 @@
+import asyncio
+import os
+import unittest
+from typing import Literal, Optional
+from unittest import mock
+
+from kubewhisper.registry.function_executor import FunctionExecutor
+from kubewhisper.registry.function_registry import FunctionRegistry
+from kubewhisper.registry.validation import ValidationError, compile_validator, infer_parameters
+
+
+class TestValidation(unittest.TestCase):
+    def setUp(self):
+        saved = FunctionRegistry.functions
+        FunctionRegistry.functions = []
+        self.addCleanup(setattr, FunctionRegistry, "functions", saved)
+
+    def test_infer_parameters_uses_json_schema_types_and_defaults(self):
+        def tool(
+            name: str, count: int = 4, ratio: float = 0.5, unit: Literal["m", "h"] = "m", ns: Optional[str] = None
+        ):
+            pass
+
+        self.assertEqual(
+            infer_parameters(tool),
+            {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string"},
+                    "count": {"type": "integer", "default": 4},
+                    "ratio": {"type": "number", "default": 0.5},
+                    "unit": {"type": "string", "enum": ["m", "h"], "default": "m"},
+                    "ns": {"type": "string", "default": None},
+                },
+                "required": ["name"],
+            },
+        )
+
+    def test_validator_coerces_checks_and_fills_defaults(self):
+        validate = compile_validator(
+            {
+                "type": "object",
+                "properties": {
+                    "metric": {"type": "string"},
+                    "minutes": {"type": "integer", "default": 60},
+                    "unit": {"type": "string", "enum": ["m", "h"]},
+                    "verbose": {"type": "boolean"},
+                },
+                "required": ["metric"],
+            }
+        )
+        self.assertEqual(validate({"metric": "pods"}), {"metric": "pods", "minutes": 60})
+        self.assertEqual(
+            validate({"metric": "pods", "minutes": "15", "verbose": "true", "unit": "h"}),
+            {"metric": "pods", "minutes": 15, "verbose": True, "unit": "h"},
+        )
+        self.assertEqual(validate({"metric": 2024, "minutes": 30.0})["metric"], "2024")
+
+        for parameters, message in [
+            ({}, "Missing required parameter: metric"),
+            ({"metric": "pods", "namespace": "x"}, "Unknown parameter: namespace"),
+            ({"metric": "pods", "minutes": "soon"}, "Invalid type for minutes"),
+            ({"metric": "pods", "minutes": True}, "Invalid type for minutes"),
+            ({"metric": "pods", "minutes": 1.5}, "Invalid type for minutes"),
+            ({"metric": "pods", "unit": "d"}, "Invalid value for unit"),
+            ("pods", "Parameters must be an object"),
+        ]:
+            with self.subTest(parameters=parameters), self.assertRaisesRegex(ValidationError, message):
+                validate(parameters)
+
+    def test_registered_function_is_validated_before_it_runs(self):
+        calls = []
+
+        @FunctionRegistry.register(description="Last events", response_template="{count} events")
+        async def get_last_events(count: int = 4):
+            calls.append(count)
+            return {"count": count}
+
+        schema = FunctionRegistry.get("get_last_events").metadata["schema"]
+        self.assertEqual(schema["properties"]["count"], {"type": "integer", "default": 4})
+
+        result = asyncio.run(FunctionExecutor.execute_function(get_last_events, count="7"))
+        self.assertEqual(result["formatted_response"], "7 events")
+        result = asyncio.run(FunctionExecutor.execute_function(get_last_events, count="many"))
+        self.assertFalse(result["success"])
+        self.assertIn("Invalid type for count", result["error"])
+        self.assertEqual(calls, [7])
+
+    def test_llm_response_parameters_are_coerced(self):
+        from kubewhisper.llm.deepseek import DeepSeekLLM
+
+        @FunctionRegistry.register(description="Last events", response_template="{count} events")
+        async def get_last_events(count: int = 4):
+            return {"count": count}
+
+        with mock.patch.dict(os.environ, {"DEEPSEEK_API_KEY": "test"}):
+            llm = DeepSeekLLM()
+        tools = llm.get_tools()
+
+        response = {"type": "function", "name": "get_last_events", "parameters": {"count": "10"}}
+        self.assertTrue(llm.validate_response(response, tools))
+        self.assertEqual(response["parameters"], {"count": 10})
+        response = {"type": "function", "name": "get_last_events"}
+        llm.validate_response(response, tools)
+        self.assertEqual(response["parameters"], {"count": 4})
+        with self.assertRaisesRegex(ValueError, "Unknown parameter: limit"):
+            llm.validate_response({"name": "get_last_events", "parameters": {"limit": 3}}, tools)
+        with self.assertRaisesRegex(ValueError, "Invalid function name"):
+            llm.validate_response({"name": "delete_cluster"}, tools)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from scipy.io import wavfile
+
+from kubewhisper.audio.wake_word import (
+    CPUBudget,
+    LogMelFrontEnd,
+    WakeWordDetector,
+    benchmark_block_cost,
+    measure_false_accepts,
+    trim_template,
+)
+
+SAMPLE_RATE = 16000
+
+# First three formant frequencies of a few vowels
+FORMANTS = {
+    "a": (800, 1200, 2500),
+    "e": (500, 1900, 2500),
+    "i": (300, 2300, 3000),
+    "o": (500, 900, 2400),
+    "u": (320, 800, 2300),
+}
+
+WAKE_PHRASE = [("o", 150, 0.15), ("u", 140, 0.12), ("i", 160, 0.18), ("a", 130, 0.2)]
+OTHER_PHRASES = [
+    [("a", 140, 0.2), ("e", 150, 0.2), ("o", 120, 0.25)],
+    [("i", 130, 0.15), ("e", 160, 0.2), ("a", 170, 0.15), ("u", 120, 0.2)],
+    [("e", 180, 0.3), ("o", 150, 0.3)],
+    # Same opening as the wake phrase, different ending
+    [("o", 150, 0.15), ("u", 140, 0.12), ("e", 160, 0.18), ("i", 130, 0.2)],
+]
+
+
+def vowel(name, pitch, duration, amplitude):
+    """Harmonics of the pitch shaped by the vowel's formants."""
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    out = np.zeros_like(t)
+    for k in range(1, int(7000 / pitch) + 1):
+        gain = sum(1 / (1 + ((pitch * k - formant) / 90) ** 2) for formant in FORMANTS[name]) + 0.02
+        out += gain * np.sin(2 * np.pi * pitch * k * t + k)
+    return amplitude * out / np.max(np.abs(out))
+
+
+def phrase(sequence, stretch=1.0, shift=1.0, amplitude=0.2):
+    return np.concatenate(
+        [vowel(name, pitch * shift, duration * stretch, amplitude) for name, pitch, duration in sequence]
+    )
+
+
+class TestWakeWordDetector(unittest.TestCase):
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+        self.templates = [
+            trim_template(LogMelFrontEnd(SAMPLE_RATE).process(self.recording(stretch, shift)))
+            for stretch, shift in [(1.0, 1.0), (0.9, 1.05), (1.1, 0.95)]
+        ]
+
+    def noise(self, duration, amplitude=0.005):
+        return amplitude * self.rng.standard_normal(int(duration * SAMPLE_RATE))
+
+    def recording(self, stretch=1.0, shift=1.0):
+        return np.concatenate([self.noise(0.3), phrase(WAKE_PHRASE, stretch, shift), self.noise(0.3)]).astype(
+            np.float32
+        )
+
+    def run_blocks(self, detector, audio, block_size=1600):
+        return [
+            start / SAMPLE_RATE
+            for start in range(0, len(audio), block_size)
+            if detector.process(audio[start : start + block_size])
+        ]
+
+    def test_incremental_features_match_whole_signal(self):
+        audio = self.noise(1.0, 0.1).astype(np.float32)
+        whole = LogMelFrontEnd(SAMPLE_RATE).process(audio)
+
+        frontend = LogMelFrontEnd(SAMPLE_RATE)
+        pieces = [frontend.process(audio[start : start + 1234]) for start in range(0, len(audio), 1234)]
+        np.testing.assert_allclose(np.concatenate(pieces), whole, rtol=1e-4, atol=1e-4)
+
+    def test_detects_phrase_once_after_it_ends(self):
+        detector = WakeWordDetector(self.templates, SAMPLE_RATE, cpu_budget=None)
+        spoken = phrase(WAKE_PHRASE, stretch=1.05, shift=0.97, amplitude=0.5)
+        audio = np.concatenate([self.noise(2.0), spoken, self.noise(2.0)]).astype(np.float32)
+
+        hits = self.run_blocks(detector, audio)
+        phrase_end = 2.0 + len(spoken) / SAMPLE_RATE
+        self.assertEqual(len(hits), 1)
+        self.assertGreater(hits[0], phrase_end - 0.3)
+        self.assertLess(hits[0], phrase_end + 0.3)
+
+    def test_no_false_accepts_on_other_speech(self):
+        parts = []
+        for k in range(40):
+            parts.append(self.noise(self.rng.uniform(0.2, 1.0)))
+            parts.append(phrase(OTHER_PHRASES[k % 4], self.rng.uniform(0.8, 1.2), self.rng.uniform(0.8, 1.2)))
+        background = np.concatenate(parts).astype(np.float32)[:, None]
+
+        detector = WakeWordDetector(self.templates, SAMPLE_RATE, cpu_budget=None)
+        report = measure_false_accepts(detector, background, SAMPLE_RATE)
+        self.assertEqual(report["false_accepts"], 0)
+        self.assertGreater(report["best_score"], detector.threshold)
+        self.assertGreater(report["hours"], 0)
+
+    def test_enrolls_from_recordings(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = []
+            for i, (stretch, shift) in enumerate([(1.0, 1.0), (0.9, 1.05)]):
+                path = os.path.join(tmpdir, f"wake{i}.wav")
+                audio = self.recording(stretch, shift)
+                wavfile.write(path, SAMPLE_RATE, (audio * 32767).astype(np.int16))
+                paths.append(path)
+            detector = WakeWordDetector.from_recordings(paths, SAMPLE_RATE, cpu_budget=None)
+
+        audio = np.concatenate([self.noise(1.0), phrase(WAKE_PHRASE, amplitude=0.4), self.noise(1.0)]).astype(
+            np.float32
+        )
+        self.assertEqual(len(self.run_blocks(detector, audio)), 1)
+
+    def test_cpu_budget_limits_usage(self):
+        detector = WakeWordDetector(self.templates, SAMPLE_RATE, cpu_budget=0.002)
+        audio = self.noise(10.0, 0.05).astype(np.float32)
+        self.run_blocks(detector, audio)
+
+        stats = detector.stats()
+        self.assertGreater(stats["skipped_blocks"], 0)
+        self.assertGreater(stats["stride"], 1)
+        # Unused budget can only be saved up for one second of audio
+        self.assertLessEqual(detector.budget.cpu_seconds, 0.002 * 11 + 0.02)
+
+    def test_budget_balance(self):
+        budget = CPUBudget(budget=0.1, max_stride=3, smoothing=1.0)
+        budget.account(0.05, 0.1)
+        self.assertFalse(budget.allow())
+        budget.account(0.0, 0.4)
+        self.assertTrue(budget.allow())
+        self.assertAlmostEqual(budget.cpu_fraction, 0.1)
+        self.assertEqual(budget.stride, 2)
+
+    def test_benchmark_restores_budget(self):
+        detector = WakeWordDetector(self.templates, SAMPLE_RATE, cpu_budget=0.05)
+        result = benchmark_block_cost(detector, seconds=1.0)
+        self.assertEqual(result["blocks"], 10)
+        self.assertIsNotNone(detector.budget)
+        self.assertEqual(detector.frontend.stride, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()